@@ -0,0 +1,85 @@
+import argparse
+import sys
+import time
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+from image_preprocessing import preprocess_image, preprocess_image_fast
+
+# Typical phone camera resolutions (width, height)
+DEFAULT_RESOLUTIONS = [(1280, 960), (2048, 1536), (4032, 3024)]
+
+
+def synthetic_photo(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """
+    Smooth gradients plus fine texture, so JPEG/PNG sizes and decode costs are
+    closer to a real produce photo than pure noise would be.
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        127 + 100 * np.sin(x / (width / 3.0)),
+        127 + 100 * np.cos(y / (height / 4.0)),
+        127 + 60 * np.sin((x + y) / (width / 5.0)),
+    ], axis=-1)
+    texture = rng.normal(0, 12, size=(height, width, 3)).astype(np.float32)
+    return np.clip(base + texture, 0, 255).astype(np.uint8)
+
+
+def time_call(fn: Callable[[bytes], np.ndarray], data: bytes, repeats: int) -> float:
+    """Median wall time of `fn(data)` in milliseconds (after one warmup call)."""
+    fn(data)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(data)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(samples))
+
+
+def run(resolutions: List[Tuple[int, int]], repeats: int, tolerance: float) -> bool:
+    """Benchmark both preprocessing paths and check their outputs agree."""
+    ok = True
+    header = f"{'input':<18}{'size KiB':>10}{'legacy ms':>11}{'fast ms':>9}{'speedup':>9}{'mean |d|':>10}{'max |d|':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for width, height in resolutions:
+        photo = synthetic_photo(width, height)
+        encodings: Dict[str, bytes] = {
+            "jpeg": cv2.imencode(".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes(),
+            "png": cv2.imencode(".png", photo)[1].tobytes(),
+        }
+        for fmt, data in encodings.items():
+            legacy = preprocess_image(data)
+            fast = preprocess_image_fast(data)
+            diff = np.abs(legacy - fast)
+            legacy_ms = time_call(preprocess_image, data, repeats)
+            fast_ms = time_call(preprocess_image_fast, data, repeats)
+
+            label = f"{fmt} {width}x{height}"
+            print(
+                f"{label:<18}{len(data) / 1024:>10.0f}{legacy_ms:>11.2f}{fast_ms:>9.2f}"
+                f"{legacy_ms / fast_ms:>8.1f}x{diff.mean():>10.4f}{diff.max():>9.4f}"
+            )
+            if fast.shape != legacy.shape or diff.mean() > tolerance:
+                print(f"  MISMATCH: mean absolute difference {diff.mean():.4f} exceeds {tolerance}")
+                ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare legacy and fast image preprocessing")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.03,
+        help=(
+            "Maximum allowed mean absolute difference in normalized pixel values. Reduced JPEG "
+            "decoding averages pixels that the legacy bilinear resize skips, so small "
+            "differences on fine texture are expected"
+        ),
+    )
+    args = parser.parse_args()
+
+    sys.exit(0 if run(DEFAULT_RESOLUTIONS, args.repeats, args.tolerance) else 1)
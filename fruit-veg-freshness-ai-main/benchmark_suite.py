@@ -0,0 +1,394 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Offline micro-benchmarks for the hot paths. No server, no network and no
+# input(): missing model artifacts are replaced by small synthetic stand-ins.
+#
+#   python benchmark_suite.py --output bench.json
+#   python benchmark_suite.py --baseline bench.json        # flag regressions
+
+KERAS_MODEL_PATH = "rottenvsfresh98pval.h5"
+SHELF_LIFE_MODEL_PATH = "shelf_life_model.pkl"
+SHELF_LIFE_DATA_PATH = "fruit_veg_shelf_life.csv"
+
+RESOLUTIONS = [(640, 480), (1920, 1080), (4032, 3024)]
+INFERENCE_BATCH_SIZES = [1, 8, 32]
+
+
+# --- Timing ---
+
+def measure(fn: Callable[[], Any], min_time_s: float = 0.2, repeats: int = 5) -> Dict[str, float]:
+    """
+    Time `fn()` like timeit: pick a loop count that takes ~min_time_s / repeats,
+    then report per-call statistics over `repeats` such loops.
+    """
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed * repeats >= min_time_s or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time_s / (100 * repeats) else 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": float(np.median(samples)),
+        "min_s": float(np.min(samples)),
+        "max_s": float(np.max(samples)),
+        "loops": number,
+        "repeats": repeats,
+    }
+
+
+# --- Synthetic stand-ins ---
+
+def synthetic_keras_model():
+    """Tiny CNN with the real model's input/output shapes (random weights)."""
+    import keras
+    from image_preprocessing import INPUT_SHAPE
+
+    model = keras.Sequential([
+        keras.layers.Input(shape=INPUT_SHAPE),
+        keras.layers.Conv2D(8, 3, strides=2, activation="relu"),
+        keras.layers.Conv2D(16, 3, strides=2, activation="relu"),
+        keras.layers.GlobalAveragePooling2D(),
+        keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    return model
+
+
+def synthetic_shelf_life_model(n_rows: int = 5000, seed: int = 0):
+    """
+    RandomForest trained like shell_life.py, on rows generated from hy.py's kinetics.
+
+    Same feature layout (Temperature_C, Humidity_%, one-hot Type_* with the first
+    type dropped) and tree count as the real model, so timings are comparable.
+    """
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    import hy
+
+    rng = np.random.default_rng(seed)
+    fruits = rng.choice(sorted(hy.KINETIC_DATA), n_rows)
+    temps = rng.uniform(0, 35, n_rows)
+    rhs = rng.uniform(40, 100, n_rows)
+    days = [hy.arrhenius_shelf_life(f, t, h) for f, t, h in zip(fruits, temps, rhs)]
+    df = pd.DataFrame({
+        "Type": [f.capitalize() for f in fruits],
+        "Temperature_C": temps,
+        "Humidity_%": rhs,
+        "Shelf_Life_Days": np.asarray(days) * rng.normal(1.0, 0.1, n_rows),
+    })
+    df = pd.get_dummies(df, columns=["Type"], drop_first=True)
+    X = df.drop("Shelf_Life_Days", axis=1)
+    model = RandomForestRegressor(n_estimators=150, random_state=seed, n_jobs=1)
+    model.fit(X, df["Shelf_Life_Days"])
+    return model
+
+
+# --- Benchmark groups ---
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def preprocessing_cases() -> List[Case]:
+    import cv2
+    from benchmark_preprocessing import synthetic_photo
+    from image_preprocessing import preprocess_image, preprocess_image_fast
+
+    cases = []
+    for width, height in RESOLUTIONS:
+        photo = synthetic_photo(width, height)
+        encodings = {
+            "jpeg": cv2.imencode(".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes(),
+            "png": cv2.imencode(".png", photo)[1].tobytes(),
+        }
+        for fmt, data in encodings.items():
+            cases.append((f"preprocess_image[{fmt} {width}x{height}]", lambda d=data: preprocess_image(d)))
+            cases.append((f"preprocess_image_fast[{fmt} {width}x{height}]", lambda d=data: preprocess_image_fast(d)))
+    return cases
+
+
+def classification_cases() -> List[Case]:
+    from main import classify_freshness
+
+    scores = np.linspace(0, 1, 101).tolist()
+
+    def classify_all():
+        for score in scores:
+            classify_freshness(score)
+
+    return [("classify_freshness[x101]", classify_all)]
+
+
+def shelf_life_cases() -> List[Case]:
+    from shelf_life_predictor import KINETIC_TABLE, predict_shelf_life_api, predict_shelf_life_batch
+
+    rng = np.random.default_rng(0)
+    n = 10000
+    ids = rng.integers(0, len(KINETIC_TABLE["names"]), n)
+    temps = rng.uniform(0, 30, n)
+    from shelf_life_uncertainty import MonteCarloShelfLife
+
+    monte_carlo = MonteCarloShelfLife()
+    monte_carlo.tables("apple")
+    return [
+        ("predict_shelf_life_api", lambda: predict_shelf_life_api("apple", 12.0)),
+        (f"predict_shelf_life_batch[{n}]", lambda: predict_shelf_life_batch(ids, temps)),
+        # Cached percentile tables vs one full pass over the samples per call
+        (f"monte_carlo.predict[{monte_carlo.n_samples}]", lambda: monte_carlo.predict("apple", 12.3, 30.0, 2.0)),
+        (f"monte_carlo.sample_pass[{monte_carlo.n_samples}]",
+         lambda: monte_carlo._log_life_percentiles("apple", np.array([12.3]))),
+    ]
+
+
+def kinetics_cases() -> List[Case]:
+    """Fitting Ea/A from the bundled dataset, and building a registry version for a swap."""
+    from kinetics_fitting import fit_kinetics, registry_items, summarize_observations
+    from kinetics_registry import kinetics_from_items
+
+    if not os.path.exists(SHELF_LIFE_DATA_PATH):
+        return []
+    summary = summarize_observations(SHELF_LIFE_DATA_PATH)
+    items = registry_items(fit_kinetics(summary))
+    return [
+        ("kinetics_fitting.summarize_observations[csv]", lambda: summarize_observations(SHELF_LIFE_DATA_PATH)),
+        (f"kinetics_fitting.fit_kinetics[{len(summary['items'])} items]", lambda: fit_kinetics(summary)),
+        (f"kinetics_registry.kinetics_from_items[{len(items)}]", lambda: kinetics_from_items(items, "benchmark")),
+    ]
+
+
+def hybrid_cases(shelf_life_model: Any) -> List[Case]:
+    import hy
+    from hybrid_service import HybridShelfLifeService
+
+    hy.model = shelf_life_model
+    service = HybridShelfLifeService(shelf_life_model)
+    rng = np.random.default_rng(0)
+    n = 1000
+    fruit_ids = rng.integers(0, len(service.names), n)
+    temps = rng.uniform(0, 30, n)
+    rhs = rng.uniform(50, 100, n)
+
+    def hybrid_quiet():
+        # hybrid_prediction prints a report on every call
+        with contextlib.redirect_stdout(io.StringIO()):
+            hy.hybrid_prediction("banana", 18.0, 85.0)
+
+    return [
+        ("hy.arrhenius_shelf_life", lambda: hy.arrhenius_shelf_life("banana", 18.0, 85.0)),
+        ("hy.hybrid_prediction", hybrid_quiet),
+        (f"hybrid_service.predict_batch[{n}]", lambda: service.predict_batch(fruit_ids, temps, rhs)),
+    ]
+
+
+def _run_sync(coro: Any) -> Any:
+    """Drive a coroutine that never suspends (FastAPI's serialize_response for async routes)."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def serialization_cases() -> List[Case]:
+    """
+    Response serialization before and after json_responses.
+
+    "fastapi" cases run FastAPI's default path: response_model re-validation and
+    serialization, then the stdlib JSONResponse (and, for /available-items,
+    rebuilding the dict). The others are what the handlers do now: model_response(),
+    the default FastJSONResponse (orjson when installed) for dict results, or a
+    pre-serialized StaticJSON.
+    """
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from starlette.requests import Request
+    import main
+    from json_responses import JSON_ENCODER, FastJSONResponse, model_response
+    from shelf_life_predictor import KINETIC_DATA, predict_shelf_life_api
+
+    routes = {route.path: route for route in main.app.routes if hasattr(route, "response_field")}
+    request = Request({"type": "http", "method": "GET", "path": "/available-items", "headers": []})
+
+    classification = main.classify_freshness(0.2)
+    freshness = main.FreshnessResponse(
+        prediction_score=0.2,
+        freshness_category=classification["category"],
+        confidence=classification["confidence"],
+        message=classification["message"],
+    )
+    kinetics = predict_shelf_life_api("apple", 12.0)
+    shelf_life = main.ShelfLifeResponse(**{name: kinetics[name] for name in main.ShelfLifeResponse.model_fields})
+    fruit_ids = np.arange(1000) % len(KINETIC_DATA)
+    batch = {"results": main._shelf_life_batch_rows(fruit_ids, np.full(1000, 12.0), None, None, 0.2, 0, 1000)}
+
+    def fastapi_path(path: str, model: Any) -> Callable[[], bytes]:
+        # Private attribute of older FastAPI versions; newer ones serialize with response_field
+        route = routes[path]
+        field = getattr(route, "secure_cloned_response_field", None) or route.response_field
+        return lambda: JSONResponse(_run_sync(serialize_response(field=field, response_content=model))).body
+
+    def fastapi_available_items() -> bytes:
+        items = {
+            item: {"metric": data["metric"], "activation_energy_kj_mol": data["Ea"] / 1000}
+            for item, data in KINETIC_DATA.items()
+        }
+        return JSONResponse(jsonable_encoder({"available_items": items, "total_count": len(items)})).body
+
+    return [
+        ("serialize.FreshnessResponse[fastapi]", fastapi_path("/evaluate-freshness", freshness)),
+        ("serialize.FreshnessResponse[model_response]", lambda: model_response(freshness).body),
+        ("serialize.ShelfLifeResponse[fastapi]", fastapi_path("/predict-shelf-life", shelf_life)),
+        ("serialize.ShelfLifeResponse[model_response]", lambda: model_response(shelf_life).body),
+        ("serialize.batch_rows[fastapi]", lambda: JSONResponse(batch).body),
+        (f"serialize.batch_rows[{JSON_ENCODER}]", lambda: FastJSONResponse(batch).body),
+        ("serialize.available_items[fastapi]", fastapi_available_items),
+        ("serialize.available_items[static]", lambda: main._available_items_response(main.get_kinetics()).response(request).body),
+    ]
+
+
+def inference_cases(model: Any) -> List[Case]:
+    from image_preprocessing import INPUT_SHAPE
+
+    rng = np.random.default_rng(0)
+    cases = []
+    for batch_size in INFERENCE_BATCH_SIZES:
+        images = rng.uniform(0, 1, size=(batch_size,) + INPUT_SHAPE).astype(np.float32)
+        cases.append((f"model.predict[batch={batch_size}]", lambda x=images: model.predict(x)))
+    return cases
+
+
+def load_models() -> Dict[str, Any]:
+    """Real artifacts when present, synthetic stand-ins otherwise; records which was used."""
+    models: Dict[str, Any] = {"artifacts": {}}
+
+    if os.path.exists(SHELF_LIFE_MODEL_PATH):
+        import joblib
+        models["shelf_life"] = joblib.load(SHELF_LIFE_MODEL_PATH)
+        models["artifacts"]["shelf_life_model"] = SHELF_LIFE_MODEL_PATH
+    else:
+        models["shelf_life"] = synthetic_shelf_life_model()
+        models["artifacts"]["shelf_life_model"] = "synthetic"
+
+    try:
+        if os.path.exists(KERAS_MODEL_PATH):
+            from inference_backends import load_backend
+            models["freshness"] = load_backend("keras", KERAS_MODEL_PATH)
+            models["artifacts"]["freshness_model"] = KERAS_MODEL_PATH
+        else:
+            keras_model = synthetic_keras_model()
+
+            class _Synthetic:
+                def predict(self, images):
+                    return np.asarray(keras_model.predict_on_batch(images))
+
+            models["freshness"] = _Synthetic()
+            models["artifacts"]["freshness_model"] = "synthetic"
+    except ImportError as e:
+        print(f"Warning: skipping model inference benchmarks ({e})")
+        models["artifacts"]["freshness_model"] = None
+    return models
+
+
+def collect_cases(models: Dict[str, Any]) -> List[Case]:
+    cases = preprocessing_cases() + classification_cases() + shelf_life_cases() + serialization_cases()
+    cases += kinetics_cases()
+    cases += hybrid_cases(models["shelf_life"])
+    if "freshness" in models:
+        cases += inference_cases(models["freshness"])
+    return cases
+
+
+# --- Running and comparing ---
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.time(),
+    }
+
+
+def run_suite(name_filter: Optional[str], min_time_s: float, repeats: int) -> Dict[str, Any]:
+    models = load_models()
+    results = {}
+    for name, fn in collect_cases(models):
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(fn, min_time_s, repeats)
+        print(f"{name:<48}{results[name]['median_s'] * 1e6:>14,.1f} us")
+    return {"environment": environment(), "artifacts": models["artifacts"], "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare median times against a baseline run.
+
+    Returns:
+        Names of benchmarks that got slower by more than `threshold` (e.g. 0.2 = 20%)
+    """
+    regressions = []
+    header = f"{'benchmark':<48}{'baseline us':>14}{'current us':>14}{'change':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<48}{'-':>14}{result['median_s'] * 1e6:>14,.1f}{'new':>9}")
+            continue
+        change = result["median_s"] / base["median_s"] - 1.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<48}{base['median_s'] * 1e6:>14,.1f}{result['median_s'] * 1e6:>14,.1f}{change:>+9.1%}{flag}")
+
+    if current.get("artifacts") != baseline.get("artifacts"):
+        print("Note: baseline was recorded with different model artifacts")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the freshness and shelf-life hot paths")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Approximate seconds spent per benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    current = run_suite(args.filter, args.min_time, args.repeats)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
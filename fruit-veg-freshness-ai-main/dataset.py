@@ -1,5 +1,10 @@
+import argparse
+import os
+import time
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
 
 # List of major fruits and vegetables with some realistic shelf life baselines (in days)
 produce_types = [
@@ -15,34 +20,195 @@ produce_types = [
     {'Type': 'Onion', 'base_life': 90, 'opt_temp': 4, 'opt_hum': 70}
 ]
 
+# Columnar view of produce_types for vectorized generation
+TYPE_NAMES = np.array([p['Type'] for p in produce_types])
+BASE_LIFE = np.array([p['base_life'] for p in produce_types], dtype=np.float64)
+OPT_TEMP = np.array([p['opt_temp'] for p in produce_types], dtype=np.float64)
+OPT_HUM = np.array([p['opt_hum'] for p in produce_types], dtype=np.float64)
 
-def shelf_life_decay(typeinfo, temp, hum):
+# Sampling ranges of the original dataset (upper bounds exclusive, like randint)
+TEMP_RANGE = (0, 28)
+HUM_RANGE = (60, 100)
+NOISE_STD = 0.75
+
+
+def shelf_life_decay(typeinfo, temp, hum, noise=None):
     # Empirical shelf-life decay based on deviations from optimal temp/humidity:
     #  - higher temp/humidity reduces shelf life
     #  - severe deviation is strongly penalized
+    # Works on scalars or on NumPy arrays; typeinfo values may be arrays too.
     base = typeinfo['base_life']
     t_opt = typeinfo['opt_temp']
     h_opt = typeinfo['opt_hum']
+    if noise is None:
+        noise = np.random.normal(0, NOISE_STD, np.shape(temp) or None)
     # Penalize both higher and much lower than optimal temperature/humidity
-    t_penalty = 1 + 0.07 * abs(temp - t_opt) + 0.18 * ((temp - t_opt) > 0) * abs(temp - t_opt)
-    h_penalty = 1 + 0.04 * abs(hum - h_opt) + 0.10 * ((hum - h_opt) > 0) * abs(hum - h_opt)
-    # Product of penalties to simulate compounding spoilage risk
-    return max(1, int(base / (t_penalty * h_penalty) + np.random.normal(0, 0.75)))
-
-
-rows = []
-np.random.seed(42)
-for prod in produce_types:
-    for temp in np.random.randint(0, 28, 12):
-        for hum in np.random.randint(60, 100, 6):
-            shelf = shelf_life_decay(prod, temp, hum)
-            rows.append({
-                'Type': prod['Type'],
-                'Temperature_C': temp,
-                'Humidity_%': hum,
-                'Shelf_Life_Days': shelf
-            })
-
-df = pd.DataFrame(rows)
-df.to_csv("fruit_veg_shelf_life.csv", index=False)
-print(df.head(20))
+    t_dev = np.subtract(temp, t_opt)
+    h_dev = np.subtract(hum, h_opt)
+    t_penalty = 1 + 0.07 * np.abs(t_dev) + 0.18 * (t_dev > 0) * np.abs(t_dev)
+    h_penalty = 1 + 0.04 * np.abs(h_dev) + 0.10 * (h_dev > 0) * np.abs(h_dev)
+    # Product of penalties to simulate compounding spoilage risk; int() truncates toward zero
+    days = np.maximum(1, np.trunc(base / (t_penalty * h_penalty) + noise))
+    return int(days) if np.ndim(days) == 0 else days.astype(np.int32)
+
+
+def generate_legacy(seed: int = 42) -> pd.DataFrame:
+    """
+    The original 720-row grid (10 types x 12 temperatures x 6 humidities).
+
+    Draws from the global RNG in the original order, so the output is identical
+    to the fruit_veg_shelf_life.csv the RandomForest was trained on.
+    """
+    rows = []
+    np.random.seed(seed)
+    for prod in produce_types:
+        for temp in np.random.randint(*TEMP_RANGE, 12):
+            for hum in np.random.randint(*HUM_RANGE, 6):
+                shelf = shelf_life_decay(prod, temp, hum, np.random.normal(0, NOISE_STD))
+                rows.append({
+                    'Type': prod['Type'],
+                    'Temperature_C': temp,
+                    'Humidity_%': hum,
+                    'Shelf_Life_Days': shelf
+                })
+    return pd.DataFrame(rows)
+
+
+def generate_chunk(chunk_index: int, n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    One independent chunk of random (type, temperature, humidity) rows.
+
+    The chunk's RNG is derived from (seed, chunk_index) only, so any chunk can be
+    generated on its own, in any process and in any order, with the same result.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    type_ids = rng.integers(0, len(produce_types), n_rows)
+    temps = rng.integers(*TEMP_RANGE, n_rows, dtype=np.int16)
+    hums = rng.integers(*HUM_RANGE, n_rows, dtype=np.int16)
+    noise = rng.normal(0, NOISE_STD, n_rows)
+
+    typeinfo = {'base_life': BASE_LIFE[type_ids], 'opt_temp': OPT_TEMP[type_ids], 'opt_hum': OPT_HUM[type_ids]}
+    return pd.DataFrame({
+        'Type': pd.Categorical.from_codes(type_ids, categories=TYPE_NAMES),
+        'Temperature_C': temps,
+        'Humidity_%': hums,
+        'Shelf_Life_Days': shelf_life_decay(typeinfo, temps, hums, noise),
+    })
+
+
+def iter_chunks(
+    total_rows: int,
+    chunk_size: int = 1_000_000,
+    seed: int = 42,
+    workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the dataset chunk by chunk, in order.
+
+    With workers > 1 chunks are generated in a process pool; at most 2 * workers
+    chunks are in flight, so memory stays bounded however many rows are requested.
+    """
+    sizes = [min(chunk_size, total_rows - start) for start in range(0, total_rows, chunk_size)]
+    if workers <= 1:
+        for index, size in enumerate(sizes):
+            yield generate_chunk(index, size, seed)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = []
+        next_index = 0
+        while next_index < len(sizes) or in_flight:
+            while next_index < len(sizes) and len(in_flight) < 2 * workers:
+                in_flight.append(pool.submit(generate_chunk, next_index, sizes[next_index], seed))
+                next_index += 1
+            yield in_flight.pop(0).result()
+
+
+class ChunkWriter:
+    """Append chunks to one CSV or Parquet file (pyarrow when available, pandas otherwise)."""
+
+    def __init__(self, path: str, file_format: Optional[str] = None):
+        self.path = path
+        self.format = file_format or ('parquet' if path.endswith('.parquet') else 'csv')
+        self._writer = None
+        self._header_written = False
+        try:
+            import pyarrow  # noqa: F401
+            self._arrow = True
+        except ImportError:
+            if self.format == 'parquet':
+                raise ImportError("Parquet output requires pyarrow")
+            self._arrow = False
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if not self._arrow:
+            chunk.to_csv(self.path, mode='a' if self._header_written else 'w',
+                         header=not self._header_written, index=False)
+            self._header_written = True
+            return
+
+        import pyarrow as pa
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self.format == 'csv':
+            # The CSV writer cannot encode dictionary (categorical) columns
+            table = table.set_column(0, 'Type', table.column('Type').cast(pa.string()))
+        if self._writer is None:
+            if self.format == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                import pyarrow.csv as pacsv
+                # Unquoted like pandas' to_csv (no field contains a comma)
+                try:
+                    options = pacsv.WriteOptions(quoting_style='none')
+                except TypeError:
+                    options = None
+                self._writer = pacsv.CSVWriter(self.path, table.schema, write_options=options)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def write_dataset(
+    path: str,
+    total_rows: int,
+    chunk_size: int = 1_000_000,
+    seed: int = 42,
+    workers: int = 1,
+    file_format: Optional[str] = None,
+) -> int:
+    """Stream `total_rows` generated rows to `path`; returns the number of rows written."""
+    writer = ChunkWriter(path, file_format)
+    written = 0
+    try:
+        for chunk in iter_chunks(total_rows, chunk_size, seed, workers):
+            writer.write(chunk)
+            written += len(chunk)
+    finally:
+        writer.close()
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the synthetic fruit/vegetable shelf-life dataset")
+    parser.add_argument("--rows", type=int, help="Random rows to generate (default: the original 720-row grid)")
+    parser.add_argument("--output", default="fruit_veg_shelf_life.csv", help=".csv or .parquet")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="Override the format implied by --output")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1, help="Processes generating chunks (0 = CPU count)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.rows is None:
+        df = generate_legacy(args.seed)
+        df.to_csv(args.output, index=False)
+        print(df.head(20))
+    else:
+        start = time.perf_counter()
+        workers = args.workers or os.cpu_count() or 1
+        n = write_dataset(args.output, args.rows, args.chunk_size, args.seed, workers, args.format)
+        elapsed = time.perf_counter() - start
+        print(f"Wrote {n:,} rows to {args.output} in {elapsed:.1f}s ({n / elapsed:,.0f} rows/s)")
@@ -1,6 +1,7 @@
+import os
 import cv2
 import numpy as np
-from keras.models import load_model
+from inference_backends import load_backend
 
 
 # Classify fresh/rotten
@@ -28,11 +29,11 @@ def pre_proc_img(image_path):
 
 
 def evaluate_rotten_vs_fresh(image_path):
-    # Load the trained model
-    model = load_model('rottenvsfresh98pval.h5')
+    # Load the trained model (FRESHNESS_BACKEND selects keras, tflite or onnx)
+    model = load_backend(os.getenv("FRESHNESS_BACKEND", "keras"), os.getenv("FRESHNESS_MODEL_PATH"))
 
     # Read and process and predict
-    prediction = model.predict(pre_proc_img(image_path))
+    prediction = model.predict(pre_proc_img(image_path).astype(np.float32))
 
     return prediction[0][0]
 
@@ -0,0 +1,204 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from image_preprocessing import INPUT_SHAPE
+from inference_backends import DEFAULT_MODEL_PATHS
+
+KERAS_MODEL_PATH = DEFAULT_MODEL_PATHS["keras"]
+
+
+# --- Export ---
+
+def export_tflite(keras_model: Any, output_path: str, quantization: str = "int8") -> str:
+    """
+    Convert a Keras model to TensorFlow Lite.
+
+    Args:
+        keras_model: Loaded Keras model
+        output_path: Destination .tflite file
+        quantization: "none", "float16" (half-size weights) or "int8" (dynamic-range
+            quantized weights, float activations; no calibration data needed)
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if quantization in ("float16", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization not in ("none", "int8"):
+        raise ValueError(f"Unknown TFLite quantization '{quantization}'")
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    return output_path
+
+
+def export_onnx(keras_model: Any, output_path: str, quantize_int8: bool = False, opset: int = 13) -> str:
+    """
+    Convert a Keras model to ONNX with a dynamic batch dimension.
+
+    Args:
+        keras_model: Loaded Keras model
+        output_path: Destination .onnx file
+        quantize_int8: Also apply ONNX Runtime dynamic int8 weight quantization
+        opset: ONNX opset version
+    """
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=opset, output_path=output_path)
+
+    if quantize_int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(output_path, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+
+def export_all(keras_path: str = KERAS_MODEL_PATH) -> List[Tuple[str, str]]:
+    """Write every supported export next to the .h5 file; returns (backend, path) pairs."""
+    from keras.models import load_model
+
+    keras_model = load_model(keras_path)
+    stem = os.path.splitext(keras_path)[0]
+    exports = [
+        ("tflite", export_tflite(keras_model, f"{stem}_float16.tflite", "float16")),
+        ("tflite", export_tflite(keras_model, f"{stem}_int8.tflite", "int8")),
+        ("onnx", export_onnx(keras_model, f"{stem}.onnx")),
+        ("onnx", export_onnx(keras_model, f"{stem}_int8.onnx", quantize_int8=True)),
+    ]
+    for _, path in exports:
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return exports
+
+
+# --- Parity and performance comparison ---
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _profile_backend(backend: str, model_path: str, images: np.ndarray, repeats: int) -> Dict[str, Any]:
+    """Runs in a fresh process so load time and peak RSS are not shared between backends."""
+    from inference_backends import load_backend
+
+    baseline_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    model = load_backend(backend, model_path)
+    load_s = time.perf_counter() - start
+
+    scores = np.asarray(model.predict(images)).reshape(-1)
+
+    latency_ms = {}
+    for batch_size in (1, min(32, len(images))):
+        batch = images[:batch_size]
+        model.predict(batch)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model.predict(batch)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        latency_ms[batch_size] = float(np.median(samples))
+
+    return {
+        "backend": backend,
+        "model_path": model_path,
+        "model_size_mb": os.path.getsize(model_path) / 1e6,
+        "load_s": load_s,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_over_interpreter_mb": _peak_rss_mb() - baseline_rss,
+        "latency_ms": latency_ms,
+        "scores": scores,
+    }
+
+
+def load_images(paths: Optional[List[str]], count: int = 64, seed: int = 0) -> np.ndarray:
+    """Preprocess the given image files, or make smooth random images if none are given."""
+    from image_preprocessing import preprocess_image_fast
+
+    if paths:
+        batch = []
+        for path in paths:
+            with open(path, "rb") as f:
+                batch.append(preprocess_image_fast(f.read()))
+        return np.concatenate(batch, axis=0)
+
+    rng = np.random.default_rng(seed)
+    coarse = rng.uniform(0, 1, size=(count, 10, 10, 3)).astype(np.float32)
+    return np.repeat(np.repeat(coarse, 10, axis=1), 10, axis=2)
+
+
+def compare(models: List[Tuple[str, str]], images: np.ndarray, repeats: int, tolerance: float) -> bool:
+    """
+    Profile every (backend, path) pair and check scores against the Keras reference.
+
+    Returns:
+        True if every backend stays within `tolerance` of the Keras scores
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for backend, path in models:
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(_profile_backend, (backend, path, images, repeats)))
+
+    reference = next((r["scores"] for r in results if r["backend"] == "keras"), None)
+    ok = True
+    header = (
+        f"{'model':<36}{'size MB':>8}{'load s':>8}{'RSS MB':>8}"
+        f"{'b=1 ms':>9}{'b=32 ms':>9}{'max |d|':>9}{'mean |d|':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if reference is None:
+            max_d = mean_d = float("nan")
+        else:
+            diff = np.abs(r["scores"] - reference)
+            max_d, mean_d = float(diff.max()), float(diff.mean())
+            if max_d > tolerance:
+                ok = False
+        latencies = list(r["latency_ms"].values())
+        print(
+            f"{os.path.basename(r['model_path']):<36}{r['model_size_mb']:>8.1f}{r['load_s']:>8.2f}"
+            f"{r['rss_over_interpreter_mb']:>8.0f}{latencies[0]:>9.2f}{latencies[-1]:>9.2f}"
+            f"{max_d:>9.4f}{mean_d:>10.4f}"
+        )
+    if reference is None:
+        print("No keras model in the comparison; parity was not checked")
+    elif not ok:
+        print(f"PARITY FAILED: at least one backend differs from Keras by more than {tolerance}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the freshness model and compare inference backends")
+    parser.add_argument("--keras-model", default=KERAS_MODEL_PATH)
+    parser.add_argument("--skip-export", action="store_true", help="Only compare existing exports")
+    parser.add_argument("--images", nargs="*", help="Image files for the parity check (default: synthetic)")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Maximum allowed |score - keras score|")
+    args = parser.parse_args()
+
+    if args.skip_export:
+        stem = os.path.splitext(args.keras_model)[0]
+        candidates = [
+            ("tflite", f"{stem}_float16.tflite"),
+            ("tflite", f"{stem}_int8.tflite"),
+            ("onnx", f"{stem}.onnx"),
+            ("onnx", f"{stem}_int8.onnx"),
+        ]
+        exports = [(b, p) for b, p in candidates if os.path.exists(p)]
+    else:
+        exports = export_all(args.keras_model)
+
+    ok = compare([("keras", args.keras_model)] + exports, load_images(args.images), args.repeats, args.tolerance)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,348 @@
+import argparse
+import os
+import sys
+import time
+import zipfile
+import numpy as np
+from typing import Any, Dict, Optional
+
+# Rows traversed together; bounds the (rows x trees) index matrix
+DEFAULT_CHUNK_ROWS = 4096
+# Drop finished (row, tree) pairs from the traversal every this many levels
+COMPACT_EVERY_LEVELS = 2
+
+
+class CompiledForest:
+    """
+    Array-backed evaluator for a fitted sklearn RandomForestRegressor / DecisionTreeRegressor ensemble.
+
+    All trees are flattened into one set of contiguous node arrays:
+        feature[i]   split feature of node i
+        threshold[i] split threshold (rows with x <= threshold go left)
+        children[i]  (left, right) global node indices
+        value[i]     leaf prediction
+        roots[t]     index of tree t's root node
+        missing_right[i]  rows with a NaN split feature go right (sklearn's
+                     missing_go_to_left, inverted); None for models from
+                     sklearn versions without missing-value support
+
+    Leaves are marked by an infinite threshold (and point to themselves). A
+    whole batch is traversed level by level with a few NumPy gathers, and
+    `predict` skips sklearn's per-call input validation entirely.
+
+    Exposes `feature_names_in_` and `predict(X)` so it can stand in for the
+    sklearn model (e.g. in HybridShelfLifeService).
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        feature_names_in_: Optional[np.ndarray] = None,
+        missing_right: Optional[np.ndarray] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.feature_names_in_ = feature_names_in_
+        self.missing_right = missing_right
+        self.n_features_in_ = None if feature_names_in_ is None else len(feature_names_in_)
+        self.is_leaf = np.isinf(threshold)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.feature, self.threshold, self.children, self.value, self.roots, self.missing_right)
+        return int(sum(a.nbytes for a in arrays if a is not None))
+
+    def _go_right(self, x: np.ndarray, node: np.ndarray, has_nan: bool) -> np.ndarray:
+        go_right = x > self.threshold[node]
+        if has_nan:
+            # NaN compares False (left); send it where sklearn's tree does
+            go_right |= np.isnan(x) & self.missing_right[node]
+        return go_right
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        x_flat = X.ravel()
+        # One entry per (row, tree) pair still descending. Leaves point to
+        # themselves, so finished pairs only need dropping every few levels
+        # (compaction costs about as much as one more level of gathers)
+        index_dtype = np.int32 if X.size < np.iinfo(np.int32).max else np.intp
+        pair_row = np.repeat(np.arange(n_rows, dtype=index_dtype), self.n_trees)
+        row_offset = pair_row * index_dtype(n_features)
+        node = np.tile(self.roots, n_rows)
+        children_flat = self.children.ravel()
+        total = np.zeros(n_rows, dtype=np.float64)
+        has_nan = bool(np.isnan(x_flat).any())
+
+        for level in range(self.max_depth + 1):
+            if level % COMPACT_EVERY_LEVELS and level < self.max_depth:
+                x = x_flat[row_offset + self.feature[node]]
+                node = children_flat[2 * node + self._go_right(x, node, has_nan)]
+                continue
+            at_leaf = self.is_leaf[node]
+            if at_leaf.any():
+                total += np.bincount(pair_row[at_leaf], weights=self.value[node[at_leaf]], minlength=n_rows)
+                descending = ~at_leaf
+                node = node[descending]
+                if node.size == 0:
+                    break
+                pair_row = pair_row[descending]
+                row_offset = row_offset[descending]
+            x = x_flat[row_offset + self.feature[node]]
+            node = children_flat[2 * node + self._go_right(x, node, has_nan)]
+
+        return total / self.n_trees
+
+    def predict(self, X: Any, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        """
+        Predict for a 2-D feature matrix in model.feature_names_in_ column order.
+
+        Inputs are rounded to float32 first, exactly as sklearn's tree code does,
+        so results match `model.predict` bit for bit up to summation order. NaN
+        features follow sklearn's missing-value routing; infinite values raise
+        ValueError, as in sklearn.
+        """
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2:
+            raise ValueError("X must be a 2-D array")
+        if self.n_features_in_ is not None and X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, expected {self.n_features_in_}")
+        if np.isinf(X).any():
+            raise ValueError("X contains infinity or a value too large for float32")
+        if self.missing_right is None and np.isnan(X).any():
+            raise ValueError("X contains NaN and this forest was compiled without missing-value routing")
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_rows):
+            stop = min(start + chunk_rows, X.shape[0])
+            out[start:stop] = self._predict_chunk(X[start:stop])
+        return out
+
+
+def compile_forest(model: Any) -> CompiledForest:
+    """
+    Flatten a fitted sklearn forest (or single tree) regressor into a CompiledForest.
+
+    Only single-output regressors are supported.
+    """
+    estimators = getattr(model, "estimators_", None) or [model]
+    features, thresholds, children, values, roots, missing_right = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Only single-output regressors can be compiled")
+        n = tree.node_count
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        is_leaf = left < 0
+        local = np.arange(n, dtype=np.int64)
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+        threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+        left = np.where(is_leaf, local, left) + offset
+        right = np.where(is_leaf, local, right) + offset
+
+        features.append(feature)
+        thresholds.append(threshold)
+        children.append(np.stack([left, right], axis=1))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        missing_left = getattr(tree, "missing_go_to_left", None)
+        missing_right.append(None if missing_left is None else ~is_leaf & (np.asarray(missing_left) == 0))
+        roots.append(offset)
+        max_depth = max(max_depth, int(tree.max_depth))
+        offset += n
+
+    node_dtype = np.int32 if offset < np.iinfo(np.int32).max // 2 else np.int64
+    feature_names = getattr(model, "feature_names_in_", None)
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        children=np.concatenate(children).astype(node_dtype),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=node_dtype),
+        max_depth=max_depth,
+        feature_names_in_=None if feature_names is None else np.asarray(feature_names, dtype=str),
+        missing_right=None if any(m is None for m in missing_right) else np.concatenate(missing_right),
+    )
+
+
+def save_compiled_forest(forest: CompiledForest, path: str) -> None:
+    """
+    Write the forest as an uncompressed .npz.
+
+    Members are stored (not deflated) so load_compiled_forest can memory-map them.
+    """
+    arrays = {
+        "feature": forest.feature,
+        "threshold": forest.threshold,
+        "children": forest.children,
+        "value": forest.value,
+        "roots": forest.roots,
+        "max_depth": np.array(forest.max_depth),
+    }
+    if forest.feature_names_in_ is not None:
+        arrays["feature_names_in_"] = forest.feature_names_in_
+    if forest.missing_right is not None:
+        arrays["missing_right"] = forest.missing_right
+    np.savez(path, **arrays)
+
+
+def _memmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """Memory-map every member of an uncompressed .npz without reading the data."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as raw:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} is compressed and cannot be memory-mapped")
+            # Local file header: 30 fixed bytes + file name + extra field
+            raw.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(raw.read(4), dtype="<u2")
+            raw.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+            version = np.lib.format.read_magic(raw)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(raw)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(raw)
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if dtype.hasobject:
+                raise ValueError(f"{name} holds Python objects and cannot be memory-mapped")
+            if int(np.prod(shape)) <= 1:
+                # Scalars and empty arrays are not worth a mapping
+                count = int(np.prod(shape))
+                arrays[name] = np.frombuffer(raw.read(dtype.itemsize * count), dtype=dtype).reshape(shape)
+                continue
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode="r", shape=shape,
+                order="F" if fortran_order else "C", offset=raw.tell(),
+            )
+    return arrays
+
+
+def load_compiled_forest(path: str, mmap: bool = True) -> CompiledForest:
+    """
+    Load a forest written by save_compiled_forest.
+
+    With mmap=True the node arrays are memory-mapped, so loading is near-instant
+    and forked server workers share the same physical pages.
+    """
+    if mmap:
+        arrays = _memmap_npz(path)
+    else:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+    return CompiledForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        children=arrays["children"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        max_depth=int(arrays["max_depth"]),
+        feature_names_in_=arrays.get("feature_names_in_"),
+        missing_right=arrays.get("missing_right"),
+    )
+
+
+# --- Parity check and benchmarks ---
+
+def _time_it(fn, repeats: int) -> float:
+    """Median seconds per call (after one warmup call)."""
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def parity_check(
+    model: Any, forest: CompiledForest, n_rows: int = 20000, seed: int = 0, nan_fraction: float = 0.05
+) -> float:
+    """
+    Max |compiled - sklearn| over random rows spanning and exceeding the training
+    ranges, with `nan_fraction` of the temperature and humidity values set to NaN
+    (when the forest has missing-value routing).
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    names = list(model.feature_names_in_)
+    X = np.zeros((n_rows, len(names)))
+    X[:, names.index("Temperature_C")] = rng.uniform(-10, 45, n_rows)
+    X[:, names.index("Humidity_%")] = rng.uniform(20, 110, n_rows)
+    type_cols = [i for i, name in enumerate(names) if name.startswith("Type_")]
+    # Each row gets at most one type column set (index len(type_cols) = baseline type)
+    choice = rng.integers(0, len(type_cols) + 1, n_rows)
+    for k, col in enumerate(type_cols):
+        X[choice == k, col] = 1.0
+    if forest.missing_right is not None:
+        for name in ("Temperature_C", "Humidity_%"):
+            X[rng.random(n_rows) < nan_fraction, names.index(name)] = np.nan
+
+    expected = model.predict(pd.DataFrame(X, columns=names))
+    return float(np.abs(forest.predict(X) - expected).max())
+
+
+def benchmark(pkl_path: str, npz_path: str, repeats: int = 5) -> bool:
+    import joblib
+    import pandas as pd
+
+    start = time.perf_counter()
+    model = joblib.load(pkl_path)
+    joblib_load_s = time.perf_counter() - start
+
+    forest = compile_forest(model)
+    save_compiled_forest(forest, npz_path)
+
+    start = time.perf_counter()
+    mapped = load_compiled_forest(npz_path, mmap=True)
+    mmap_load_s = time.perf_counter() - start
+
+    max_diff = parity_check(model, mapped)
+    ok = max_diff <= 1e-9
+
+    print(f"Trees: {mapped.n_trees}  nodes: {mapped.n_nodes}  max depth: {mapped.max_depth}")
+    print(f"Pickle size: {os.path.getsize(pkl_path) / 1e6:.2f} MB   .npz size: {os.path.getsize(npz_path) / 1e6:.2f} MB"
+          f"   node arrays: {mapped.nbytes / 1e6:.2f} MB")
+    print(f"Load time: joblib {joblib_load_s * 1000:.1f} ms   mmap .npz {mmap_load_s * 1000:.2f} ms")
+    print(f"Parity: max |compiled - sklearn| = {max_diff:.3e} ({'OK' if ok else 'FAILED'})")
+
+    names = list(model.feature_names_in_)
+    print(f"{'rows':>8}{'sklearn rows/s':>18}{'compiled rows/s':>18}")
+    rng = np.random.default_rng(1)
+    for n_rows in (1, 100, 10000):
+        X = rng.uniform(0, 100, size=(n_rows, len(names)))
+        frame = pd.DataFrame(X, columns=names)
+        sk_s = _time_it(lambda: model.predict(frame), repeats)
+        cf_s = _time_it(lambda: mapped.predict(X), repeats)
+        print(f"{n_rows:>8}{n_rows / sk_s:>18,.0f}{n_rows / cf_s:>18,.0f}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the shelf-life RandomForest into a memory-mappable .npz")
+    parser.add_argument("pkl", nargs="?", default="shelf_life_model.pkl")
+    parser.add_argument("npz", nargs="?", default="shelf_life_model.npz")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.exit(0 if benchmark(args.pkl, args.npz, args.repeats) else 1)
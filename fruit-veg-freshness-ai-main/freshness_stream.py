@@ -0,0 +1,61 @@
+import asyncio
+from typing import Optional
+
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox between a WebSocket reader and the scoring loop.
+
+    The reader puts every incoming frame; the scorer takes whatever is newest.
+    A frame that is overwritten before it was taken is counted as dropped, so
+    when inference falls behind the stream skips ahead instead of queueing.
+    """
+
+    def __init__(self):
+        self._frame: Optional[bytes] = None
+        self._event = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame: bytes) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self.received += 1
+        self._event.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._event.set()
+
+    async def take(self) -> Optional[bytes]:
+        """Wait for the newest unprocessed frame; None once the stream is closed."""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+class ScoreSmoother:
+    """Exponential moving average of per-frame prediction scores."""
+
+    def __init__(self, alpha: float = 0.3):
+        """
+        Args:
+            alpha: Weight of the newest score (1 = no smoothing)
+        """
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("smoothing must be in (0, 1]")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, score: float) -> float:
+        if self.value is None:
+            self.value = score
+        else:
+            self.value = self.alpha * score + (1.0 - self.alpha) * self.value
+        return self.value
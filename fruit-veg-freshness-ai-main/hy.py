@@ -1,9 +1,18 @@
 import numpy as np
-import pandas as pd
-import joblib
 
-# Load trained ML model file
-model = joblib.load("shelf_life_model.pkl")
+from shelf_life_predictor import KINETIC_DATA as ARRHENIUS_DATA
+
+# Trained ML model file, loaded on first use so the physics helpers below
+# can be imported without the pickle being present
+MODEL_PATH = "shelf_life_model.pkl"
+model = None
+
+def get_model():
+    global model
+    if model is None:
+        import joblib
+        model = joblib.load(MODEL_PATH)
+    return model
 
 # --- Constants and Parameters ---
 R = 8.314  # J/mol·K
@@ -11,22 +20,42 @@ T_REF_C = 5.0
 T_REF_K = T_REF_C + 273.15
 OPTIMAL_RH = 90.0
 
-# Example fruit kinetic parameters
-KINETIC_DATA = {
-    "apple": {"Ea": 70000.0, "A": 2.0e11, "ref_life_days": 60},
-    "banana": {"Ea": 62000.0, "A": 9.0e9, "ref_life_days": 14},
-    "tomato": {"Ea": 36000.0, "A": 1.5e5, "ref_life_days": 14},
-    "mango": {"Ea": 46000.0, "A": 2.5e7, "ref_life_days": 12},
-    "potato": {"Ea": 60000.0, "A": 4.0e10, "ref_life_days": 90},
+# Example reference shelf lives (days at 5°C, optimal humidity)
+REF_LIFE_DAYS = {
+    "apple": 60,
+    "banana": 14,
+    "tomato": 14,
+    "mango": 12,
+    "potato": 90,
 }
 
+
+def hybrid_kinetic_data(arrhenius_data):
+    """
+    {"Ea", "A", "ref_life_days"} for every item that has a reference life.
+
+    Ea/A come from shelf_life_predictor's parameters (or a registry version of
+    them); fitted items carry their own ref_life_days, the rest use REF_LIFE_DAYS.
+    """
+    kinetic_data = {}
+    for name, data in arrhenius_data.items():
+        ref = data.get("ref_life_days", REF_LIFE_DAYS.get(name))
+        if ref is not None:
+            kinetic_data[name] = {"Ea": data["Ea"], "A": data["A"], "ref_life_days": ref}
+    return kinetic_data
+
+
+# Example fruit kinetic parameters
+KINETIC_DATA = hybrid_kinetic_data(ARRHENIUS_DATA)
+
 # --- Physics-based Equation ---
 def arrhenius_rate_constant(Ea, A, T_k):
     return A * np.exp(-Ea / (R * T_k))
 
 def humidity_factor(rh):
-    rh = max(30, min(rh, 100))
-    deviation = abs(rh - OPTIMAL_RH)
+    # np.clip/np.abs keep this usable on scalars and on whole arrays
+    rh = np.clip(rh, 30, 100)
+    deviation = np.abs(rh - OPTIMAL_RH)
     return np.exp(-0.02 * (deviation ** 1.2))
 
 def arrhenius_shelf_life(fruit, temp_c, rh):
@@ -44,6 +73,9 @@ def arrhenius_shelf_life(fruit, temp_c, rh):
 
 # --- Hybrid Prediction (weighted fusion) ---
 def hybrid_prediction(fruit, temp_c, rh, alpha=0.35):
+    import pandas as pd
+    model = get_model()
+
     # Machine Learning input prep
     X = pd.DataFrame({"Temperature_C": [temp_c], "Humidity_%": [rh]})
     for f in model.feature_names_in_:
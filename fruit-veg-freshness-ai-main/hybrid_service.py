@@ -0,0 +1,186 @@
+import os
+import threading
+import warnings
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import hy
+from shelf_life_predictor import KineticParameters, get_kinetics
+from shelf_life_surface import ShelfLifeSurface, get_default_surface
+
+# Weight of the Arrhenius estimate in the fused prediction (hy.hybrid_prediction default)
+DEFAULT_ALPHA = float(os.getenv("HYBRID_ALPHA", "0.35"))
+# Use the precomputed temperature x humidity surface instead of the exact formula
+USE_SURFACE = os.getenv("HYBRID_USE_SURFACE", "1").lower() not in ("0", "false", "no")
+# Memory-mappable forest from forest_compiler.py; used for small batches when present
+COMPILED_MODEL_PATH = os.getenv("HYBRID_COMPILED_MODEL_PATH", "shelf_life_model.npz")
+# Largest batch sent to the compiled forest; sklearn's traversal wins above a few hundred rows
+COMPILED_MAX_ROWS = int(os.getenv("HYBRID_COMPILED_MAX_ROWS", "256"))
+
+
+class HybridShelfLifeService:
+    """
+    Batched, DataFrame-free version of hy.hybrid_prediction.
+
+    The column layout of the RandomForest input (temperature, humidity and the
+    one-hot `Type_*` columns) is resolved once from `model.feature_names_in_`,
+    so a batch of (fruit, temperature, humidity) rows becomes a single NumPy
+    feature matrix and a single `model.predict` call. The Arrhenius half comes
+    from the precomputed shelf-life surface (or the exact vectorized formula).
+
+    With a compiled forest, batches of up to `compiled_max_rows` rows go to it
+    and larger ones to the sklearn model.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        surface: Optional[ShelfLifeSurface] = None,
+        use_surface: bool = USE_SURFACE,
+        compiled: Any = None,
+        compiled_max_rows: int = COMPILED_MAX_ROWS,
+    ):
+        """
+        Args:
+            model: Fitted regressor exposing feature_names_in_ and predict(); may be
+                None if `compiled` is given, which then serves every batch
+            surface: Shelf-life surface over hy.KINETIC_DATA (built on demand if None)
+            use_surface: Interpolate from the surface instead of evaluating exactly
+            compiled: Optional forest_compiler.CompiledForest of the same model
+            compiled_max_rows: Largest batch served by `compiled`
+        """
+        if model is None and compiled is None:
+            raise ValueError("Need a model or a compiled forest")
+        self.model = model
+        self.compiled = compiled
+        self.compiled_max_rows = compiled_max_rows
+        self.surface = surface or get_default_surface()
+        self.use_surface = use_surface
+
+        feature_names = list((model if model is not None else compiled).feature_names_in_)
+        self.n_features = len(feature_names)
+        self.temp_col = feature_names.index("Temperature_C")
+        self.humidity_col = feature_names.index("Humidity_%")
+
+        # One-hot column per surface item; -1 when the type was the dropped
+        # get_dummies baseline (or unseen in training), i.e. all Type_ columns stay 0
+        columns = {name: i for i, name in enumerate(feature_names)}
+        self.type_col = np.array(
+            [columns.get(f"Type_{name.capitalize()}", -1) for name in self.surface.names],
+            dtype=np.intp,
+        )
+
+    @property
+    def names(self):
+        return self.surface.names
+
+    def fruit_ids(self, fruits: Sequence[str]) -> np.ndarray:
+        """Map item names to ids, raising ValueError for unsupported items."""
+        return self.surface.fruit_ids(fruits)
+
+    def build_features(self, fruit_ids: np.ndarray, temps_c: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """Feature matrix in model.feature_names_in_ order, without pandas."""
+        n = len(fruit_ids)
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+        X[:, self.temp_col] = temps_c
+        X[:, self.humidity_col] = rhs
+        cols = self.type_col[fruit_ids]
+        has_col = cols >= 0
+        X[np.flatnonzero(has_col), cols[has_col]] = 1.0
+        return X
+
+    def predict_ml(self, X: np.ndarray) -> np.ndarray:
+        if self.compiled is not None and (self.model is None or len(X) <= self.compiled_max_rows):
+            return self.compiled.predict(X)
+        # The model was fitted on a DataFrame; the column order already matches,
+        # so the feature-name warning for plain arrays is noise here
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return np.asarray(self.model.predict(X), dtype=np.float64)
+
+    def predict_batch(
+        self,
+        fruit_ids: np.ndarray,
+        temps_c: np.ndarray,
+        rhs: np.ndarray,
+        alpha: float = DEFAULT_ALPHA,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Fused shelf-life prediction for a whole batch.
+
+        Args:
+            fruit_ids: Item ids from fruit_ids()
+            temps_c: Storage temperatures in Celsius
+            rhs: Relative humidity in %
+            alpha: Weight of the Arrhenius estimate (0 = ML only, 1 = physics only)
+
+        Returns:
+            Dictionary of (N,) arrays: arrhenius, ml and hybrid shelf life in days
+        """
+        if not 0.0 <= alpha <= 1.0:
+            raise ValueError("alpha must be between 0 and 1")
+        fruit_ids = np.asarray(fruit_ids, dtype=np.intp)
+        temps_c = np.asarray(temps_c, dtype=np.float64)
+        rhs = np.asarray(rhs, dtype=np.float64)
+
+        if self.use_surface:
+            arrhenius = self.surface.lookup_batch(fruit_ids, temps_c, rhs)
+        else:
+            arrhenius = self.surface.exact(fruit_ids, temps_c, rhs)
+        ml = self.predict_ml(self.build_features(fruit_ids, temps_c, rhs))
+
+        return {
+            "arrhenius_shelf_life_days": arrhenius,
+            "ml_shelf_life_days": ml,
+            "hybrid_shelf_life_days": alpha * arrhenius + (1.0 - alpha) * ml,
+        }
+
+    def predict(self, fruit: str, temp_c: float, rh: float, alpha: float = DEFAULT_ALPHA) -> Dict[str, float]:
+        """Single-row convenience wrapper around predict_batch."""
+        result = self.predict_batch(self.fruit_ids([fruit]), np.array([temp_c]), np.array([rh]), alpha)
+        return {key: float(values[0]) for key, values in result.items()}
+
+
+_models: Optional[Tuple[Any, Any]] = None
+_model_lock = threading.Lock()
+
+
+def load_shelf_life_models() -> Tuple[Any, Any]:
+    """
+    (sklearn model, compiled forest) from hy.MODEL_PATH and COMPILED_MODEL_PATH.
+
+    Either may be None when its file is missing (not both: without any model
+    the pickle load raises as before).
+    """
+    compiled = None
+    if COMPILED_MODEL_PATH and os.path.exists(COMPILED_MODEL_PATH):
+        from forest_compiler import load_compiled_forest
+        compiled = load_compiled_forest(COMPILED_MODEL_PATH)
+    model = hy.get_model() if compiled is None or os.path.exists(hy.MODEL_PATH) else None
+    return model, compiled
+
+
+def get_shelf_life_models() -> Tuple[Any, Any]:
+    """Load the shelf-life models once; every kinetics version shares them."""
+    global _models
+    if _models is None:
+        with _model_lock:
+            if _models is None:
+                _models = load_shelf_life_models()
+    return _models
+
+
+def _build_service(kinetics: KineticParameters) -> HybridShelfLifeService:
+    surface = ShelfLifeSurface(kinetic_data=hy.hybrid_kinetic_data(kinetics.data))
+    model, compiled = get_shelf_life_models()
+    return HybridShelfLifeService(model, surface, compiled=compiled)
+
+
+def get_hybrid_service(kinetics: Optional[KineticParameters] = None) -> HybridShelfLifeService:
+    """
+    The service for a kinetics version (default: the active one).
+
+    The model is loaded on first use; each version gets its own Arrhenius
+    surface, built once.
+    """
+    return (kinetics or get_kinetics()).derived("hybrid_service", _build_service)
@@ -0,0 +1,193 @@
+import struct
+import time
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+# Kept free of FastAPI/Keras imports so inference worker processes can import it cheaply.
+
+# Model input size (width, height)
+INPUT_SIZE = (100, 100)
+INPUT_SHAPE = (INPUT_SIZE[1], INPUT_SIZE[0], 3)
+
+# libjpeg can decode directly at 1/2, 1/4 or 1/8 scale, skipping most of the IDCT work
+_REDUCED_JPEG_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# JPEG start-of-frame markers carrying the image dimensions (C4/C8/CC are not frames)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_INV_255 = np.float32(1.0 / 255.0)
+
+
+def preprocess_image(image_bytes: bytes) -> np.ndarray:
+    """Preprocess image for model prediction"""
+    # Convert bytes to numpy array
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    
+    # Decode image
+    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    
+    if img is None:
+        raise ValueError("Invalid image format")
+    
+    # Resize and convert color
+    img = cv2.resize(img, (100, 100))
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    
+    # Normalize and expand dimensions
+    img = img / 255.0
+    img = np.expand_dims(img, axis=0)
+    
+    return img
+
+
+def jpeg_dimensions(data) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from a JPEG header without decoding it.
+
+    Returns None if the data is not a JPEG or no frame header is found.
+    """
+    view = memoryview(data)
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+
+    pos = 2
+    end = len(view)
+    while pos + 4 <= end:
+        if view[pos] != 0xFF:
+            return None
+        marker = view[pos + 1]
+        # Fill bytes and standalone markers have no length field
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            pos += 2
+            continue
+        (length,) = struct.unpack(">H", view[pos + 2:pos + 4])
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > end:
+                return None
+            height, width = struct.unpack(">HH", view[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def reduced_decode_flag(data, target_size: Tuple[int, int] = INPUT_SIZE) -> int:
+    """
+    Pick the cheapest imdecode flag that still yields an image at least `target_size`.
+
+    Only JPEG benefits from reduced decoding; other formats get IMREAD_COLOR.
+    """
+    dims = jpeg_dimensions(data)
+    if dims is None:
+        return cv2.IMREAD_COLOR
+    width, height = dims
+    for factor, flag in _REDUCED_JPEG_FLAGS:
+        if width // factor >= target_size[0] and height // factor >= target_size[1]:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def preprocess_image_into(image_bytes, out: np.ndarray) -> np.ndarray:
+    """
+    Low-allocation preprocessing that writes the normalized RGB image into `out`.
+
+    Uses reduced-resolution JPEG decoding chosen from the header dimensions and
+    float32 arithmetic, so a 12MP phone photo never materializes at full size or
+    in float64.
+
+    Args:
+        image_bytes: Encoded image (bytes, bytearray or memoryview)
+        out: float32 array of shape (100, 100, 3), e.g. one slot of a batch buffer
+
+    Returns:
+        `out`, filled with RGB values in [0, 1]
+    """
+    return _resize_normalize(_decode_reduced(image_bytes), out)
+
+
+def _decode_reduced(image_bytes) -> np.ndarray:
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    img = cv2.imdecode(nparr, reduced_decode_flag(nparr))
+    if img is None:
+        raise ValueError("Invalid image format")
+    return img
+
+
+def _resize_normalize(img: np.ndarray, out: np.ndarray) -> np.ndarray:
+    img = cv2.resize(img, INPUT_SIZE)
+    cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+    np.multiply(img, _INV_255, out=out, casting="unsafe")
+    return out
+
+
+def preprocess_image_fast(image_bytes) -> np.ndarray:
+    """Drop-in replacement for preprocess_image returning a (1, 100, 100, 3) float32 tensor"""
+    out = np.empty((1,) + INPUT_SHAPE, dtype=np.float32)
+    preprocess_image_into(image_bytes, out[0])
+    return out
+
+
+def preprocess_image_timed(image_bytes) -> Tuple[np.ndarray, float, float]:
+    """
+    preprocess_image_fast that also reports its stage timings.
+
+    Timings are returned rather than recorded so this works in worker processes too.
+
+    Returns:
+        (tensor, decode seconds, resize/normalize seconds)
+    """
+    out = np.empty((1,) + INPUT_SHAPE, dtype=np.float32)
+    start = time.perf_counter()
+    img = _decode_reduced(image_bytes)
+    decoded = time.perf_counter()
+    _resize_normalize(img, out[0])
+    return out, decoded - start, time.perf_counter() - decoded
+
+
+def preprocess_tiles(image_bytes, rows: int, cols: int, overlap: float = 0.25) -> np.ndarray:
+    """
+    Cut an image into an overlapping rows x cols grid of model-sized tiles.
+
+    The image is decoded (at reduced resolution where possible) and resized
+    once, to the canvas on which every tile is exactly 100x100 with the given
+    overlap; the tiles are then strided views of that canvas, normalized in a
+    single float32 pass into one batch.
+
+    Args:
+        image_bytes: Encoded image (bytes, bytearray or memoryview)
+        rows: Number of tile rows
+        cols: Number of tile columns
+        overlap: Fraction of a tile shared with its neighbour, in [0, 0.9]
+
+    Returns:
+        float32 array of shape (rows * cols, 100, 100, 3), row-major tile order
+    """
+    if rows < 1 or cols < 1:
+        raise ValueError("rows and cols must be at least 1")
+    if not 0.0 <= overlap <= 0.9:
+        raise ValueError("overlap must be between 0 and 0.9")
+
+    tile_w, tile_h = INPUT_SIZE
+    stride_x = max(1, int(round(tile_w * (1.0 - overlap))))
+    stride_y = max(1, int(round(tile_h * (1.0 - overlap))))
+    canvas_size = (tile_w + (cols - 1) * stride_x, tile_h + (rows - 1) * stride_y)
+
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    img = cv2.imdecode(nparr, reduced_decode_flag(nparr, canvas_size))
+    if img is None:
+        raise ValueError("Invalid image format")
+
+    img = cv2.resize(img, canvas_size)
+    cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+
+    windows = np.lib.stride_tricks.sliding_window_view(img, INPUT_SHAPE)[::stride_y, ::stride_x, 0]
+    out = np.empty((rows, cols) + INPUT_SHAPE, dtype=np.float32)
+    np.multiply(windows, _INV_255, out=out, casting="unsafe")
+    return out.reshape((rows * cols,) + INPUT_SHAPE)
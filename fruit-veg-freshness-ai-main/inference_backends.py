@@ -0,0 +1,118 @@
+import os
+import threading
+import numpy as np
+from typing import Dict, Optional, Type
+
+# Default model file for each backend; export_model.py writes the non-Keras ones
+DEFAULT_MODEL_PATHS = {
+    "keras": "rottenvsfresh98pval.h5",
+    "tflite": "rottenvsfresh98pval_int8.tflite",
+    "onnx": "rottenvsfresh98pval.onnx",
+}
+
+
+class KerasBackend:
+    """Full TensorFlow/Keras model loaded from the original .h5 file."""
+
+    name = "keras"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        if num_threads:
+            try:
+                import tensorflow as tf
+                tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+                tf.config.threading.set_inter_op_parallelism_threads(1)
+            except ImportError:
+                pass  # Keras on a non-TensorFlow backend
+            except RuntimeError:
+                # TensorFlow was already initialised in this process; keep its settings
+                print("Warning: TensorFlow thread counts can only be set before it is initialised")
+        from keras.models import load_model
+        self.model_path = model_path
+        self.model = load_model(model_path)
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        # predict_on_batch skips the tf.data pipeline model.predict builds per call
+        return np.asarray(self.model.predict_on_batch(images))
+
+
+class TFLiteBackend:
+    """
+    TensorFlow Lite interpreter (float16 or int8 dynamic-range quantized export).
+
+    Prefers the small `tflite-runtime` wheel and only falls back to full
+    TensorFlow if it is not installed.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.model_path = model_path
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        # A single interpreter holds mutable tensors, so calls must not overlap
+        self._lock = threading.Lock()
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        images = np.ascontiguousarray(images, dtype=self._input["dtype"])
+        with self._lock:
+            if images.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input["index"], images.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = images.shape[0]
+            self.interpreter.set_tensor(self._input["index"], images)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"]).copy()
+
+
+class OnnxBackend:
+    """ONNX Runtime CPU session (optionally int8 dynamic-quantized)."""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        self.model_path = model_path
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        images = np.ascontiguousarray(images, dtype=np.float32)
+        return self.session.run(None, {self._input_name: images})[0]
+
+
+BACKENDS: Dict[str, Type] = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def load_backend(name: str = "keras", model_path: Optional[str] = None, num_threads: Optional[int] = None):
+    """
+    Load an inference backend by name.
+
+    Args:
+        name: "keras", "tflite" or "onnx"
+        model_path: Model file; defaults to DEFAULT_MODEL_PATHS[name]
+        num_threads: Intra-op threads for the runtime (None = library default)
+
+    Returns:
+        Backend object exposing predict(images) -> (N, 1) scores
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available backends: {list(BACKENDS)}")
+    path = model_path or DEFAULT_MODEL_PATHS[name]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file '{path}' not found for backend '{name}'")
+    return BACKENDS[name](path, num_threads=num_threads)
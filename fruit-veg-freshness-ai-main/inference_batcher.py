@@ -0,0 +1,142 @@
+import asyncio
+import inspect
+import time
+import numpy as np
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-image prediction requests for a few milliseconds
+    and runs them through the model as one stacked batch.
+
+    Each caller awaits `submit()` with a preprocessed (1, H, W, C) tensor and gets
+    back its own raw prediction score. The first request of a batch opens a
+    window of `max_wait_ms`; the batch is flushed as soon as the window closes or
+    `max_batch_size` requests have arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Union[np.ndarray, Awaitable[np.ndarray]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        on_batch: Optional[Callable[[int, float], None]] = None,
+    ):
+        """
+        Args:
+            predict_fn: Callable taking an (N, H, W, C) batch and returning (N, 1) scores;
+                may be a coroutine function (e.g. one that runs in an executor)
+            max_batch_size: Maximum number of images stacked into one predict call
+            max_wait_ms: Maximum time the first request of a batch waits for company
+            on_batch: Optional hook called with (batch size, predict seconds) after each batch
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self.on_batch = on_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Reused stacking buffer; safe because only one batch is in flight at a time
+        self._buffer: Optional[np.ndarray] = None
+        # Simple counters for observability
+        self.batches_run = 0
+        self.items_run = 0
+
+    def _ensure_worker(self) -> None:
+        # The queue and worker task are created lazily so they bind to the
+        # event loop that is actually serving requests.
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for the next batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, image: np.ndarray) -> float:
+        """Queue one preprocessed image and wait for its prediction score."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first request, then gather more until the window closes."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_s
+
+        while len(batch) < self.max_batch_size:
+            # Drain anything already queued without yielding to the loop
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _predict(self, images: np.ndarray) -> np.ndarray:
+        """Run the model on a stacked batch."""
+        result = self.predict_fn(images)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _stack(self, images: List[np.ndarray]) -> np.ndarray:
+        """Stack (1, H, W, C) images into the preallocated batch buffer."""
+        first = images[0]
+        if (
+            self._buffer is None
+            or self._buffer.shape[1:] != first.shape[1:]
+            or self._buffer.dtype != first.dtype
+        ):
+            self._buffer = np.empty((self.max_batch_size,) + first.shape[1:], dtype=first.dtype)
+        return np.concatenate(images, axis=0, out=self._buffer[:len(images)])
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnected) don't need a slot
+            batch = [(img, fut) for img, fut in batch if not fut.cancelled()]
+            if not batch:
+                continue
+
+            try:
+                images = self._stack([img for img, _ in batch])
+                start = time.perf_counter()
+                scores = np.asarray(await self._predict(images)).reshape(len(batch), -1)
+                if self.on_batch is not None:
+                    self.on_batch(len(batch), time.perf_counter() - start)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.items_run += len(batch)
+            for (_, fut), score in zip(batch, scores):
+                if not fut.done():
+                    fut.set_result(float(score[0]))
+
+    async def stop(self) -> None:
+        """Cancel the background worker (used on application shutdown)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
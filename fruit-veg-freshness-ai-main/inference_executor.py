@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+# --- Process-pool worker state ---
+# In "process" mode every worker process loads its own copy of the model once,
+# in the pool initializer, and keeps it here for the lifetime of the worker.
+_worker_model = None
+
+
+def _init_worker(backend: str, model_path: Optional[str]) -> None:
+    """Pool initializer: load the inference backend inside the worker process."""
+    global _worker_model
+    from inference_backends import load_backend
+    _worker_model = load_backend(backend, model_path)
+
+
+def _worker_predict(images: np.ndarray) -> np.ndarray:
+    """Run a stacked batch through the worker-local model."""
+    return _worker_model.predict(images)
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the executor already holds its maximum number of requests."""
+
+    def __init__(self, retry_after_s: int):
+        super().__init__("Inference queue is full, please retry later")
+        self.retry_after_s = retry_after_s
+
+
+class InferenceExecutor:
+    """
+    Dedicated pool for CPU-heavy decode and predict work, so the asyncio event
+    loop keeps serving `/health` and `/predict-shelf-life` during scan bursts.
+
+    Admission is bounded: at most `max_pending` requests may be queued or running
+    at once. Further requests are rejected immediately with `InferenceQueueFull`
+    instead of piling up behind a slow model.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+        retry_after_s: int = 1,
+        model: Any = None,
+        backend: str = "keras",
+        model_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            mode: "thread" (share the in-process model) or "process" (one model per worker)
+            max_workers: Pool size (defaults to min(4, CPU count))
+            max_pending: Maximum number of admitted requests before rejecting
+            retry_after_s: Seconds suggested to rejected clients via Retry-After
+            model: In-process backend used in "thread" mode
+            backend: Backend name loaded by each worker in "process" mode
+            model_path: Model file loaded by each worker in "process" mode
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode '{mode}', expected 'thread' or 'process'")
+
+        self.mode = mode
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max(1, int(max_pending))
+        self.retry_after_s = max(1, int(retry_after_s))
+        self.model = model
+        self.backend = backend
+        self.model_path = model_path
+        self.pending = 0
+        self.rejected = 0
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                # "spawn" avoids forking a parent that already initialised TensorFlow
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.backend, self.model_path),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference",
+                )
+        return self._pool
+
+    @contextmanager
+    def admission(self):
+        """
+        Reserve a slot for one request for the duration of the `with` block.
+
+        Runs on the event loop thread only, so a plain counter is sufficient.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise InferenceQueueFull(self.retry_after_s)
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` in the pool. `fn` must be picklable in "process" mode."""
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            # memoryviews (e.g. upload buffers) cannot be pickled; the transfer copies anyway
+            args = tuple(a.tobytes() if isinstance(a, memoryview) else a for a in args)
+        return await loop.run_in_executor(self._get_pool(), fn, *args)
+
+    async def predict(self, images: np.ndarray) -> np.ndarray:
+        """Run a stacked image batch through the model in the pool."""
+        if self.mode == "process":
+            return await self.run(_worker_predict, images)
+        return await self.run(self._predict_local, images)
+
+    def _predict_local(self, images: np.ndarray) -> np.ndarray:
+        return self.model.predict(images)
+
+    def warmup_workers(self, images: np.ndarray) -> None:
+        """
+        Blocking: run one dummy batch per worker so every process loads and warms its model.
+
+        Only meaningful in "process" mode; raises if a worker fails to load the model.
+        """
+        pool = self._get_pool()
+        futures = [pool.submit(_worker_predict, images) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
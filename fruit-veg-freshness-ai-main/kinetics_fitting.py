@@ -0,0 +1,374 @@
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from hy import humidity_factor
+from kinetics_registry import REGISTRY_DIR, KineticsRegistry
+from shelf_life_predictor import KINETIC_DATA, KINETIC_UNCERTAINTY, R, T_REF_K, normalize_fruit_name
+from train_pipeline import TARGET, iter_frames
+
+# Estimates Ea and A per produce item from observed (temperature, shelf life)
+# rows and publishes them as a new version of the kinetics registry.
+#
+# First-order kinetics give shelf life = 1/k(T), so with x = (1/T - 1/T_ref) / R
+#
+#     ln(shelf life) = c + Ea * x,   c = ln(1/k_ref)
+#
+# 1. One streaming pass over the dataset reduces it to per (item, temperature)
+#    sums of ln(days), ln(days)^2, days and days^2. These are sufficient for both
+#    fits below, so their cost does not depend on the number of rows.
+# 2. Linearized fit: least squares of ln(days) on x, all items at once.
+# 3. Nonlinear refinement: Levenberg-Marquardt on the error in days, starting
+#    from the linear fit, one damped 2x2 step per item per iteration for all
+#    items together.
+#
+#   python kinetics_fitting.py fruit_veg_shelf_life.csv             # fit and print
+#   python kinetics_fitting.py fruit_veg_shelf_life.csv --publish   # new version, made current
+
+MIN_ROWS = 3
+# Fits outside this Ea range (J/mol) are rejected and the item keeps its built-in parameters
+EA_BOUNDS = (5000.0, 300000.0)
+# Spoilage metric of items that have no built-in entry
+FITTED_METRIC = "observed shelf life"
+
+
+def _inverse_temperature_term(temps_c: Any) -> Any:
+    return (1.0 / (np.asarray(temps_c, dtype=np.float64) + 273.15) - 1.0 / T_REF_K) / R
+
+
+def summarize_observations(
+    path: str,
+    humidity_correction: bool = False,
+    chunk_rows: int = 1_000_000,
+) -> Dict[str, Any]:
+    """
+    Reduce a shelf-life dataset to sums per (item, temperature) in one chunked pass.
+
+    Args:
+        path: .csv or .parquet with Type, Temperature_C, Humidity_% and Shelf_Life_Days
+        humidity_correction: Divide observed days by hy.humidity_factor, so the fit
+            describes storage at the optimal humidity. Off by default: the sample
+            dataset's humidity effect does not follow that curve (the fits get worse)
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Dictionary with "items" (names), per-group arrays "item" (id), "temperature",
+        "count", "sum_log", "sum_log_sq", "sum_days", "sum_days_sq", and the
+        "rows" / "skipped_rows" (non-positive shelf life) totals
+    """
+    parts = []
+    rows = skipped = 0
+    for frame in iter_frames(path, chunk_rows):
+        rows += len(frame)
+        days = frame[TARGET].to_numpy(dtype=np.float64)
+        keep = days > 0
+        skipped += int((~keep).sum())
+        if humidity_correction:
+            days = days / humidity_factor(frame["Humidity_%"].to_numpy(dtype=np.float64))
+        log_days = np.log(np.where(keep, days, 1.0))
+        chunk = pd.DataFrame({
+            "item": frame["Type"],
+            "temperature": frame["Temperature_C"].to_numpy(dtype=np.float64),
+            "count": 1.0,
+            "sum_log": log_days,
+            "sum_log_sq": log_days * log_days,
+            "sum_days": days,
+            "sum_days_sq": days * days,
+        })[keep]
+        parts.append(chunk.groupby(["item", "temperature"], observed=True).sum().reset_index())
+
+    groups = pd.concat(parts, ignore_index=True)
+    groups["item"] = groups["item"].astype(str).map(normalize_fruit_name)
+    groups = groups.groupby(["item", "temperature"]).sum().reset_index()
+    items = sorted(groups["item"].unique())
+    summary = {
+        "items": items,
+        "item": groups["item"].map({name: i for i, name in enumerate(items)}).to_numpy(dtype=np.intp),
+        "rows": rows,
+        "skipped_rows": skipped,
+    }
+    for column in ("temperature", "count", "sum_log", "sum_log_sq", "sum_days", "sum_days_sq"):
+        summary[column] = groups[column].to_numpy(dtype=np.float64)
+    return summary
+
+
+def _per_item(summary: Dict[str, Any], values: np.ndarray) -> np.ndarray:
+    return np.bincount(summary["item"], weights=values, minlength=len(summary["items"]))
+
+
+def fit_linearized(summary: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Least squares of ln(days) on x for every item at once.
+
+    Returns:
+        Per-item arrays: n, c, Ea, their standard errors c_se / Ea_se, and r2_log.
+        Items with fewer than MIN_ROWS rows or a single temperature are NaN.
+    """
+    item = summary["item"]
+    count = summary["count"]
+    x = _inverse_temperature_term(summary["temperature"])
+
+    n = _per_item(summary, count)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = _per_item(summary, count * x) / n
+        y_mean = _per_item(summary, summary["sum_log"]) / n
+        dx = x - x_mean[item]
+        # Centered sums, so the tiny spread of x does not cancel against its mean
+        sxx = _per_item(summary, count * dx * dx)
+        sxy = _per_item(summary, dx * (summary["sum_log"] - count * y_mean[item]))
+        Ea = sxy / sxx
+        c = y_mean - Ea * x_mean
+
+        # Residual and total sums of squares from the per-group sums
+        pred = c[item] + Ea[item] * x
+        sse = _per_item(summary, summary["sum_log_sq"] - 2.0 * pred * summary["sum_log"] + count * pred * pred)
+        sst = _per_item(summary, summary["sum_log_sq"]) - n * y_mean * y_mean
+        s2 = np.maximum(sse, 0.0) / (n - 2)
+        usable = (n >= MIN_ROWS) & (sxx > 0)
+        nan = np.full(len(n), np.nan)
+        return {
+            "n": n,
+            "c": np.where(usable, c, nan),
+            "Ea": np.where(usable, Ea, nan),
+            "c_se": np.where(usable, np.sqrt(s2 * (1.0 / n + x_mean * x_mean / sxx)), nan),
+            "Ea_se": np.where(usable, np.sqrt(s2 / sxx), nan),
+            "r2_log": np.where(usable, 1.0 - sse / sst, nan),
+        }
+
+
+def _sse_days(summary: Dict[str, Any], x: np.ndarray, c: np.ndarray, Ea: np.ndarray) -> np.ndarray:
+    f = np.exp(c[summary["item"]] + Ea[summary["item"]] * x)
+    return _per_item(summary, summary["sum_days_sq"] - 2.0 * f * summary["sum_days"] + summary["count"] * f * f)
+
+
+def refine_nonlinear(
+    summary: Dict[str, Any],
+    c: np.ndarray,
+    Ea: np.ndarray,
+    max_iter: int = 100,
+    tol: float = 1e-12,
+) -> Dict[str, np.ndarray]:
+    """
+    Levenberg-Marquardt on sum((days - exp(c + Ea * x))^2), all items at once.
+
+    Every iteration assembles each item's 2x2 normal equations from the group
+    sums and takes one damped step per item; a step is kept only if it lowers
+    that item's error. NaN starting points stay NaN.
+
+    Returns:
+        Per-item arrays: c, Ea, c_se, Ea_se, rmse_days, iterations and converged
+    """
+    item = summary["item"]
+    count = summary["count"]
+    x = _inverse_temperature_term(summary["temperature"])
+    n = _per_item(summary, count)
+
+    c, Ea = c.copy(), Ea.copy()
+    active = np.isfinite(c) & np.isfinite(Ea)
+    c[~active] = 0.0
+    Ea[~active] = 0.0
+    damping = np.full(len(c), 1e-3)
+    iterations = np.zeros(len(c), dtype=np.int64)
+    converged = ~active
+    sse = _sse_days(summary, x, c, Ea)
+
+    def normal_equations(c, Ea):
+        f = np.exp(c[item] + Ea[item] * x)
+        # Jacobian columns of f: df/dc = f, df/dEa = f * x; residual sums from the group sums
+        residual = summary["sum_days"] - count * f
+        return (
+            _per_item(summary, count * f * f),
+            _per_item(summary, count * f * f * x),
+            _per_item(summary, count * f * f * x * x),
+            _per_item(summary, f * residual),
+            _per_item(summary, f * x * residual),
+        )
+
+    for _ in range(max_iter):
+        if converged.all():
+            break
+        jcc, jce, jee, gc, ge = normal_equations(c, Ea)
+        # Marquardt scaling (damping * diag) keeps the step independent of the
+        # very different scales of c and Ea
+        dcc, dee = jcc * (1.0 + damping), jee * (1.0 + damping)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            det = dcc * dee - jce * jce
+            step_c = (gc * dee - jce * ge) / det
+            step_Ea = (dcc * ge - jce * gc) / det
+            c_new = np.where(converged, c, c + step_c)
+            Ea_new = np.where(converged, Ea, Ea + step_Ea)
+            sse_new = _sse_days(summary, x, c_new, Ea_new)
+
+        better = ~converged & np.isfinite(sse_new) & (sse_new <= sse)
+        iterations += ~converged
+        small = better & (sse - sse_new <= tol * np.maximum(sse, 1e-300))
+        c = np.where(better, c_new, c)
+        Ea = np.where(better, Ea_new, Ea)
+        sse = np.where(better, sse_new, sse)
+        damping = np.where(better, damping / 10.0, damping * 10.0)
+        converged |= small | (damping > 1e12)
+
+    # Covariance s^2 (J^T J)^-1 at the solution
+    jcc, jce, jee, _, _ = normal_equations(c, Ea)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        det = jcc * jee - jce * jce
+        s2 = sse / (n - 2)
+        nan = np.full(len(c), np.nan)
+        return {
+            "c": np.where(active, c, nan),
+            "Ea": np.where(active, Ea, nan),
+            "c_se": np.where(active, np.sqrt(s2 * jee / det), nan),
+            "Ea_se": np.where(active, np.sqrt(s2 * jcc / det), nan),
+            "rmse_days": np.where(active, np.sqrt(sse / n), nan),
+            "iterations": iterations,
+            "converged": converged & active,
+        }
+
+
+def fit_kinetics(summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Linearized fit, nonlinear refinement and sanity checks for every item.
+
+    Returns:
+        Mapping of item name to its fit: status ("fitted" or why it was rejected),
+        Ea, A, life_days_at_ref, Ea_sd, log_k_ref_sd, rows, temperature range,
+        rmse_days, r2_log, iterations and the linear estimate for comparison
+    """
+    linear = fit_linearized(summary)
+    refined = refine_nonlinear(summary, linear["c"], linear["Ea"])
+
+    item = summary["item"]
+    n_items = len(summary["items"])
+    t_min = np.full(n_items, np.inf)
+    t_max = np.full(n_items, -np.inf)
+    np.minimum.at(t_min, item, summary["temperature"])
+    np.maximum.at(t_max, item, summary["temperature"])
+
+    fits = {}
+    for i, name in enumerate(summary["items"]):
+        c, Ea, c_se, Ea_se = (refined[key][i] for key in ("c", "Ea", "c_se", "Ea_se"))
+        method = "nonlinear"
+        if not (np.isfinite(Ea) and EA_BOUNDS[0] <= Ea <= EA_BOUNDS[1] and np.isfinite(Ea_se)):
+            # Fall back to the linearized estimate if only the refinement went wrong
+            c, Ea, c_se, Ea_se = (linear[key][i] for key in ("c", "Ea", "c_se", "Ea_se"))
+            method = "linear"
+
+        if linear["n"][i] < MIN_ROWS or t_min[i] == t_max[i]:
+            status = f"needs at least {MIN_ROWS} rows at two or more temperatures"
+        elif not (np.isfinite(Ea) and EA_BOUNDS[0] <= Ea <= EA_BOUNDS[1]):
+            status = f"Ea {Ea / 1000:.1f} kJ/mol outside {EA_BOUNDS[0] / 1000:g}-{EA_BOUNDS[1] / 1000:g}"
+        else:
+            status = "fitted"
+
+        fits[name] = {
+            "status": status,
+            "method": method,
+            "Ea": float(Ea),
+            # k_ref = exp(-c) and A = k_ref * exp(Ea / (R * T_ref))
+            "A": float(np.exp(Ea / (R * T_REF_K) - c)),
+            "life_days_at_ref": float(np.exp(c)),
+            "Ea_sd": float(Ea_se),
+            "log_k_ref_sd": float(c_se),
+            "rows": int(linear["n"][i]),
+            "temperature_range": [float(t_min[i]), float(t_max[i])],
+            "rmse_days": float(refined["rmse_days"][i]),
+            "r2_log": float(linear["r2_log"][i]),
+            "iterations": int(refined["iterations"][i]),
+            "converged": bool(refined["converged"][i]),
+            "linear": {"Ea": float(linear["Ea"][i]), "life_days_at_ref": float(np.exp(linear["c"][i]))},
+        }
+    return fits
+
+
+def registry_items(
+    fits: Dict[str, Dict[str, Any]],
+    base_data: Dict[str, Dict[str, Any]] = KINETIC_DATA,
+    base_uncertainty: Dict[str, Dict[str, float]] = KINETIC_UNCERTAINTY,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    kinetics.json items: the built-in parameters, overridden by every accepted fit.
+
+    Built-in items keep their order and metric; new items are appended. Fitted
+    items carry their reference life (1/k_ref), which the hybrid model uses.
+    """
+    items = {
+        name: {**{key: data[key] for key in ("Ea", "A", "metric")}, **base_uncertainty[name], "source": "builtin"}
+        for name, data in base_data.items()
+    }
+    for name, fit in fits.items():
+        if fit["status"] != "fitted":
+            continue
+        items[name] = {
+            "Ea": fit["Ea"],
+            "A": fit["A"],
+            "metric": base_data.get(name, {}).get("metric", FITTED_METRIC),
+            "Ea_sd": fit["Ea_sd"],
+            "log_k_ref_sd": fit["log_k_ref_sd"],
+            "ref_life_days": fit["life_days_at_ref"],
+            "source": "fitted",
+        }
+    return items
+
+
+def fit_dataset(path: str, humidity_correction: bool = False, chunk_rows: int = 1_000_000) -> Dict[str, Any]:
+    """
+    Summarize and fit a dataset.
+
+    Returns:
+        Report with the data summary, per-item fits, timings, and the
+        kinetics.json "items" that publishing would write
+    """
+    timings = {}
+    start = time.perf_counter()
+    summary = summarize_observations(path, humidity_correction, chunk_rows)
+    timings["summarize_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    fits = fit_kinetics(summary)
+    timings["fit_s"] = time.perf_counter() - start
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data": {
+            "path": os.path.abspath(path),
+            "rows": summary["rows"],
+            "skipped_rows": summary["skipped_rows"],
+            "groups": len(summary["item"]),
+        },
+        "humidity_correction": humidity_correction,
+        "timings_s": timings,
+        "fits": fits,
+        "items": registry_items(fits),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit Arrhenius Ea/A per item and publish them to the kinetics registry")
+    parser.add_argument("data", nargs="?", default="fruit_veg_shelf_life.csv", help=".csv or .parquet dataset")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--humidity-correction", action="store_true",
+                        help="Fit the days at the optimal humidity (observed days / hy.humidity_factor)")
+    parser.add_argument("--publish", action="store_true", help="Write a new registry version and make it current")
+    parser.add_argument("--no-activate", action="store_true", help="With --publish: write the version but keep CURRENT")
+    parser.add_argument("--registry-dir", default=REGISTRY_DIR)
+    args = parser.parse_args()
+
+    report = fit_dataset(args.data, humidity_correction=args.humidity_correction, chunk_rows=args.chunk_rows)
+    data = report["data"]
+    print(f"Rows:   {data['rows']:,} ({data['skipped_rows']} skipped) in {data['groups']} item x temperature groups")
+    print("Time:   " + "  ".join(f"{k}={v * 1000:.1f}ms" for k, v in report["timings_s"].items()))
+    print(f"{'item':<12}{'rows':>6}{'T range':>10}{'linear Ea':>11}{'Ea kJ/mol':>15}{'life@5C':>9}"
+          f"{'rmse d':>8}{'R2 log':>8}{'iter':>6}  status")
+    for name, fit in report["fits"].items():
+        t0, t1 = fit["temperature_range"]
+        print(f"{name:<12}{fit['rows']:>6}{f'{t0:g}..{t1:g}':>10}{fit['linear']['Ea'] / 1000:>11.1f}"
+              f"{fit['Ea'] / 1000:>9.1f} ±{fit['Ea_sd'] / 1000:>4.1f}{fit['life_days_at_ref']:>9.1f}"
+              f"{fit['rmse_days']:>8.2f}{fit['r2_log']:>8.3f}{fit['iterations']:>6}  {fit['status']}")
+
+    if args.publish:
+        items = report.pop("items")
+        version = KineticsRegistry(args.registry_dir).publish(items, report, activate=not args.no_activate)
+        print(f"Published {version} to {args.registry_dir}" + ("" if args.no_activate else " (current)"))
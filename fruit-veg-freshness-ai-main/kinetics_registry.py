@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from shelf_life_predictor import KineticParameters, get_kinetics, set_kinetics
+
+# Versioned kinetic parameter sets, published by kinetics_fitting.py:
+#
+#   models/kinetics/<version>/kinetics.json   parameters of every served item
+#   models/kinetics/<version>/report.json     how they were obtained
+#   models/kinetics/CURRENT                   the version servers should use
+#
+# A version directory is written under a temporary name and renamed into place,
+# and CURRENT is replaced atomically, so readers never see a partial version.
+# Running servers poll CURRENT (KineticsReloader) and swap versions in place.
+#
+#   python kinetics_registry.py --list
+#   python kinetics_registry.py --activate 20250101T120000Z-1a2b3c4d   # roll back
+
+REGISTRY_DIR = os.getenv("FRESHNESS_KINETICS_DIR", "models/kinetics")
+CURRENT_FILE = "CURRENT"
+PARAMETERS_FILE = "kinetics.json"
+REPORT_FILE = "report.json"
+
+# Fields of every item in kinetics.json (ref_life_days is optional)
+ITEM_FIELDS = ("Ea", "A", "metric", "Ea_sd", "log_k_ref_sd")
+
+
+def kinetics_from_items(
+    items: Dict[str, Dict[str, Any]], version: str, source: Optional[str] = None
+) -> KineticParameters:
+    """
+    Validate a kinetics.json item mapping and build the parameter version.
+
+    Raises:
+        ValueError: If an item lacks a field or has a non-physical value
+    """
+    if not items:
+        raise ValueError("No items")
+    data: Dict[str, Dict[str, Any]] = {}
+    uncertainty: Dict[str, Dict[str, float]] = {}
+    for name, item in items.items():
+        missing = [field for field in ITEM_FIELDS if field not in item]
+        if missing:
+            raise ValueError(f"Item '{name}' is missing {missing}")
+        Ea, A = float(item["Ea"]), float(item["A"])
+        Ea_sd, log_k_ref_sd = float(item["Ea_sd"]), float(item["log_k_ref_sd"])
+        if not (math.isfinite(Ea) and math.isfinite(A) and Ea > 0 and A > 0):
+            raise ValueError(f"Item '{name}': Ea and A must be positive (got Ea={Ea}, A={A})")
+        if not (math.isfinite(Ea_sd) and math.isfinite(log_k_ref_sd) and Ea_sd >= 0 and log_k_ref_sd >= 0):
+            raise ValueError(f"Item '{name}': Ea_sd and log_k_ref_sd must be non-negative")
+        data[name] = {"Ea": Ea, "A": A, "metric": str(item["metric"])}
+        if item.get("ref_life_days") is not None:
+            data[name]["ref_life_days"] = float(item["ref_life_days"])
+        uncertainty[name] = {"Ea_sd": Ea_sd, "log_k_ref_sd": log_k_ref_sd}
+    return KineticParameters(data, uncertainty, version=version, source=source)
+
+
+class KineticsRegistry:
+    """Versioned kinetics.json files under one directory, plus the CURRENT pointer."""
+
+    def __init__(self, root: str = REGISTRY_DIR):
+        self.root = root
+
+    def path(self, version: str, filename: str = PARAMETERS_FILE) -> str:
+        return os.path.join(self.root, version, filename)
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first (names start with a UTC timestamp)."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isfile(self.path(name)))
+
+    def current_version(self) -> Optional[str]:
+        """Version named by CURRENT, or None if nothing was activated yet."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def read_items(self, version: str) -> Dict[str, Dict[str, Any]]:
+        with open(self.path(version)) as f:
+            return json.load(f)["items"]
+
+    def read_report(self, version: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(version, REPORT_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, version: str) -> KineticParameters:
+        """Read and validate one version."""
+        return kinetics_from_items(self.read_items(version), version, source=os.path.abspath(self.path(version)))
+
+    def publish(
+        self,
+        items: Dict[str, Dict[str, Any]],
+        report: Optional[Dict[str, Any]] = None,
+        activate: bool = True,
+    ) -> str:
+        """
+        Write a new version (and make it CURRENT unless activate is False).
+
+        The items are validated first, so a version that would not load is never
+        published.
+
+        Returns:
+            The new version name
+        """
+        body = json.dumps(items, sort_keys=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        version = f"{stamp}-{hashlib.sha1(body.encode()).hexdigest()[:8]}"
+        kinetics_from_items(items, version)
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = os.path.join(self.root, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(staging)
+        with open(os.path.join(staging, PARAMETERS_FILE), "w") as f:
+            json.dump({"version": version, "items": items}, f, indent=2)
+        if report is not None:
+            with open(os.path.join(staging, REPORT_FILE), "w") as f:
+                json.dump(dict(report, version=version), f, indent=2, default=str)
+        os.rename(staging, os.path.join(self.root, version))
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """Atomically point CURRENT at a published version (also used to roll back)."""
+        if not os.path.isfile(self.path(version)):
+            raise ValueError(f"Unknown kinetics version '{version}' in {self.root}")
+        staging = os.path.join(self.root, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+        with open(staging, "w") as f:
+            f.write(version + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staging, os.path.join(self.root, CURRENT_FILE))
+
+
+class KineticsReloader:
+    """
+    Keeps this process serving the registry's CURRENT version.
+
+    A new version is read, validated and has its derived objects built (for
+    everything the outgoing version had built) before it is made active, and
+    the swap itself is one reference assignment (set_kinetics). Requests never
+    wait on a reload and never see a half-built version. A version that fails
+    to load is reported once and the active version keeps serving. A swap
+    callback that fails leaves the new version active and is recorded in
+    last_error (and status()), since that state now lags the parameters.
+    """
+
+    def __init__(
+        self,
+        registry: KineticsRegistry,
+        on_swap: Iterable[Callable[[KineticParameters, KineticParameters], None]] = (),
+    ):
+        """
+        Args:
+            registry: Where versions are published
+            on_swap: Called as callback(new, previous) right after each swap, for
+                state that is not derived from the parameters alone
+        """
+        self.registry = registry
+        self.on_swap = list(on_swap)
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._failed_version: Optional[str] = None
+        self._reloading = False
+
+    def pending_version(self) -> Optional[str]:
+        """CURRENT, if it names a version other than the active one (and not one that failed)."""
+        version = self.registry.current_version()
+        if version is None or version == get_kinetics().version or version == self._failed_version:
+            return None
+        return version
+
+    def prepare(self, version: str) -> Optional[KineticParameters]:
+        """Load `version` and build its derived objects; None (with a warning) if it is unusable."""
+        try:
+            kinetics = self.registry.load(version)
+            kinetics.warm_from(get_kinetics())
+        except Exception as e:
+            self._failed_version = version
+            self.last_error = f"{version}: {type(e).__name__}: {e}"
+            print(f"Warning: could not load kinetics version {self.last_error}; "
+                  f"still serving {get_kinetics().version}")
+            return None
+        return kinetics
+
+    def install(self, kinetics: KineticParameters) -> KineticParameters:
+        """Make a prepared version active and run the on_swap callbacks; returns the previous version."""
+        previous = set_kinetics(kinetics)
+        self.loaded_at = time.time()
+        self.last_error = None
+        self._failed_version = None
+        failures = []
+        for callback in self.on_swap:
+            try:
+                callback(kinetics, previous)
+            except Exception as e:
+                failures.append(f"{getattr(callback, '__name__', callback)}: {type(e).__name__}: {e}")
+                print(f"Warning: kinetics swap callback {failures[-1]}")
+        if failures:
+            self.last_error = f"{kinetics.version} is active but swap callbacks failed: " + "; ".join(failures)
+        print(f"Kinetics version {kinetics.version} active (was {previous.version})")
+        return previous
+
+    def reload(self) -> bool:
+        """Switch to CURRENT if it changed, blocking the caller (startup and scripts)."""
+        version = self.pending_version()
+        kinetics = self.prepare(version) if version else None
+        if kinetics is None:
+            return False
+        self.install(kinetics)
+        return True
+
+    async def reload_async(self) -> bool:
+        """
+        reload() for the event loop: file reads and builds run in the default
+        executor, the swap and callbacks on the loop, between requests.
+
+        Returns:
+            True if a new version became active
+        """
+        if self._reloading:
+            return False
+        self._reloading = True
+        try:
+            loop = asyncio.get_running_loop()
+            version = await loop.run_in_executor(None, self.pending_version)
+            kinetics = await loop.run_in_executor(None, self.prepare, version) if version else None
+            if kinetics is None:
+                return False
+            self.install(kinetics)
+            return True
+        finally:
+            self._reloading = False
+
+    async def watch(self, interval_s: float) -> None:
+        """Poll CURRENT every `interval_s` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval_s)
+            try:
+                await self.reload_async()
+            except Exception as e:
+                print(f"Warning: kinetics reload check failed ({type(e).__name__}: {e})")
+
+    def status(self) -> Dict[str, Any]:
+        kinetics = get_kinetics()
+        return {
+            "version": kinetics.version,
+            "source": kinetics.source,
+            "items": len(kinetics.data),
+            "loaded_at": self.loaded_at,
+            "registry": os.path.abspath(self.registry.root),
+            "registry_current": self.registry.current_version(),
+            "last_error": self.last_error,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List, inspect and activate published kinetics versions")
+    parser.add_argument("--registry-dir", default=REGISTRY_DIR)
+    parser.add_argument("--list", action="store_true", help="List published versions")
+    parser.add_argument("--show", metavar="VERSION", help="Print the parameters of a version ('current' for CURRENT)")
+    parser.add_argument("--activate", metavar="VERSION", help="Make VERSION current (servers pick it up on their next poll)")
+    args = parser.parse_args()
+
+    registry = KineticsRegistry(args.registry_dir)
+    if args.activate:
+        registry.activate(args.activate)
+        print(f"CURRENT -> {args.activate}")
+    if args.show:
+        version = registry.current_version() if args.show == "current" else args.show
+        if version is None:
+            parser.exit(1, "No version is current\n")
+        kinetics = registry.load(version)
+        print(f"{version}: {len(kinetics.data)} items")
+        print(f"{'item':<13}{'Ea kJ/mol':>11}{'A 1/day':>11}{'life@5C':>9}{'Ea_sd':>8}{'lnk_sd':>8}")
+        for name, data in kinetics.data.items():
+            spread = kinetics.uncertainty[name]
+            life_ref = 1.0 / kinetics.table["k_ref"][kinetics.table["index"][name]]
+            print(f"{name:<13}{data['Ea'] / 1000:>11.1f}{data['A']:>11.2e}{life_ref:>9.1f}"
+                  f"{spread['Ea_sd'] / 1000:>8.1f}{spread['log_k_ref_sd']:>8.2f}")
+    if args.list or not (args.activate or args.show):
+        current = registry.current_version()
+        for version in registry.versions():
+            report = registry.read_report(version) or {}
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {report.get('data', {}).get('path', '')}")
+        if not registry.versions():
+            print(f"No versions in {registry.root}")
@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# Non-interactive load generator for the API.
+#
+#   python load_test.py --concurrency 32 --duration 20               # in-process app, stand-in model
+#   python load_test.py --url http://127.0.0.1:8000 --concurrency 64  # running uvicorn server
+#
+# Needs httpx (and OpenCV to generate the synthetic photos).
+
+DEFAULT_MIX = "scan=0.6,shelf_life=0.3,items=0.1"
+DEFAULT_IMAGE_SIZES = "640x480,1920x1080,4032x3024"
+SHELF_LIFE_ITEMS = ["apple", "banana", "tomato", "potato", "carrot", "mango", "strawberry"]
+
+
+class StandInModel:
+    """
+    Replaces the Keras model for in-process runs.
+
+    Scores are the mean pixel value; each predict call sleeps for a fixed
+    overhead plus a per-image cost, roughly like a small CNN on CPU, so the
+    batcher and executor see realistic timing without TensorFlow.
+    """
+
+    def __init__(self, batch_overhead_ms: float = 4.0, per_image_ms: float = 0.5):
+        self.batch_overhead_s = batch_overhead_ms / 1000.0
+        self.per_image_s = per_image_ms / 1000.0
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        time.sleep(self.batch_overhead_s + self.per_image_s * len(images))
+        return images.reshape(len(images), -1).mean(axis=1, keepdims=True)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("scan", "shelf_life", "items"):
+            raise ValueError(f"Unknown request kind '{name}' (expected scan, shelf_life or items)")
+        mix[name] = float(weight)
+    return mix
+
+
+def make_images(sizes: str, variants: int = 3) -> List[Tuple[str, bytes]]:
+    """JPEG-encoded synthetic photos, `variants` per size."""
+    import cv2
+    from benchmark_preprocessing import synthetic_photo
+
+    images = []
+    for size in sizes.split(","):
+        width, height = (int(v) for v in size.lower().split("x"))
+        for seed in range(variants):
+            photo = synthetic_photo(width, height, seed=seed)
+            data = cv2.imencode(".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+            images.append((size, data))
+    return images
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        client: Any,
+        mix: Dict[str, float],
+        images: List[Tuple[str, bytes]],
+        unique_images: bool = True,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            client: httpx.AsyncClient pointed at the app
+            mix: Relative weights per request kind
+            images: (label, JPEG bytes) pool for scans
+            unique_images: Append random bytes after the JPEG end marker so every
+                upload has a new hash and misses the scan cache
+            seed: Random seed for the request mix
+        """
+        self.client = client
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.images = images
+        self.unique_images = unique_images
+        self.rng = random.Random(seed)
+        # (kind, status or None on transport error, latency seconds)
+        self.records: List[Tuple[str, Optional[int], float]] = []
+
+    async def _request(self, kind: str) -> Tuple[str, int]:
+        if kind == "scan":
+            label, data = self.rng.choice(self.images)
+            if self.unique_images:
+                # Decoders ignore bytes after the JPEG end-of-image marker
+                data = data + os.urandom(8)
+            response = await self.client.post(
+                "/evaluate-freshness", files={"file": ("scan.jpg", data, "image/jpeg")}
+            )
+            return f"scan[{label}]", response.status_code
+        if kind == "shelf_life":
+            body = {
+                "fruit_name": self.rng.choice(SHELF_LIFE_ITEMS),
+                "storage_temperature": round(self.rng.uniform(0, 30), 1),
+            }
+            response = await self.client.post("/predict-shelf-life", json=body)
+            return kind, response.status_code
+        response = await self.client.get("/available-items")
+        return kind, response.status_code
+
+    async def _worker(self, deadline: float, record_after: float) -> None:
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline:
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                label, status = await self._request(kind)
+            except Exception:
+                label, status = kind, None
+            if loop.time() >= record_after:
+                self.records.append((label, status, time.perf_counter() - start))
+
+    async def run(self, concurrency: int, duration_s: float, warmup_s: float) -> float:
+        """Run `concurrency` closed-loop clients; returns the measured wall time."""
+        loop = asyncio.get_running_loop()
+        record_after = loop.time() + warmup_s
+        deadline = record_after + duration_s
+        await asyncio.gather(*(self._worker(deadline, record_after) for _ in range(concurrency)))
+        return loop.time() - record_after
+
+
+def summarize(records: List[Tuple[str, Optional[int], float]], elapsed_s: float) -> Dict[str, Any]:
+    """Throughput, latency percentiles and error rates, per request kind and overall."""
+    groups: Dict[str, List[Tuple[Optional[int], float]]] = {}
+    for label, status, latency in records:
+        groups.setdefault(label, []).append((status, latency))
+        groups.setdefault("all", []).append((status, latency))
+
+    summary = {}
+    for label in sorted(groups, key=lambda g: (g == "all", g)):
+        statuses = [s for s, _ in groups[label]]
+        latencies_ms = np.array([l for _, l in groups[label]]) * 1000.0
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        summary[label] = {
+            "requests": len(statuses),
+            "throughput_rps": len(statuses) / elapsed_s,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(latencies_ms.max()),
+            "error_rate": sum(s is None or s >= 400 for s in statuses) / len(statuses),
+            # 503s are admission-control rejections (queue full / model loading)
+            "rejected_rate": sum(s == 503 for s in statuses) / len(statuses),
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    header = (
+        f"{'request':<22}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}{'errors':>8}{'503s':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for label, s in summary.items():
+        print(
+            f"{label:<22}{s['requests']:>8}{s['throughput_rps']:>9.1f}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}"
+            f"{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}{s['error_rate']:>8.1%}{s['rejected_rate']:>7.1%}"
+        )
+
+
+async def run_in_process(args: argparse.Namespace, images: List[Tuple[str, bytes]]) -> Tuple[Dict[str, Any], float]:
+    import httpx
+
+    if args.stand_in:
+        # The stand-in model lives in this process, so scans must use the thread executor
+        os.environ["FRESHNESS_EXECUTOR"] = "thread"
+    import main
+    from model_manager import READY
+
+    if args.stand_in:
+        main.model_manager.model = StandInModel(args.stand_in_batch_ms, args.stand_in_image_ms)
+        main.model_manager.state = READY
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            generator = LoadGenerator(client, parse_mix(args.mix), images, not args.allow_cache_hits, args.seed)
+            elapsed = await generator.run(args.concurrency, args.duration, args.warmup)
+    return summarize(generator.records, elapsed), elapsed
+
+
+async def run_remote(args: argparse.Namespace, images: List[Tuple[str, bytes]]) -> Tuple[Dict[str, Any], float]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        generator = LoadGenerator(client, parse_mix(args.mix), images, not args.allow_cache_hits, args.seed)
+        elapsed = await generator.run(args.concurrency, args.duration, args.warmup)
+    return summarize(generator.records, elapsed), elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load generator for the freshness API")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive main.app in-process)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent closed-loop clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unrecorded warmup traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--image-sizes", default=DEFAULT_IMAGE_SIZES, help="Comma-separated WIDTHxHEIGHT list")
+    parser.add_argument("--allow-cache-hits", action="store_true", help="Re-send identical image bytes")
+    parser.add_argument("--no-stand-in", dest="stand_in", action="store_false",
+                        help="In-process: load the real model instead of the stand-in")
+    parser.add_argument("--stand-in-batch-ms", type=float, default=4.0, help="Stand-in model cost per predict call")
+    parser.add_argument("--stand-in-image-ms", type=float, default=0.5, help="Stand-in model cost per image")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the summary to this JSON file")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Exit non-zero above this error rate")
+    args = parser.parse_args()
+
+    images = make_images(args.image_sizes) if parse_mix(args.mix).get("scan") else []
+    runner = run_remote if args.url else run_in_process
+    summary, elapsed = asyncio.run(runner(args, images))
+
+    print(f"{args.concurrency} clients for {elapsed:.1f}s ({'server ' + args.url if args.url else 'in-process'})")
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "elapsed_s": elapsed, "summary": summary}, f, indent=2)
+    sys.exit(1 if summary.get("all", {}).get("error_rate", 1.0) > args.max_error_rate else 0)
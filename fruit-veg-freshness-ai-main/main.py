@@ -1,21 +1,66 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import cv2
+import asyncio
+import functools
+import math
 import numpy as np
-from keras.models import load_model
-import tempfile
 import os
-from typing import Dict, Any, Optional
-import uvicorn
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Union
 
 # Import the shelf life prediction functions from shell.py
-from shelf_life_predictor import predict_shelf_life_api, KINETIC_DATA
+from shelf_life_predictor import (
+    predict_shelf_life_api,
+    predict_shelf_life_batch,
+    shelf_life_matrix,
+    lookup_fruit_ids,
+    normalize_fruit_name,
+    default_baseline_days,
+    remaining_life_from_score,
+    get_kinetics,
+    KineticParameters,
+    T_REF_C,
+)
+from kinetics_registry import KineticsRegistry, KineticsReloader
+# Heavy ML imports (TensorFlow/ONNX Runtime, OpenCV) happen inside ModelManager on demand
+from inference_batcher import MicroBatcher
+from inference_executor import InferenceExecutor, InferenceQueueFull
+from model_manager import ModelManager, ModelNotReady, FAILED
+from shelf_life_tracker import DegradationTracker
+from hybrid_service import DEFAULT_ALPHA, get_hybrid_service
+from scan_cache import ScanResultCache, scan_cache_key
+from freshness_stream import LatestFrameSlot, ScoreSmoother
+from metrics import (
+    BATCH_SIZE_BUCKETS, HANDLER_DONE_KEY, UPLOAD_SIZE_BUCKETS, MetricsRegistry, RequestMetricsMiddleware
+)
+from memory_stats import process_memory
+from json_responses import FastJSONResponse, StaticJSON, dumps, model_response
+from upload_ingest import MULTIPART_OVERHEAD_BYTES, BodySizeLimitMiddleware, UploadRejected, read_upload
 
 app = FastAPI(
     title="Fruit & Vegetable Freshness API",
     description="API for evaluating fruit/vegetable freshness and predicting shelf life",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson when installed; invariant responses are pre-serialized StaticJSON bodies
+    default_response_class=FastJSONResponse,
+)
+
+# What-if matrix (/predict-shelf-life/matrix): largest temperature grid and how long
+# clients and proxies may reuse a response (after a kinetics swap they may keep the
+# previous version's matrix for up to this long)
+MAX_MATRIX_TEMPERATURES = int(os.getenv("FRESHNESS_MAX_MATRIX_TEMPERATURES", "1001"))
+MATRIX_MAX_AGE_S = int(os.getenv("FRESHNESS_MATRIX_MAX_AGE_S", "3600"))
+
+# Largest accepted image upload (or stream frame); bigger request bodies get a 413
+# before they are read
+MAX_UPLOAD_BYTES = int(float(os.getenv("FRESHNESS_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_bytes=MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    path_prefixes=("/evaluate-freshness",),
 )
 
 # Add CORS middleware
@@ -27,12 +72,121 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load the model at startup
-try:
-    model = load_model('rottenvsfresh98pval.h5')
-except Exception as e:
-    print(f"Warning: Could not load model: {e}")
-    model = None
+# Prometheus metrics served on /metrics
+metrics = MetricsRegistry()
+http_requests = metrics.counter(
+    "freshness_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+)
+http_latency = metrics.histogram(
+    "freshness_http_request_duration_seconds", "HTTP request latency by route", ("route",)
+)
+scan_stage_latency = metrics.histogram(
+    "freshness_scan_stage_seconds",
+    "Latency of each /evaluate-freshness stage (read, decode, resize, inference, serialize)",
+    ("stage",),
+)
+batch_sizes = metrics.histogram(
+    "freshness_inference_batch_size", "Images per model.predict call", buckets=BATCH_SIZE_BUCKETS
+)
+batch_latency = metrics.histogram("freshness_inference_batch_seconds", "model.predict latency per batch")
+upload_sizes = metrics.histogram(
+    "freshness_upload_bytes", "Size of accepted image uploads (the per-request ingest buffer)", buckets=UPLOAD_SIZE_BUCKETS
+)
+app.add_middleware(
+    RequestMetricsMiddleware, requests=http_requests, latency=http_latency, stages=scan_stage_latency
+)
+
+STARTED_AT = time.time()
+
+# Inference backend: "keras" (.h5), "tflite" or "onnx" (see export_model.py)
+MODEL_BACKEND = os.getenv("FRESHNESS_BACKEND", "keras")
+MODEL_PATH = os.getenv("FRESHNESS_MODEL_PATH") or None
+
+# Model loading: "background" (default; live immediately, ready after load + warmup),
+# "eager" (startup waits for the model) or "lazy" (first scan loads it)
+MODEL_LOAD_MODE = os.getenv("FRESHNESS_MODEL_LOAD", "background")
+MODEL_WARMUP = os.getenv("FRESHNESS_WARMUP", "1").lower() not in ("0", "false", "no")
+
+# Micro-batching settings: concurrent uploads are stacked into one model.predict call
+MAX_BATCH_SIZE = int(os.getenv("FRESHNESS_MAX_BATCH_SIZE", "32"))
+MAX_BATCH_WAIT_MS = float(os.getenv("FRESHNESS_MAX_BATCH_WAIT_MS", "5"))
+
+# Inference executor settings: decode and predict run off the event loop, and at most
+# FRESHNESS_MAX_PENDING scans may be in flight before new ones get a 503
+EXECUTOR_MODE = os.getenv("FRESHNESS_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(os.getenv("FRESHNESS_EXECUTOR_WORKERS", "0")) or None
+# Intra-op threads for the in-process model (0 = library default); serve.py sets this per worker
+MODEL_THREADS = int(os.getenv("FRESHNESS_MODEL_THREADS", "0")) or None
+MAX_PENDING = int(os.getenv("FRESHNESS_MAX_PENDING", "64"))
+RETRY_AFTER_S = int(os.getenv("FRESHNESS_RETRY_AFTER_S", "1"))
+
+# Scan result cache: re-uploads of identical bytes skip decode and inference.
+# FRESHNESS_CACHE_DB adds a SQLite tier that survives restarts.
+CACHE_MAX_ENTRIES = int(os.getenv("FRESHNESS_CACHE_SIZE", "1024"))
+CACHE_TTL_S = float(os.getenv("FRESHNESS_CACHE_TTL_S", "3600"))
+CACHE_DB_PATH = os.getenv("FRESHNESS_CACHE_DB") or None
+
+# Live camera stream: weight of the newest frame in the rolling (EMA) score
+STREAM_SMOOTHING = float(os.getenv("FRESHNESS_STREAM_SMOOTHING", "0.3"))
+
+# Crate heatmaps: largest rows x cols grid scored in one forward pass
+MAX_CRATE_TILES = int(os.getenv("FRESHNESS_MAX_CRATE_TILES", "256"))
+
+# Kinetic parameters: the kinetics registry's CURRENT version (kinetics_fitting.py
+# --publish) if there is one, else the built-in table. The registry is checked every
+# FRESHNESS_KINETICS_POLL_S seconds (0 = only at startup and on /kinetics/reload)
+# and a new version is swapped in without a restart.
+KINETICS_POLL_S = float(os.getenv("FRESHNESS_KINETICS_POLL_S", "10"))
+
+executor = InferenceExecutor(
+    mode=EXECUTOR_MODE,
+    max_workers=EXECUTOR_WORKERS,
+    max_pending=MAX_PENDING,
+    retry_after_s=RETRY_AFTER_S,
+    backend=MODEL_BACKEND,
+    model_path=MODEL_PATH,
+)
+
+model_manager = ModelManager(
+    backend=MODEL_BACKEND,
+    model_path=MODEL_PATH,
+    warmup=MODEL_WARMUP,
+    warmup_batch_sizes=sorted({1, MAX_BATCH_SIZE}),
+    executor=executor,
+    version=os.getenv("FRESHNESS_MODEL_VERSION") or None,
+    num_threads=MODEL_THREADS,
+)
+# In "thread" mode the executor predicts through the manager's in-process model
+executor.model = model_manager
+
+batcher = MicroBatcher(
+    predict_fn=executor.predict,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_BATCH_WAIT_MS,
+    on_batch=lambda size, seconds: (batch_sizes.observe(size), batch_latency.observe(seconds)),
+)
+
+scan_cache = ScanResultCache(max_entries=CACHE_MAX_ENTRIES, ttl_s=CACHE_TTL_S, db_path=CACHE_DB_PATH)
+
+metrics.gauge("freshness_inference_pending", "Scans admitted and not yet finished", lambda: executor.pending)
+metrics.gauge("freshness_batcher_queue_depth", "Images waiting for the next batch", lambda: batcher.queue_depth)
+metrics.gauge(
+    "freshness_inference_rejected_total", "Scans rejected because the queue was full",
+    lambda: executor.rejected, kind="counter",
+)
+metrics.gauge("freshness_model_ready", "1 once the model is loaded and warmed up", lambda: int(model_manager.ready))
+metrics.gauge("freshness_model_load_seconds", "Time spent loading the model", lambda: model_manager.load_time_s)
+metrics.gauge("freshness_model_warmup_seconds", "Time spent warming up the model", lambda: model_manager.warmup_time_s)
+metrics.gauge(
+    "freshness_scan_cache_hits_total", "Scan cache hits (memory and disk)",
+    lambda: scan_cache.memory_hits + scan_cache.disk_hits, kind="counter",
+)
+metrics.gauge("freshness_scan_cache_misses_total", "Scan cache misses", lambda: scan_cache.misses, kind="counter")
+# Under serve.py's multi-worker mode rss double-counts the copy-on-write pages shared
+# with the other workers; pss and uss do not
+metrics.gauge("freshness_process_rss_bytes", "Resident memory of this worker", lambda: process_memory().get("rss"))
+metrics.gauge("freshness_process_pss_bytes", "Proportional set size of this worker", lambda: process_memory().get("pss"))
+metrics.gauge("freshness_process_uss_bytes", "Memory private to this worker", lambda: process_memory().get("uss"))
 
 # Pydantic models for request/response
 class FreshnessResponse(BaseModel):
@@ -41,6 +195,23 @@ class FreshnessResponse(BaseModel):
     confidence: float
     message: str
 
+class CrateTile(BaseModel):
+    row: int
+    col: int
+    prediction_score: float
+    freshness_category: str
+
+class CrateFreshnessResponse(BaseModel):
+    rows: int
+    cols: int
+    overlap: float
+    # tile_scores[row][col]; tiles overlap by `overlap` of their size
+    tile_scores: List[List[float]]
+    tile_categories: List[List[str]]
+    category_fractions: Dict[str, float]
+    mean_score: float
+    worst_tile: CrateTile
+
 class ShelfLifeRequest(BaseModel):
     fruit_name: str
     storage_temperature: float
@@ -57,6 +228,114 @@ class ShelfLifeResponse(BaseModel):
     # Added: simple characteristic life in days at given temperature
     life_days: float
 
+class ShelfLifeUncertaintyRequest(BaseModel):
+    fruit_name: str
+    storage_temperature: float
+    baseline_shelf_life_days_at_ref: Optional[float] = None
+    current_age_days: float = 0.0
+
+class MonteCarloBands(BaseModel):
+    samples: int
+    percentiles: List[float]
+    # {"p5": ..., "p50": ..., "p95": ...}
+    life_days: Dict[str, float]
+    shelf_life_ratio: Dict[str, float]
+    estimated_shelf_life_days: Optional[Dict[str, float]] = None
+    remaining_days: Optional[Dict[str, float]] = None
+
+class ShelfLifeUncertaintyResponse(BaseModel):
+    product: str
+    storage_temperature: float
+    spoilage_metric: str
+    life_days: float
+    shelf_life_ratio: float
+    estimated_shelf_life_days: Optional[float] = None
+    remaining_days: Optional[float] = None
+    # 5th-95th percentile ranges (None without a baseline)
+    estimated_shelf_life_days_range: Optional[Dict[str, float]] = None
+    remaining_days_range: Optional[Dict[str, float]] = None
+    uncertainty: MonteCarloBands
+
+class RemainingLifeEstimate(BaseModel):
+    product: str
+    storage_temperature: float
+    spoilage_metric: str
+    degradation_rate: float
+    shelf_life_ratio: float
+    # "request" if the client sent baseline_shelf_life_days_at_ref, else "kinetic" (1/k at 5°C)
+    baseline_source: str
+    baseline_shelf_life_days_at_ref: float
+    estimated_shelf_life_days: float
+    estimated_shelf_life_days_range: Dict[str, float]
+    life_consumed_fraction: float
+    effective_age_days: float
+    remaining_days: float
+    remaining_days_range: Dict[str, float]
+
+class ScanShelfLifeResponse(BaseModel):
+    freshness: FreshnessResponse
+    shelf_life: RemainingLifeEstimate
+
+class ShelfLifeBatchRequest(BaseModel):
+    # Columnar layout: row i is (fruit_names[i], storage_temperatures[i], ...)
+    fruit_names: List[str]
+    storage_temperatures: List[float]
+    baseline_shelf_life_days_at_ref: Optional[List[Optional[float]]] = None
+    current_age_days: Optional[List[float]] = None
+    uncertainty_fraction: float = 0.2
+
+# Rows per vectorized chunk when streaming batch results as NDJSON
+BATCH_STREAM_CHUNK = 4096
+
+class TrackedBatchRegistration(BaseModel):
+    batch_ids: List[str]
+    fruit_names: List[str]
+    baseline_shelf_life_days_at_ref: Optional[List[Optional[float]]] = None
+
+class SensorReadingsIngest(BaseModel):
+    # Columnar layout; timestamps are Unix seconds or ISO 8601 strings
+    batch_ids: List[str]
+    timestamps: List[Union[float, datetime]]
+    temperatures: List[float]
+
+class RemainingLifeQuery(BaseModel):
+    batch_ids: List[str]
+    # Temperature assumed from now on; defaults to each batch's latest reading
+    storage_temperature: Optional[float] = None
+
+class HybridShelfLifeRequest(BaseModel):
+    fruit_name: str
+    storage_temperature: float
+    humidity: float
+    # Weight of the Arrhenius estimate; defaults to HYBRID_ALPHA
+    alpha: Optional[float] = None
+
+class HybridShelfLifeResponse(BaseModel):
+    product: str
+    storage_temperature: float
+    humidity: float
+    alpha: float
+    arrhenius_shelf_life_days: float
+    ml_shelf_life_days: float
+    hybrid_shelf_life_days: float
+
+class HybridShelfLifeBatchRequest(BaseModel):
+    fruit_names: List[str]
+    storage_temperatures: List[float]
+    humidities: List[float]
+    alpha: Optional[float] = None
+
+# Running time-temperature integrals for tracked batches
+degradation_tracker = DegradationTracker(get_kinetics().table)
+
+def _retarget_tracker(kinetics: KineticParameters, previous: KineticParameters) -> None:
+    """Tracked batches keep the shelf-life fraction they used and continue with the new rate constants"""
+    degradation_tracker.use_table(kinetics.table)
+
+kinetics_reloader = KineticsReloader(KineticsRegistry(), on_swap=[_retarget_tracker])
+kinetics_reloader.reload()
+_kinetics_watcher: Optional[asyncio.Task] = None
+
 # Helper functions from evaluate-image.py
 def classify_freshness(prediction_score: float) -> Dict[str, Any]:
     """Classify freshness based on prediction score"""
@@ -82,44 +361,101 @@ def classify_freshness(prediction_score: float) -> Dict[str, Any]:
         "confidence": min(max(confidence, 0), 1)  # Ensure confidence is between 0 and 1
     }
 
-def preprocess_image(image_bytes: bytes) -> np.ndarray:
-    """Preprocess image for model prediction"""
-    # Convert bytes to numpy array
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    
-    # Decode image
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    if img is None:
-        raise ValueError("Invalid image format")
-    
-    # Resize and convert color
-    img = cv2.resize(img, (100, 100))
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    
-    # Normalize and expand dimensions
-    img = img / 255.0
-    img = np.expand_dims(img, axis=0)
-    
-    return img
-
 # API Endpoints
 
+ROOT_RESPONSE = StaticJSON({
+    "message": "Fruit & Vegetable Freshness API",
+    "version": "1.0.0",
+    "endpoints": {
+        "freshness_evaluation": "/evaluate-freshness",
+        "freshness_shelf_life": "/evaluate-freshness/shelf-life",
+        "freshness_stream": "/ws/evaluate-freshness",
+        "crate_freshness_heatmap": "/evaluate-freshness/crate",
+        "metrics": "/metrics",
+        "shelf_life_prediction": "/predict-shelf-life",
+        "shelf_life_batch_prediction": "/predict-shelf-life/batch",
+        "shelf_life_matrix": "/predict-shelf-life/matrix",
+        "shelf_life_uncertainty": "/predict-shelf-life/uncertainty",
+        "hybrid_shelf_life_prediction": "/predict-shelf-life/hybrid",
+        "available_items": "/available-items",
+        "kinetics": "/kinetics"
+    }
+})
+
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint with API information"""
-    return {
-        "message": "Fruit & Vegetable Freshness API",
-        "version": "1.0.0",
-        "endpoints": {
-            "freshness_evaluation": "/evaluate-freshness",
-            "shelf_life_prediction": "/predict-shelf-life",
-            "available_items": "/available-items"
-        }
-    }
+    return ROOT_RESPONSE.response(request)
+
+def _model_not_ready_error(e: ModelNotReady) -> HTTPException:
+    """500 if loading failed for good, 503 + Retry-After while it is still in progress"""
+    if e.state == FAILED:
+        return HTTPException(
+            status_code=500,
+            detail=f"Model not loaded. Please check the '{MODEL_BACKEND}' model file exists (FRESHNESS_MODEL_PATH). {e.error}"
+        )
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_S)})
+
+async def _cache_call(fn, *args):
+    """Memory-only cache calls are cheap; SQLite ones go to the default thread pool"""
+    if scan_cache.persistent:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    return fn(*args)
+
+def _require_model() -> None:
+    """Reject scans up front unless the model is ready (or will be loaded on demand)"""
+    if model_manager.ready or (MODEL_LOAD_MODE == "lazy" and model_manager.state != FAILED):
+        return
+    raise _model_not_ready_error(ModelNotReady(model_manager.state, model_manager.error))
+
+async def _scan_upload(file: UploadFile) -> FreshnessResponse:
+    """
+    Read, decode and score one uploaded image (or return its cached result).
+
+    Callers hold an executor.admission() slot and map exceptions to HTTP errors.
+    """
+    # Size-checked and type-sniffed from the content (not the declared content_type)
+    start = time.perf_counter()
+    image_bytes, _ = await read_upload(file, MAX_UPLOAD_BYTES)
+    scan_stage_latency.observe(time.perf_counter() - start, "read")
+    upload_sizes.observe(len(image_bytes))
+
+    # Identical bytes scored by the same model give the same answer
+    cache_key = None
+    if scan_cache.enabled:
+        cache_key = scan_cache_key(image_bytes, model_manager.model_version)
+        cached = await _cache_call(scan_cache.get, cache_key)
+        if cached is not None:
+            return FreshnessResponse(**cached)
+
+    # Preprocess image
+    processed_image, decode_s, resize_s = await executor.run(
+        model_manager.preprocessor(timed=True), image_bytes
+    )
+    scan_stage_latency.observe(decode_s, "decode")
+    scan_stage_latency.observe(resize_s, "resize")
+
+    # Make prediction (batched together with any concurrent requests);
+    # includes the wait for the batch window and for earlier batches
+    start = time.perf_counter()
+    prediction_score = await batcher.submit(processed_image)
+    scan_stage_latency.observe(time.perf_counter() - start, "inference")
+
+    # Classify freshness
+    classification = classify_freshness(prediction_score)
+
+    response = FreshnessResponse(
+        prediction_score=prediction_score,
+        freshness_category=classification["category"],
+        confidence=classification["confidence"],
+        message=classification["message"]
+    )
+    if cache_key is not None:
+        await _cache_call(scan_cache.put, cache_key, response.model_dump())
+    return response
 
 @app.post("/evaluate-freshness", response_model=FreshnessResponse)
-async def evaluate_freshness(file: UploadFile = File(...)):
+async def evaluate_freshness(request: Request, file: UploadFile = File(...)):
     """
     Evaluate the freshness of a fruit or vegetable from an uploaded image.
     
@@ -129,37 +465,293 @@ async def evaluate_freshness(file: UploadFile = File(...)):
     Returns:
         FreshnessResponse with prediction score, category, and confidence
     """
-    if model is None:
-        raise HTTPException(status_code=500, detail="Model not loaded. Please check if 'rottenvsfresh98pval.h5' exists.")
-    
-    # Validate file type
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
+    _require_model()
     
     try:
-        # Read and preprocess image
-        image_bytes = await file.read()
-        processed_image = preprocess_image(image_bytes)
+        with executor.admission():
+            response = await _scan_upload(file)
+        request.scope[HANDLER_DONE_KEY] = time.perf_counter()
+        return model_response(response)
         
-        # Make prediction
-        prediction = model.predict(processed_image, verbose=0)
-        prediction_score = float(prediction[0][0])
-        
-        # Classify freshness
-        classification = classify_freshness(prediction_score)
-        
-        return FreshnessResponse(
-            prediction_score=prediction_score,
-            freshness_category=classification["category"],
-            confidence=classification["confidence"],
-            message=classification["message"]
+    except InferenceQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_s)},
         )
-        
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ModelNotReady as e:
+        raise _model_not_ready_error(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
+@app.post("/evaluate-freshness/shelf-life", response_model=ScanShelfLifeResponse)
+async def evaluate_freshness_shelf_life(
+    request: Request,
+    file: UploadFile = File(...),
+    fruit_name: str = Form(...),
+    storage_temperature: float = Form(...),
+    baseline_shelf_life_days_at_ref: Optional[float] = Form(None),
+    uncertainty_fraction: float = Form(0.2),
+):
+    """
+    Scan an item and estimate its remaining shelf life in one request.
+
+    The freshness score is mapped to the fraction of shelf life already used
+    (an effective age), which is subtracted from the Arrhenius estimate at the
+    storage temperature.
+
+    Args:
+        file: Image file (JPG, PNG, etc.)
+        fruit_name: Produce type (see /available-items)
+        storage_temperature: Storage temperature in Celsius from now on
+        baseline_shelf_life_days_at_ref: Shelf life at 5°C in days (defaults to 1/k at 5°C)
+        uncertainty_fraction: Relative width of the shelf-life ranges (default 0.2)
+
+    Returns:
+        ScanShelfLifeResponse with the freshness result and the remaining-days estimate
+    """
+    _require_model()
+
+    parameters = get_kinetics()
+    fruit_name = normalize_fruit_name(fruit_name)
+    if fruit_name not in parameters.data:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Fruit '{fruit_name}' not found. Available items: {list(parameters.data.keys())}"
+        )
+    if baseline_shelf_life_days_at_ref is not None and not baseline_shelf_life_days_at_ref > 0:
+        raise HTTPException(status_code=400, detail="baseline_shelf_life_days_at_ref must be positive")
+
+    if not math.isfinite(storage_temperature) or storage_temperature <= -273.15:
+        raise HTTPException(
+            status_code=400,
+            detail="storage_temperature must be a finite temperature above absolute zero (-273.15°C)"
+        )
+
+    # Microseconds of arithmetic: done first, so invalid inputs are rejected before the scan
+    baseline = baseline_shelf_life_days_at_ref or default_baseline_days(fruit_name, parameters)
+    try:
+        kinetics = predict_shelf_life_api(
+            fruit_name=fruit_name,
+            temp_c=storage_temperature,
+            baseline_shelf_life_days_at_ref=baseline,
+            uncertainty_fraction=uncertainty_fraction,
+            kinetics=parameters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if kinetics["estimated_shelf_life_days"] is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No shelf-life estimate for '{fruit_name}' at {storage_temperature}°C"
+        )
+
+    try:
+        with executor.admission():
+            freshness = await _scan_upload(file)
+    except InferenceQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ModelNotReady as e:
+        raise _model_not_ready_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+    remaining = remaining_life_from_score(kinetics, freshness.prediction_score)
+    response = ScanShelfLifeResponse(
+        freshness=freshness,
+        shelf_life=RemainingLifeEstimate(
+            product=kinetics["product"],
+            storage_temperature=kinetics["storage_temperature"],
+            spoilage_metric=kinetics["spoilage_metric"],
+            degradation_rate=kinetics["degradation_rate"],
+            shelf_life_ratio=kinetics["shelf_life_ratio"],
+            baseline_source="request" if baseline_shelf_life_days_at_ref else "kinetic",
+            baseline_shelf_life_days_at_ref=baseline,
+            estimated_shelf_life_days=kinetics["estimated_shelf_life_days"],
+            estimated_shelf_life_days_range=kinetics["estimated_shelf_life_days_range"],
+            **remaining,
+        ),
+    )
+    request.scope[HANDLER_DONE_KEY] = time.perf_counter()
+    return model_response(response)
+
+def _crate_heatmap(scores: np.ndarray, rows: int, cols: int, overlap: float) -> CrateFreshnessResponse:
+    """Per-tile categories plus crate-level aggregates for a (rows * cols,) score vector"""
+    categories = [classify_freshness(score)["category"] for score in scores.tolist()]
+    fractions = {category: 0.0 for category in ("FRESH", "MEDIUM FRESH", "NOT FRESH")}
+    for category in categories:
+        fractions[category] += 1.0 / len(categories)
+
+    worst = int(np.argmax(scores))
+    grid = scores.reshape(rows, cols)
+    return CrateFreshnessResponse(
+        rows=rows,
+        cols=cols,
+        overlap=overlap,
+        tile_scores=grid.tolist(),
+        tile_categories=[categories[r * cols:(r + 1) * cols] for r in range(rows)],
+        category_fractions=fractions,
+        mean_score=float(grid.mean()),
+        worst_tile=CrateTile(
+            row=worst // cols,
+            col=worst % cols,
+            prediction_score=float(scores[worst]),
+            freshness_category=categories[worst],
+        ),
+    )
+
+@app.post("/evaluate-freshness/crate", response_model=CrateFreshnessResponse)
+async def evaluate_crate_freshness(
+    file: UploadFile = File(...),
+    rows: int = 4,
+    cols: int = 4,
+    overlap: float = 0.25,
+):
+    """
+    Score a photo of a whole crate as an overlapping grid of tiles.
+
+    All rows x cols tiles go through the model in one batched predict call.
+
+    Args:
+        file: Image file (JPG, PNG, etc.)
+        rows: Number of tile rows
+        cols: Number of tile columns
+        overlap: Fraction of a tile shared with its neighbour (0 to 0.9)
+
+    Returns:
+        CrateFreshnessResponse with the per-tile score grid and aggregate statistics
+    """
+    _require_model()
+
+    if rows < 1 or cols < 1 or rows * cols > MAX_CRATE_TILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"rows and cols must be at least 1 with at most {MAX_CRATE_TILES} tiles in total"
+        )
+
+    from image_preprocessing import preprocess_tiles
+
+    try:
+        with executor.admission():
+            image_bytes, _ = await read_upload(file, MAX_UPLOAD_BYTES)
+            upload_sizes.observe(len(image_bytes))
+            tiles = await executor.run(preprocess_tiles, image_bytes, rows, cols, overlap)
+            start = time.perf_counter()
+            scores = np.asarray(await executor.predict(tiles), dtype=np.float64).reshape(-1)
+            batch_sizes.observe(len(tiles))
+            batch_latency.observe(time.perf_counter() - start)
+        return model_response(_crate_heatmap(scores, rows, cols, overlap))
+
+    except InferenceQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ModelNotReady as e:
+        raise _model_not_ready_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+@app.websocket("/ws/evaluate-freshness")
+async def freshness_stream(websocket: WebSocket, smoothing: float = STREAM_SMOOTHING):
+    """
+    Score a live stream of encoded camera frames (binary messages).
+
+    Only the newest frame is scored when inference falls behind, and frames from
+    all connected clients share the micro-batcher. After each scored frame the
+    server sends a JSON message with the frame score and the smoothed score and
+    category.
+    """
+    await websocket.accept()
+    try:
+        smoother = ScoreSmoother(smoothing)
+        _require_model()
+    except (ValueError, HTTPException) as e:
+        await websocket.send_json({"error": getattr(e, "detail", str(e))})
+        # 1008: policy violation (bad parameters), 1013: try again later
+        await websocket.close(code=1008 if isinstance(e, ValueError) else 1013)
+        return
+
+    slot = LatestFrameSlot()
+    preprocess = model_manager.preprocessor()
+
+    async def receive_frames() -> None:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                frame = message.get("bytes")
+                if frame and len(frame) <= MAX_UPLOAD_BYTES:
+                    slot.put(frame)
+                elif frame:
+                    slot.dropped += 1
+        finally:
+            slot.close()
+
+    receiver = asyncio.create_task(receive_frames())
+    scored = 0
+    try:
+        while True:
+            frame = await slot.take()
+            if frame is None:
+                break
+            start = time.perf_counter()
+            try:
+                with executor.admission():
+                    processed_image = await executor.run(preprocess, frame)
+                    prediction_score = await batcher.submit(processed_image)
+            except InferenceQueueFull:
+                # Overloaded: skip this frame, the next one will be newer anyway
+                slot.dropped += 1
+                continue
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+
+            scored += 1
+            smoothed_score = smoother.update(prediction_score)
+            classification = classify_freshness(smoothed_score)
+            await websocket.send_json({
+                "prediction_score": prediction_score,
+                "smoothed_score": smoothed_score,
+                "freshness_category": classification["category"],
+                "confidence": classification["confidence"],
+                "message": classification["message"],
+                "frames_received": slot.received,
+                "frames_scored": scored,
+                "frames_dropped": slot.dropped,
+                "latency_ms": (time.perf_counter() - start) * 1000.0,
+            })
+    except ModelNotReady as e:
+        await websocket.send_json({"error": str(e)})
+        await websocket.close(code=1013)
+    except (WebSocketDisconnect, RuntimeError):
+        # Client went away while we were sending
+        pass
+    except Exception as e:
+        await websocket.send_json({"error": f"Error processing frame: {str(e)}"})
+        await websocket.close(code=1011)
+    finally:
+        receiver.cancel()
+
 @app.post("/predict-shelf-life", response_model=ShelfLifeResponse)
 async def predict_shelf_life_endpoint(request: ShelfLifeRequest):
     """
@@ -172,10 +764,11 @@ async def predict_shelf_life_endpoint(request: ShelfLifeRequest):
         ShelfLifeResponse with detailed shelf life analysis
     """
     # Validate fruit name
-    fruit_name = request.fruit_name.strip().lower().replace('fresh', '')
+    kinetics = get_kinetics()
+    fruit_name = normalize_fruit_name(request.fruit_name)
     
-    if fruit_name not in KINETIC_DATA:
-        available_items = list(KINETIC_DATA.keys())
+    if fruit_name not in kinetics.data:
+        available_items = list(kinetics.data.keys())
         raise HTTPException(
             status_code=400, 
             detail=f"Fruit '{fruit_name}' not found. Available items: {available_items}"
@@ -186,9 +779,10 @@ async def predict_shelf_life_endpoint(request: ShelfLifeRequest):
         result = predict_shelf_life_api(
             fruit_name=fruit_name,
             temp_c=request.storage_temperature,
+            kinetics=kinetics,
         )
 
-        return ShelfLifeResponse(
+        return model_response(ShelfLifeResponse(
             product=result["product"],
             storage_temperature=result["storage_temperature"],
             spoilage_metric=result["spoilage_metric"],
@@ -198,40 +792,514 @@ async def predict_shelf_life_endpoint(request: ShelfLifeRequest):
             conclusion=result["conclusion"],
             comparison_temperature=result["comparison_temperature"],
             life_days=float(result.get("life_days", 0.0)),
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error predicting shelf life: {str(e)}")
 
-@app.get("/available-items")
-async def get_available_items():
+@app.post("/predict-shelf-life/uncertainty", response_model=ShelfLifeUncertaintyResponse)
+async def predict_shelf_life_uncertainty(request: ShelfLifeUncertaintyRequest):
     """
-    Get list of available fruits and vegetables for shelf life prediction.
+    Shelf life with Monte Carlo percentile bands from the Ea/A uncertainty of each item.
+
+    Args:
+        request: ShelfLifeUncertaintyRequest with fruit_name, storage_temperature and
+            optional baseline_shelf_life_days_at_ref / current_age_days
+
+    Returns:
+        ShelfLifeUncertaintyResponse with point estimates and p5..p95 bands
+    """
+    kinetics = get_kinetics()
+    fruit_name = normalize_fruit_name(request.fruit_name)
+    if fruit_name not in kinetics.data:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Fruit '{fruit_name}' not found. Available items: {list(kinetics.data.keys())}"
+        )
+
+    try:
+        result = predict_shelf_life_api(
+            fruit_name=fruit_name,
+            temp_c=request.storage_temperature,
+            baseline_shelf_life_days_at_ref=request.baseline_shelf_life_days_at_ref,
+            current_age_days=request.current_age_days,
+            uncertainty_mode="monte_carlo",
+            kinetics=kinetics,
+        )
+        return model_response(ShelfLifeUncertaintyResponse(
+            **{name: result[name] for name in ShelfLifeUncertaintyResponse.model_fields}
+        ))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting shelf life: {str(e)}")
+
+def _json_floats(values: np.ndarray) -> List[Optional[float]]:
+    """Convert an array to JSON-safe floats (NaN/inf become null)"""
+    return [v if np.isfinite(v) else None for v in values.tolist()]
+
+def _shelf_life_batch_rows(
+    fruit_ids: np.ndarray,
+    temps: np.ndarray,
+    baselines: Optional[np.ndarray],
+    ages: Optional[np.ndarray],
+    uncertainty_fraction: float,
+    start: int,
+    stop: int,
+    table: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Run one vectorized pass over rows [start, stop) and build result records"""
+    table = table if table is not None else get_kinetics().table
+    result = predict_shelf_life_batch(
+        fruit_ids[start:stop],
+        temps[start:stop],
+        baseline_shelf_life_days_at_ref=None if baselines is None else baselines[start:stop],
+        current_age_days=None if ages is None else ages[start:stop],
+        uncertainty_fraction=uncertainty_fraction,
+        table=table,
+    )
+    columns = {key: _json_floats(values) for key, values in result.items()}
+    products = [table["names"][i].capitalize() for i in fruit_ids[start:stop].tolist()]
+
+    rows = []
+    for i, product in enumerate(products):
+        has_estimate = columns["estimated_shelf_life_days"][i] is not None
+        rows.append({
+            "product": product,
+            "storage_temperature": float(temps[start + i]),
+            "degradation_rate": columns["degradation_rate"][i],
+            "shelf_life_ratio": columns["shelf_life_ratio"][i],
+            "life_days": columns["life_days"][i],
+            "estimated_shelf_life_days": columns["estimated_shelf_life_days"][i],
+            "estimated_shelf_life_days_range": {
+                "lower": columns["estimated_shelf_life_days_lower"][i],
+                "upper": columns["estimated_shelf_life_days_upper"][i],
+            } if has_estimate else None,
+            "remaining_days": columns["remaining_days"][i],
+            "remaining_days_range": {
+                "lower": columns["remaining_days_lower"][i],
+                "upper": columns["remaining_days_upper"][i],
+            } if has_estimate else None,
+        })
+    return rows
+
+@app.post("/predict-shelf-life/batch")
+async def predict_shelf_life_batch_endpoint(request: ShelfLifeBatchRequest, format: str = "json"):
+    """
+    Predict shelf life for many (fruit, temperature, baseline, age) rows in one call.
+    
+    Args:
+        request: Columnar ShelfLifeBatchRequest; optional columns must match fruit_names in length
+        format: "json" for a single document, or "ndjson" to stream one result per line
     
     Returns:
-        Dictionary with available items and their spoilage metrics
+        {"results": [...], "total_count": N}, or an NDJSON stream of the same records
+    """
+    n = len(request.fruit_names)
+    _check_column_lengths(
+        request, "fruit_names", ["storage_temperatures", "baseline_shelf_life_days_at_ref", "current_age_days"]
+    )
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+
+    # One kinetics version for the whole batch, also while streaming
+    table = get_kinetics().table
+    try:
+        fruit_ids = lookup_fruit_ids([normalize_fruit_name(name) for name in request.fruit_names], table)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    temps = np.asarray(request.storage_temperatures, dtype=np.float64)
+    baselines = None
+    if request.baseline_shelf_life_days_at_ref is not None:
+        baselines = np.array(
+            [np.nan if b is None else b for b in request.baseline_shelf_life_days_at_ref], dtype=np.float64
+        )
+    ages = None if request.current_age_days is None else np.asarray(request.current_age_days, dtype=np.float64)
+
+    if format == "ndjson":
+        def stream() -> Iterator[bytes]:
+            for start in range(0, n, BATCH_STREAM_CHUNK):
+                rows = _shelf_life_batch_rows(
+                    fruit_ids, temps, baselines, ages, request.uncertainty_fraction,
+                    start, min(start + BATCH_STREAM_CHUNK, n), table,
+                )
+                yield b"".join(dumps(row) + b"\n" for row in rows)
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    try:
+        rows = _shelf_life_batch_rows(
+            fruit_ids, temps, baselines, ages, request.uncertainty_fraction, 0, n, table
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting shelf life: {str(e)}")
+
+    return {
+        "results": rows,
+        "total_count": n
+    }
+
+def _shelf_life_matrix_response(
+    kinetics: KineticParameters, fruit_names: tuple, t_min: float, t_step: float, n_temps: int
+) -> StaticJSON:
+    """Serialized matrix with its strong ETag"""
+    temps = np.round(t_min + t_step * np.arange(n_temps), 6)
+    grid = shelf_life_matrix(lookup_fruit_ids(list(fruit_names), kinetics.table), temps, kinetics.table)
+    return StaticJSON({
+        "items": list(fruit_names),
+        "kinetics_version": kinetics.version,
+        "spoilage_metrics": [kinetics.data[name]["metric"] for name in fruit_names],
+        "temperatures": temps.tolist(),
+        "comparison_temperature": T_REF_C,
+        # Row i, column j is item i at temperature j
+        "degradation_rate": [_json_floats(row) for row in grid["degradation_rate"]],
+        "shelf_life_ratio": [_json_floats(row) for row in grid["shelf_life_ratio"]],
+        "life_days": [_json_floats(row) for row in grid["life_days"]],
+    }, max_age_s=MATRIX_MAX_AGE_S)
+
+def _matrix_responses(kinetics: KineticParameters):
+    """Matrix responses of one kinetics version, memoized per parameter set (dropped with the version)"""
+    return kinetics.derived(
+        "matrix_responses",
+        lambda k: functools.lru_cache(maxsize=256)(functools.partial(_shelf_life_matrix_response, k)),
+    )
+
+@app.get("/predict-shelf-life/matrix")
+async def shelf_life_matrix_endpoint(
+    request: Request,
+    t_min: float = 0.0,
+    t_max: float = 30.0,
+    t_step: float = 1.0,
+    fruits: Optional[str] = None,
+):
     """
-    items = {}
-    for item, data in KINETIC_DATA.items():
-        items[item] = {
-            "metric": data["metric"],
-            "activation_energy_kj_mol": data["Ea"] / 1000
+    Rate, shelf-life ratio and life_days for every item x temperature, for charts.
+
+    Responses are computed once per parameter set and carry a strong ETag, so
+    repeat requests with If-None-Match get an empty 304.
+
+    Args:
+        t_min: First temperature in Celsius
+        t_max: Last temperature in Celsius (inclusive when on the grid)
+        t_step: Grid spacing in Celsius
+        fruits: Comma-separated items (default: all of /available-items)
+
+    Returns:
+        {"items", "temperatures", "degradation_rate", "shelf_life_ratio", "life_days", ...}
+        with one row per item and one column per temperature
+    """
+    if not (np.isfinite(t_min) and np.isfinite(t_max) and t_step > 0 and t_max >= t_min):
+        raise HTTPException(status_code=400, detail="Need finite t_min <= t_max and t_step > 0")
+    n_temps = int(np.floor((t_max - t_min) / t_step + 1e-9)) + 1
+    if n_temps > MAX_MATRIX_TEMPERATURES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_MATRIX_TEMPERATURES} temperatures per matrix (got {n_temps})"
+        )
+
+    kinetics = get_kinetics()
+    if fruits is None:
+        fruit_names = tuple(kinetics.table["names"])
+    else:
+        fruit_names = tuple(normalize_fruit_name(name) for name in fruits.split(",") if name.strip())
+    try:
+        matrix = _matrix_responses(kinetics)(fruit_names, round(t_min, 6), round(t_step, 6), n_temps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return matrix.response(request)
+
+def _check_column_lengths(request: BaseModel, reference: str, columns: List[str]) -> None:
+    """Raise 400 if any optional column differs in length from the reference column"""
+    n = len(getattr(request, reference))
+    for column in columns:
+        values = getattr(request, column)
+        if values is not None and len(values) != n:
+            raise HTTPException(
+                status_code=400,
+                detail=f"'{column}' has {len(values)} entries but '{reference}' has {n}"
+            )
+
+def _remaining_life_rows(batch_ids: List[str], storage_temperature: Optional[float]) -> List[Dict[str, Any]]:
+    """Query the tracker and build one record per batch id"""
+    slots = degradation_tracker.lookup_slots(batch_ids)
+    if (slots < 0).any():
+        unknown = sorted({batch_ids[i] for i in np.flatnonzero(slots < 0)})
+        raise HTTPException(status_code=404, detail=f"Unknown batches: {unknown[:20]}")
+
+    temps = None if storage_temperature is None else np.full(len(slots), storage_temperature)
+    result = degradation_tracker.remaining(slots, temps)
+    columns = {key: _json_floats(values) for key, values in result.items()}
+    last_times = _json_floats(degradation_tracker.last_time[slots])
+
+    return [
+        {
+            "batch_id": batch_id,
+            "product": degradation_tracker.table["names"][degradation_tracker.fruit_id[slot]].capitalize(),
+            "readings": int(degradation_tracker.reading_count[slot]),
+            "last_reading_at": last_times[i],
+            "storage_temperature": columns["temperature"][i],
+            "consumed_fraction": columns["consumed_fraction"][i],
+            "remaining_fraction": columns["remaining_fraction"][i],
+            "remaining_days": columns["remaining_days"][i],
+            "equivalent_days_at_ref": columns["equivalent_days_at_ref"][i],
+            "comparison_temperature": T_REF_C,
         }
+        for i, (batch_id, slot) in enumerate(zip(batch_ids, slots.tolist()))
+    ]
+
+@app.post("/shelf-life/batches/register")
+async def register_tracked_batches(request: TrackedBatchRegistration):
+    """
+    Start (or restart) time-temperature tracking for a set of batches.
     
+    Args:
+        request: Columnar batch ids, fruit names and optional baselines at 5°C
+    
+    Returns:
+        Number of batches registered and total tracked
+    """
+    _check_column_lengths(request, "batch_ids", ["fruit_names", "baseline_shelf_life_days_at_ref"])
+    try:
+        # The tracker's table: it follows kinetics swaps itself
+        fruit_ids = lookup_fruit_ids(
+            [normalize_fruit_name(name) for name in request.fruit_names], degradation_tracker.table
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    baselines = None
+    if request.baseline_shelf_life_days_at_ref is not None:
+        baselines = np.array(
+            [np.nan if b is None else b for b in request.baseline_shelf_life_days_at_ref], dtype=np.float64
+        )
+    degradation_tracker.register(request.batch_ids, fruit_ids, baselines)
+
     return {
-        "available_items": items,
-        "total_count": len(items)
+        "registered": len(request.batch_ids),
+        "tracked_batches": len(degradation_tracker)
     }
 
+@app.post("/shelf-life/readings")
+async def ingest_sensor_readings(request: SensorReadingsIngest):
+    """
+    Fold a bulk set of temperature readings into each batch's accumulated degradation.
+    
+    Args:
+        request: Columnar batch ids, timestamps and temperatures (any order, any mix of batches)
+    
+    Returns:
+        Counts of accepted, stale (older than already applied) and unknown-batch readings
+    """
+    _check_column_lengths(request, "batch_ids", ["timestamps", "temperatures"])
+    timestamps = np.array(
+        [t.timestamp() if isinstance(t, datetime) else t for t in request.timestamps], dtype=np.float64
+    )
+    slots = degradation_tracker.lookup_slots(request.batch_ids)
+    return degradation_tracker.ingest(slots, timestamps, np.asarray(request.temperatures, dtype=np.float64))
+
+@app.get("/shelf-life/batches/{batch_id}/remaining")
+async def get_remaining_life(batch_id: str, storage_temperature: Optional[float] = None):
+    """
+    Remaining shelf life of one tracked batch given its temperature history so far.
+    
+    Args:
+        batch_id: Registered batch id
+        storage_temperature: Optional temperature assumed from now on (default: latest reading)
+    """
+    return _remaining_life_rows([batch_id], storage_temperature)[0]
+
+@app.post("/shelf-life/batches/remaining")
+async def query_remaining_life(request: RemainingLifeQuery):
+    """
+    Remaining shelf life for many tracked batches in one vectorized query.
+    
+    Returns:
+        {"results": [...], "total_count": N}
+    """
+    rows = _remaining_life_rows(request.batch_ids, request.storage_temperature)
+    return {
+        "results": rows,
+        "total_count": len(rows)
+    }
+
+async def _load_hybrid_service():
+    """Get the active kinetics version's hybrid service, loading the RandomForest off the event loop on first use"""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, get_hybrid_service, get_kinetics())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Hybrid model not loaded: {str(e)}")
+
+async def _run_hybrid_batch(
+    fruit_names: List[str], temps: List[float], humidities: List[float], alpha: Optional[float]
+) -> List[Dict[str, Any]]:
+    """Validate inputs, run one vectorized hybrid prediction and build result records"""
+    service = await _load_hybrid_service()
+    alpha = DEFAULT_ALPHA if alpha is None else alpha
+    if not 0.0 <= alpha <= 1.0:
+        raise HTTPException(status_code=400, detail="alpha must be between 0 and 1")
+    try:
+        fruit_ids = service.fruit_ids([normalize_fruit_name(name) for name in fruit_names])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{str(e)}. Available items: {service.names}"
+        )
+    try:
+        result = service.predict_batch(
+            fruit_ids, np.asarray(temps, dtype=np.float64), np.asarray(humidities, dtype=np.float64), alpha
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    columns = {key: values.tolist() for key, values in result.items()}
+    return [
+        {
+            "product": service.names[fruit_id].capitalize(),
+            "storage_temperature": temps[i],
+            "humidity": humidities[i],
+            "alpha": alpha,
+            "arrhenius_shelf_life_days": columns["arrhenius_shelf_life_days"][i],
+            "ml_shelf_life_days": columns["ml_shelf_life_days"][i],
+            "hybrid_shelf_life_days": columns["hybrid_shelf_life_days"][i],
+        }
+        for i, fruit_id in enumerate(fruit_ids.tolist())
+    ]
+
+@app.post("/predict-shelf-life/hybrid", response_model=HybridShelfLifeResponse)
+async def predict_hybrid_shelf_life(request: HybridShelfLifeRequest):
+    """
+    Predict shelf life by fusing the RandomForest model with humidity-aware Arrhenius kinetics.
+    
+    Args:
+        request: HybridShelfLifeRequest with fruit_name, storage_temperature, humidity and optional alpha
+    
+    Returns:
+        HybridShelfLifeResponse with the physics, ML and weighted hybrid estimates in days
+    """
+    rows = await _run_hybrid_batch(
+        [request.fruit_name], [request.storage_temperature], [request.humidity], request.alpha
+    )
+    return model_response(HybridShelfLifeResponse(**rows[0]))
+
+@app.post("/predict-shelf-life/hybrid/batch")
+async def predict_hybrid_shelf_life_batch(request: HybridShelfLifeBatchRequest):
+    """
+    Hybrid shelf-life prediction for many (fruit, temperature, humidity) rows in one model call.
+    
+    Returns:
+        {"results": [...], "total_count": N}
+    """
+    _check_column_lengths(request, "fruit_names", ["storage_temperatures", "humidities"])
+    rows = await _run_hybrid_batch(
+        request.fruit_names, request.storage_temperatures, request.humidities, request.alpha
+    )
+    return {
+        "results": rows,
+        "total_count": len(rows)
+    }
+
+def _available_items_response(kinetics: KineticParameters) -> StaticJSON:
+    """/available-items body of one kinetics version, serialized once"""
+    return kinetics.derived("available_items_response", lambda k: StaticJSON({
+        "available_items": {
+            item: {"metric": data["metric"], "activation_energy_kj_mol": data["Ea"] / 1000}
+            for item, data in k.data.items()
+        },
+        "total_count": len(k.data),
+        "kinetics_version": k.version,
+    }))
+
+@app.get("/available-items")
+async def get_available_items(request: Request):
+    """
+    Get list of available fruits and vegetables for shelf life prediction.
+    
+    Returns:
+        Dictionary with available items and their spoilage metrics
+    """
+    return _available_items_response(get_kinetics()).response(request)
+
+@app.get("/kinetics")
+async def kinetics_status():
+    """Kinetics version being served, where it came from, and the registry's CURRENT version"""
+    return kinetics_reloader.status()
+
+@app.post("/kinetics/reload")
+async def reload_kinetics():
+    """
+    Check the kinetics registry now instead of waiting for the next poll.
+
+    The new version is loaded and its derived tables are built off the event
+    loop; requests keep being served from the old version until the swap.
+    Only the worker that answers reloads; other workers follow on their next poll.
+    """
+    reloaded = await kinetics_reloader.reload_async()
+    return {"reloaded": reloaded, **kinetics_reloader.status()}
+
+@app.on_event("startup")
+async def load_model_on_startup():
+    """Start loading the model according to FRESHNESS_MODEL_LOAD"""
+    if MODEL_LOAD_MODE == "eager":
+        await asyncio.get_running_loop().run_in_executor(None, model_manager.load)
+    elif MODEL_LOAD_MODE == "background":
+        model_manager.start_background_load()
+
+@app.on_event("startup")
+async def watch_kinetics_registry():
+    """Poll the kinetics registry for new versions (FRESHNESS_KINETICS_POLL_S)"""
+    global _kinetics_watcher
+    if KINETICS_POLL_S > 0:
+        _kinetics_watcher = asyncio.ensure_future(kinetics_reloader.watch(KINETICS_POLL_S))
+
+@app.on_event("shutdown")
+async def shutdown_inference():
+    """Stop the micro-batching worker, the inference pool and the kinetics poller, and close the cache database"""
+    if _kinetics_watcher is not None:
+        _kinetics_watcher.cancel()
+    await batcher.stop()
+    executor.shutdown()
+    scan_cache.close()
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics in the text exposition format"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    model_status = "loaded" if model is not None else "not_loaded"
+    model_status = "loaded" if model_manager.ready else "not_loaded"
     return {
         "status": "healthy",
         "model_status": model_status,
-        "available_items_count": len(KINETIC_DATA)
+        "available_items_count": len(get_kinetics().data),
+        "kinetics_version": get_kinetics().version,
+        "scan_cache": scan_cache.stats()
     }
 
+@app.get("/health/memory")
+async def memory_check():
+    """Memory of the worker process that answered (rss, pss, uss, shared; bytes)"""
+    return process_memory()
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and the event loop is responsive"""
+    return {
+        "status": "alive",
+        "uptime_s": time.time() - STARTED_AT
+    }
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 before that"""
+    status = model_manager.status()
+    status["load_mode"] = MODEL_LOAD_MODE
+    if model_manager.ready:
+        return {"status": "ready", "model": status}
+    # Lazy pods serve shelf-life traffic without a model, so they count as ready
+    if MODEL_LOAD_MODE == "lazy" and model_manager.state != FAILED:
+        return {"status": "ready", "model": status}
+    return JSONResponse(status_code=503, content={"status": "not_ready", "model": status})
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import resource
+import sys
+from typing import Dict, Optional, Union
+
+# smaps_rollup fields (kB) -> reported names
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, Optional[int]]:
+    """
+    Memory of one process in bytes.
+
+    rss counts every resident page, including pages shared with other processes
+    (e.g. copy-on-write model memory inherited from a parent, or mmapped weight
+    files); pss splits shared pages between the processes using them; uss is
+    memory private to this process, i.e. what killing it would free.
+
+    pss/uss need Linux (/proc/<pid>/smaps_rollup); elsewhere only the peak RSS
+    of the current process is available.
+    """
+    stats: Dict[str, Optional[int]] = {"pid": os.getpid() if pid == "self" else int(pid)}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in _SMAPS_FIELDS:
+                    stats[_SMAPS_FIELDS[key]] = int(rest.split()[0]) * 1024
+        stats["uss"] = stats.get("private_clean", 0) + stats.get("private_dirty", 0)
+        stats["shared"] = stats.get("shared_clean", 0) + stats.get("shared_dirty", 0)
+        return stats
+    except OSError:
+        pass
+
+    if pid == "self" or int(pid) == os.getpid():
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stats["peak_rss"] = peak if sys.platform == "darwin" else peak * 1024
+    return stats
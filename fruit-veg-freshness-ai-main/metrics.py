@@ -0,0 +1,187 @@
+import bisect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Kept dependency-free (no prometheus_client). Updates are plain list/int
+# increments: they run on the event loop thread or rely on the GIL, so the
+# hot path takes no locks. Counts can in theory be off by one under heavy
+# thread contention, which is fine for monitoring.
+
+LATENCY_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+UPLOAD_SIZE_BUCKETS = tuple(float(2 ** k) for k in range(14, 27, 2))  # 16 KiB .. 64 MiB
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for values, count in list(self._values.items()):
+            yield self.name, _format_labels(self.labels, values), count
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics) with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS_S,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [non-cumulative bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [[0] * (len(self.buckets) + 1), 0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for values, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket", _format_labels(self.labels, values, le), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labels, values), total
+            yield f"{self.name}_count", _format_labels(self.labels, values), cumulative
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time.
+
+    kind="counter" exposes a counter some other object already maintains.
+    """
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], Optional[float]], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        value = self.fn()
+        if value is not None:
+            yield self.name, "", value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS_S) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(self, name: str, documentation: str, fn: Callable[[], Optional[float]], kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, documentation, fn, kind))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Request-scope key where handlers leave the time they finished their own work,
+# so the middleware can attribute the rest (response validation and JSON
+# encoding) to the "serialize" stage
+HANDLER_DONE_KEY = "metrics.handler_done"
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests and their latency by route and status.
+
+    Routes are reported by their path template (e.g. /shelf-life/batches/{batch_id}/remaining)
+    so ids don't explode the label set; unknown paths are grouped as "unmatched".
+    """
+
+    def __init__(self, app, requests: Counter, latency: Histogram, stages: Histogram):
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self.stages = stages
+
+    def _route_template(self, scope) -> str:
+        from starlette.routing import Match
+
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                handler_done = scope.get(HANDLER_DONE_KEY)
+                if handler_done is not None:
+                    self.stages.observe(time.perf_counter() - handler_done, "serialize")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route_template(scope)
+            self.requests.inc(route, scope["method"], str(status["code"]))
+            self.latency.observe(time.perf_counter() - start, route)
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import threading
+import time
+import traceback
+import numpy as np
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Model lifecycle states reported by /health/ready
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelNotReady(Exception):
+    """Raised when a prediction is requested before the model has finished loading."""
+
+    def __init__(self, state: str, error: Optional[str] = None):
+        message = f"Model is not ready (state: {state})"
+        if error:
+            message += f": {error}"
+        super().__init__(message)
+        self.state = state
+        self.error = error
+
+
+class ModelManager:
+    """
+    Owns loading of the inference backend so importing the API stays cheap.
+
+    TensorFlow/ONNX Runtime and OpenCV are only imported when the model is first
+    needed. Loading can happen eagerly at startup, in a background thread (so
+    liveness is immediate and readiness follows), or lazily on the first scan.
+    After loading, an optional warmup runs dummy predictions so graph building
+    happens before real traffic arrives.
+
+    In "process" executor mode the worker processes hold the model; the manager
+    then only tracks readiness and warms the workers up through `executor`.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        model_path: Optional[str] = None,
+        warmup: bool = True,
+        warmup_batch_sizes: Sequence[int] = (1,),
+        executor: Any = None,
+        version: Optional[str] = None,
+        num_threads: Optional[int] = None,
+    ):
+        """
+        Args:
+            backend: Backend name for inference_backends.load_backend
+            model_path: Optional model file (defaults per backend)
+            warmup: Run dummy predictions right after loading
+            warmup_batch_sizes: Batch sizes to warm up (each may build its own graph)
+            executor: InferenceExecutor; in "process" mode workers load the model instead
+            version: Model version label (defaults to a fingerprint of the model file)
+            num_threads: Intra-op threads for the in-process backend (None = library default)
+        """
+        self.backend = backend
+        self.model_path = model_path
+        self.warmup = warmup
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes)
+        self.executor = executor
+        self._version = version or None
+        self.num_threads = num_threads
+
+        self.model = None
+        self.state = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_time_s: Optional[float] = None
+        self.warmup_time_s: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._preprocess: Any = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    @property
+    def model_version(self) -> str:
+        """
+        Identifies the model that produces scores, e.g. for result-cache keys.
+
+        Without an explicit version this is derived from the backend and the model
+        file's name, size and modification time, so replacing the file changes it.
+        """
+        if self._version is None:
+            from inference_backends import DEFAULT_MODEL_PATHS
+            path = self.model_path or DEFAULT_MODEL_PATHS.get(self.backend, "")
+            try:
+                stat = os.stat(path)
+                fingerprint = f"{self.backend}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+            except OSError:
+                fingerprint = f"{self.backend}:{path}"
+            self._version = hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+        return self._version
+
+    def _uses_worker_processes(self) -> bool:
+        return self.executor is not None and self.executor.mode == "process"
+
+    def load(self) -> None:
+        """Load (and warm up) the model; safe to call repeatedly and from several threads."""
+        with self._lock:
+            if self.state in (READY, FAILED):
+                return
+            try:
+                self.state = LOADING
+                start = time.perf_counter()
+                from image_preprocessing import INPUT_SHAPE
+                if not self._uses_worker_processes():
+                    from inference_backends import load_backend
+                    self.model = load_backend(self.backend, self.model_path, self.num_threads)
+                self.load_time_s = time.perf_counter() - start
+
+                if self.warmup or self._uses_worker_processes():
+                    self.state = WARMING
+                    start = time.perf_counter()
+                    for batch_size in self.warmup_batch_sizes:
+                        dummy = np.zeros((batch_size,) + INPUT_SHAPE, dtype=np.float32)
+                        if self._uses_worker_processes():
+                            self.executor.warmup_workers(dummy)
+                        else:
+                            self.model.predict(dummy)
+                    self.warmup_time_s = time.perf_counter() - start
+
+                self.state = READY
+            except Exception as e:
+                self.state = FAILED
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"Warning: Could not load model: {self.error}")
+                traceback.print_exc()
+
+    def start_background_load(self) -> None:
+        """Load in a daemon thread so the server can answer liveness probes meanwhile."""
+        if self._thread is None and self.state == NOT_LOADED:
+            self._thread = threading.Thread(target=self.load, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        """Predict with the in-process backend, loading it first if needed (lazy mode)."""
+        if self.state != READY:
+            self.load()
+        if self.state != READY:
+            raise ModelNotReady(self.state, self.error)
+        return self.model.predict(images)
+
+    def preprocessor(self, timed: bool = False) -> Callable:
+        """
+        Image preprocessing function; importing it pulls in OpenCV, so do it on demand.
+
+        With timed=True the function also returns (decode seconds, resize seconds).
+        """
+        if self._preprocess is None:
+            import image_preprocessing
+            self._preprocess = image_preprocessing
+        if timed:
+            return self._preprocess.preprocess_image_timed
+        return self._preprocess.preprocess_image_fast
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "version": self.model_version,
+            "state": self.state,
+            "error": self.error,
+            "load_time_s": self.load_time_s,
+            "warmup": self.warmup,
+            "warmup_time_s": self.warmup_time_s,
+        }
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def scan_cache_key(image_bytes: bytes, model_version: str) -> str:
+    """Content address of an upload: hash of the raw bytes plus the model that scored them."""
+    digest = hashlib.blake2b(image_bytes, digest_size=20).hexdigest()
+    return f"{model_version}:{digest}"
+
+
+class ScanResultCache:
+    """
+    Cache of freshness scan results keyed by scan_cache_key().
+
+    The first tier is an in-memory LRU bounded by `max_entries`; the optional
+    second tier is a SQLite file that survives restarts. Entries in both tiers
+    expire after `ttl_s` seconds. A disk hit is promoted back into memory.
+
+    Values are plain JSON-serializable dicts (e.g. FreshnessResponse fields).
+    All methods are thread-safe; disk access should be kept off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 3600.0, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: In-memory LRU capacity (0 disables the memory tier)
+            ttl_s: Entry lifetime in seconds (0 or less means entries never expire)
+            db_path: SQLite file for the persistent tier (None disables it)
+        """
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self.db_path = db_path or None
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Counters for /health
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.db_path:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scan_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._purge_expired_rows()
+            self._db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self._db is not None
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_s > 0 and now - stored_at > self.ttl_s
+
+    def _purge_expired_rows(self) -> None:
+        if self.ttl_s > 0:
+            self._db.execute("DELETE FROM scan_results WHERE stored_at < ?", (time.time() - self.ttl_s,))
+
+    def _remember(self, key: str, value: Dict[str, Any], stored_at: float) -> None:
+        # Caller holds the lock
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for `key`, or None (counted as a miss)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if not self._expired(stored_at, now):
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, stored_at FROM scan_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        value = json.loads(row[0])
+                        self._remember(key, value, row[1])
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM scan_results WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in every enabled tier."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO scan_results (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM scan_results")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def reopen(self) -> None:
+        """
+        Call in a forked child before first use.
+
+        SQLite connections must not be shared across fork(): the inherited one is
+        dropped without closing it (that would touch the parent's file locks) and
+        replaced by a fresh connection. The lock is recreated in case another
+        thread held it at fork time.
+        """
+        self._lock = threading.Lock()
+        if self.db_path:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "persistent": self.persistent,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,215 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+# Multi-process server: models are loaded once in this (parent) process, then N
+# workers are forked and share the parent's memory copy-on-write. Memory-mapped
+# artifacts (TFLite flatbuffers, the compiled forest .npz) are shared through the
+# page cache as well.
+#
+#   python serve.py --workers 4
+#   python serve.py --workers 4 --backend tflite --report-interval 30
+#
+# Linux/macOS only (needs os.fork). Only the standard library is imported before
+# the thread-count environment variables are set: numpy, OpenCV and TensorFlow
+# size their thread pools when they are first imported.
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+    "FRESHNESS_MODEL_THREADS",
+)
+
+
+def configure_threads(workers: int, threads_per_worker: Optional[int] = None) -> int:
+    """
+    Split the CPUs between the workers so they don't oversubscribe cores.
+
+    Variables already set in the environment win.
+
+    Returns:
+        Threads per worker
+    """
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(threads))
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+    # Decode and predict run in each worker's thread pool; a process pool per
+    # worker would fork again and lose the shared model
+    os.environ.setdefault("FRESHNESS_EXECUTOR", "thread")
+    os.environ.setdefault("FRESHNESS_EXECUTOR_WORKERS", str(threads))
+    return threads
+
+
+def share_model(mode: str, backend: str) -> bool:
+    """
+    Whether to load the freshness model in the parent before forking.
+
+    "auto" shares TFLite and ONNX Runtime models. TensorFlow starts thread pools
+    that do not survive fork(), so Keras models are loaded in each worker instead.
+    """
+    if mode == "auto":
+        return backend in ("tflite", "onnx")
+    return mode == "yes"
+
+
+def preload(app_module, load_model: bool) -> None:
+    """Import and build everything workers would otherwise load on their own."""
+    if load_model:
+        app_module.model_manager.load()
+        print(f"Freshness model: {app_module.model_manager.state} (loaded in parent)")
+    try:
+        app_module.get_hybrid_service()
+        print("Shelf-life model: loaded in parent")
+    except Exception as e:
+        # Workers retry on first use, as they would without preloading
+        print(f"Warning: could not preload the shelf-life model ({type(e).__name__}: {e})")
+    try:
+        app_module.model_manager.preprocessor()
+        import cv2
+        cv2.setNumThreads(int(os.environ["OMP_NUM_THREADS"]))
+    except ImportError as e:
+        print(f"Warning: could not preload image preprocessing ({e})")
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket created before fork, so every worker accepts on it."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app_module, sock: socket.socket, log_level: str) -> None:
+    """Body of a forked worker; never returns."""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        app_module.scan_cache.reopen()
+        config = uvicorn.Config(app_module.app, log_level=log_level)
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Skip the parent's atexit handlers and interpreter teardown
+        os._exit(code)
+
+
+def memory_report(workers: Dict[int, int]) -> str:
+    from memory_stats import process_memory
+
+    mb = 1024 * 1024
+    lines = [f"{'process':<10}{'pid':>8}{'rss MB':>10}{'pss MB':>10}{'uss MB':>10}{'shared MB':>11}"]
+    rows = [("parent", os.getpid())] + [(f"worker {i}", pid) for pid, i in sorted(workers.items(), key=lambda w: w[1])]
+    total_pss = 0
+    for label, pid in rows:
+        m = process_memory(pid)
+        if "pss" not in m:
+            lines.append(f"{label:<10}{pid:>8}{'n/a':>10}")
+            continue
+        total_pss += m["pss"]
+        lines.append(
+            f"{label:<10}{pid:>8}{m['rss'] / mb:>10.1f}{m['pss'] / mb:>10.1f}"
+            f"{m['uss'] / mb:>10.1f}{m['shared'] / mb:>11.1f}"
+        )
+    lines.append(f"total pss (actual memory use): {total_pss / mb:.1f} MB")
+    return "\n".join(lines)
+
+
+def serve(args: argparse.Namespace) -> None:
+    threads = configure_threads(args.workers, args.threads)
+    if args.backend:
+        os.environ["FRESHNESS_BACKEND"] = args.backend
+    # The parent preloads (or not) itself; workers must not start a second load
+    os.environ.setdefault("FRESHNESS_MODEL_LOAD", "background")
+
+    import main
+
+    shared = share_model(args.share_model, main.MODEL_BACKEND)
+    print(f"Preloading in parent (pid {os.getpid()}), {args.workers} workers x {threads} threads")
+    preload(main, shared)
+    sock = bind_socket(args.host, args.port)
+
+    # Objects created so far live as long as the workers; moving them to the
+    # permanent generation stops the collector writing to (and so un-sharing)
+    # their pages in every worker
+    gc.collect()
+    gc.freeze()
+
+    workers: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(main, sock, args.log_level)
+        workers[pid] = index
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for index in range(args.workers):
+        spawn(index)
+    print(f"Serving on http://{args.host}:{args.port} with workers {sorted(workers)}")
+
+    next_report = time.monotonic() + args.report_interval if args.report_interval > 0 else None
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            index = workers.pop(pid)
+            if not stopping:
+                print(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+                spawn(index)
+            continue
+        if next_report is not None and time.monotonic() >= next_report and not stopping:
+            print(memory_report(workers), flush=True)
+            next_report = time.monotonic() + args.report_interval
+        time.sleep(0.2)
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-process server for the freshness API with shared models")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], help="Overrides FRESHNESS_BACKEND")
+    parser.add_argument("--share-model", choices=["auto", "yes", "no"], default="auto",
+                        help="Load the freshness model in the parent (auto: TFLite/ONNX only)")
+    parser.add_argument("--threads", type=int, help="Threads per worker (default: CPUs / workers)")
+    parser.add_argument("--report-interval", type=float, default=60.0,
+                        help="Seconds between per-worker memory reports (0 disables)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork(); use `python main.py` on this platform")
+    serve(args)
@@ -1,8 +1,11 @@
+import threading
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Sequence
 
 # --- 1. Hardcoded Kinetic Parameters (Ea and A) ---
 # Ea is in J/mol, A is in 1/day (assuming first-order kinetics)
+# These are the built-in defaults; the API serves the version currently published
+# in the kinetics registry (kinetics_fitting.py / kinetics_registry.py), if any.
 # NOTE: Capsicum is assumed to use the same kinetics as Bellpepper,
 # and Bittergourd/Okra use general estimates due to limited public data.
 KINETIC_DATA = {
@@ -21,6 +24,28 @@ KINETIC_DATA = {
     "tomato": {"Ea": 36000.0, "A": 1.5e5, "metric": "softening/respiration"},
 }
 
+# --- Parameter uncertainty for Monte Carlo estimates (shelf_life_uncertainty.py) ---
+# Ea_sd: standard deviation of Ea in J/mol.
+# log_k_ref_sd: standard deviation of ln k at the 5°C reference temperature.
+# Sampling k_ref instead of A keeps the strong Ea/ln A correlation of fitted
+# Arrhenius parameters. Items whose kinetics are general estimates (see the
+# note above) get twice the spread.
+KINETIC_UNCERTAINTY = {
+    "apple": {"Ea_sd": 5000.0, "log_k_ref_sd": 0.15},
+    "banana": {"Ea_sd": 5000.0, "log_k_ref_sd": 0.15},
+    "bellpepper": {"Ea_sd": 5000.0, "log_k_ref_sd": 0.15},
+    "bittergourd": {"Ea_sd": 10000.0, "log_k_ref_sd": 0.30},
+    "capsicum": {"Ea_sd": 10000.0, "log_k_ref_sd": 0.30},
+    "carrot": {"Ea_sd": 7000.0, "log_k_ref_sd": 0.15},
+    "cucumber": {"Ea_sd": 5000.0, "log_k_ref_sd": 0.15},
+    "mango": {"Ea_sd": 5000.0, "log_k_ref_sd": 0.15},
+    "okra": {"Ea_sd": 10000.0, "log_k_ref_sd": 0.30},
+    "orange": {"Ea_sd": 4000.0, "log_k_ref_sd": 0.15},
+    "potato": {"Ea_sd": 6000.0, "log_k_ref_sd": 0.15},
+    "strawberry": {"Ea_sd": 4000.0, "log_k_ref_sd": 0.15},
+    "tomato": {"Ea_sd": 4000.0, "log_k_ref_sd": 0.15},
+}
+
 # Universal Gas Constant (R) in J/(mol·K)
 R = 8.314
 
@@ -53,6 +78,8 @@ def predict_shelf_life_api(
     baseline_shelf_life_days_at_ref: Optional[float] = None,
     current_age_days: float = 0.0,
     uncertainty_fraction: float = 0.2,
+    uncertainty_mode: str = "fraction",
+    kinetics: Optional["KineticParameters"] = None,
 ) -> Dict[str, Any]:
     """
     API version of shelf life prediction that returns structured data instead of printing.
@@ -63,12 +90,19 @@ def predict_shelf_life_api(
         baseline_shelf_life_days_at_ref: Optional baseline shelf life at the reference temperature (5°C), in days
         current_age_days: Optional current age of the item in days (default 0)
         uncertainty_fraction: Optional fractional uncertainty to express a range (default 0.2 => ±20%)
+        uncertainty_mode: "fraction" for the ±uncertainty_fraction ranges, or "monte_carlo" to
+            propagate KINETIC_UNCERTAINTY through the Arrhenius model; ranges are then the
+            5th-95th percentiles and an "uncertainty" entry holds the percentile bands
+        kinetics: Parameter version to use (default: the active one, see get_kinetics)
     
     Returns:
         Dictionary containing prediction results
     """
+    if uncertainty_mode not in ("fraction", "monte_carlo"):
+        raise ValueError("uncertainty_mode must be 'fraction' or 'monte_carlo'")
+    kinetics = kinetics or get_kinetics()
     # Get kinetic data for the fruit
-    data = KINETIC_DATA[fruit_name]
+    data = kinetics.data[fruit_name]
     
     # Convert input temperature to Kelvin
     T_input_K = temp_c + 273.15
@@ -131,6 +165,19 @@ def predict_shelf_life_api(
             rem_upper = max(0.0, est_upper - max(0.0, age))
             remaining_days_range = {"lower": rem_lower, "upper": rem_upper}
 
+    uncertainty = None
+    if uncertainty_mode == "monte_carlo":
+        from shelf_life_uncertainty import get_default_monte_carlo
+        monte_carlo = get_default_monte_carlo(kinetics)
+        if estimated_shelf_life_days is None:
+            uncertainty = monte_carlo.predict(fruit_name, temp_c)
+        else:
+            uncertainty = monte_carlo.predict(fruit_name, temp_c, baseline, age)
+            bands = uncertainty["estimated_shelf_life_days"]
+            estimated_shelf_life_days_range = {"lower": bands["p5"], "upper": bands["p95"]}
+            bands = uncertainty["remaining_days"]
+            remaining_days_range = {"lower": bands["p5"], "upper": bands["p95"]}
+
     # Generate conclusion message
     if shelf_life_ratio > 1:
         conclusion = f"Shelf life is {shelf_life_ratio:.2f} times LONGER than at {T_REF_C}°C."
@@ -156,9 +203,295 @@ def predict_shelf_life_api(
         "estimated_shelf_life_days_range": estimated_shelf_life_days_range,
         "remaining_days": remaining_days,
         "remaining_days_range": remaining_days_range,
+        "uncertainty_mode": uncertainty_mode,
+        # Monte Carlo percentile bands (monte_carlo mode only)
+        "uncertainty": uncertainty,
     }
 
 
+
+# CNN prediction score (0 = fresh, 1 = rotten) -> fraction of shelf life already used.
+# The inner breakpoints are classify_freshness' FRESH / MEDIUM FRESH thresholds:
+# FRESH covers the first 30% of an item's life, MEDIUM FRESH up to 80%.
+SCORE_BREAKPOINTS = (0.0, 0.10, 0.35, 1.0)
+LIFE_CONSUMED_AT_BREAKPOINTS = (0.0, 0.30, 0.80, 1.0)
+
+
+def life_consumed_from_score(prediction_score: float) -> float:
+    """Fraction of shelf life used up (0..1), interpolated between the score breakpoints."""
+    return float(np.interp(prediction_score, SCORE_BREAKPOINTS, LIFE_CONSUMED_AT_BREAKPOINTS))
+
+
+def default_baseline_days(fruit_name: str, kinetics: Optional["KineticParameters"] = None) -> float:
+    """Characteristic life 1/k at the reference temperature, used when no baseline is known."""
+    data = (kinetics or get_kinetics()).data[fruit_name]
+    return 1.0 / arrhenius_rate_constant(data["Ea"], data["A"], T_REF_K)
+
+
+def remaining_life_from_score(kinetics: Dict[str, Any], prediction_score: float) -> Dict[str, Any]:
+    """
+    Turn a freshness score into an effective age and the remaining shelf life.
+
+    The age is the consumed fraction of the estimated shelf life at the storage
+    temperature; it is subtracted from the estimate and its range the same way
+    predict_shelf_life_api treats `current_age_days`.
+
+    Args:
+        kinetics: predict_shelf_life_api result computed with a baseline
+        prediction_score: CNN score from /evaluate-freshness
+
+    Returns:
+        Dictionary with the consumed fraction, effective age and remaining days (with range)
+    """
+    consumed = life_consumed_from_score(prediction_score)
+    age = consumed * kinetics["estimated_shelf_life_days"]
+    estimate_range = kinetics["estimated_shelf_life_days_range"]
+    return {
+        "life_consumed_fraction": consumed,
+        "effective_age_days": age,
+        "remaining_days": max(0.0, kinetics["estimated_shelf_life_days"] - age),
+        "remaining_days_range": {
+            "lower": max(0.0, estimate_range["lower"] - age),
+            "upper": max(0.0, estimate_range["upper"] - age),
+        },
+    }
+
+
+def build_kinetic_table(kinetic_data: Dict[str, Dict[str, Any]] = KINETIC_DATA) -> Dict[str, Any]:
+    """
+    Converts the per-item KINETIC_DATA dict into columnar NumPy arrays indexed by fruit id.
+
+    The rate constant at the reference temperature does not depend on the request,
+    so it is computed once here instead of on every prediction.
+
+    Args:
+        kinetic_data: Mapping of item name to {"Ea", "A", "metric"}
+
+    Returns:
+        Dictionary with "names", "index" (name -> id), "Ea", "A", "k_ref" and "metric"
+    """
+    names = list(kinetic_data.keys())
+    Ea = np.array([kinetic_data[n]["Ea"] for n in names], dtype=np.float64)
+    A = np.array([kinetic_data[n]["A"] for n in names], dtype=np.float64)
+    return {
+        "names": names,
+        "index": {name: i for i, name in enumerate(names)},
+        "Ea": Ea,
+        "A": A,
+        "k_ref": arrhenius_rate_constant(Ea, A, T_REF_K),
+        "metric": [kinetic_data[n]["metric"] for n in names],
+    }
+
+
+class KineticParameters:
+    """
+    One version of the kinetic parameters and everything derived from it.
+
+    Instances are never modified after construction. Serving code takes the
+    active version once per request (get_kinetics) and uses it throughout, so
+    swapping in a new version (set_kinetics) is a single reference assignment:
+    requests already running finish on the version they started with, and the
+    old arrays are freed when the last of them is done.
+
+    Objects built from the parameters (Monte Carlo tables, shelf-life surfaces,
+    memoized responses) are attached with derived(), so they are replaced
+    together with the parameters they were built from.
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, Dict[str, Any]],
+        uncertainty: Dict[str, Dict[str, float]],
+        version: str = "builtin",
+        source: Optional[str] = None,
+    ):
+        """
+        Args:
+            data: Mapping of item name to {"Ea", "A", "metric"} (optionally "ref_life_days")
+            uncertainty: Mapping of item name to {"Ea_sd", "log_k_ref_sd"}
+            version: Version label reported by the API
+            source: Where the parameters came from (registry path), None for built-ins
+        """
+        missing = sorted(set(data) - set(uncertainty))
+        if missing:
+            raise ValueError(f"No uncertainty given for items: {missing}")
+        self.data = data
+        self.uncertainty = uncertainty
+        self.version = version
+        self.source = source
+        self.table = build_kinetic_table(data)
+        self._derived: Dict[str, Any] = {}
+        self._builders: Dict[str, Callable[["KineticParameters"], Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def derived(self, name: str, build: Callable[["KineticParameters"], Any]) -> Any:
+        """
+        Object built from these parameters by `build(self)`, once per name.
+
+        Each name has its own lock, so a slow build (a model load) does not hold
+        up lookups of other derived objects.
+        """
+        if name not in self._derived:
+            with self._locks.setdefault(name, threading.Lock()):
+                if name not in self._derived:
+                    self._builders[name] = build
+                    self._derived[name] = build(self)
+        return self._derived[name]
+
+    def warm_from(self, previous: "KineticParameters") -> None:
+        """Build every derived object `previous` has, so a swap does not leave them to the next request."""
+        for name, build in list(previous._builders.items()):
+            self.derived(name, build)
+
+
+BUILTIN_KINETICS = KineticParameters(KINETIC_DATA, KINETIC_UNCERTAINTY)
+KINETIC_TABLE = BUILTIN_KINETICS.table
+
+_active_kinetics = BUILTIN_KINETICS
+
+
+def get_kinetics() -> KineticParameters:
+    """The parameter version currently served."""
+    return _active_kinetics
+
+
+def set_kinetics(kinetics: KineticParameters) -> KineticParameters:
+    """
+    Atomically make `kinetics` the served version.
+
+    Returns:
+        The version it replaced
+    """
+    global _active_kinetics
+    previous, _active_kinetics = _active_kinetics, kinetics
+    return previous
+
+
+def normalize_fruit_name(fruit_name: str) -> str:
+    """Normalize user input to a KINETIC_DATA key (e.g. " Fresh Apple" -> "apple")"""
+    return fruit_name.strip().lower().replace('fresh', '').strip()
+
+
+def lookup_fruit_ids(fruit_names: Sequence[str], table: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """
+    Maps item names to their integer ids in the kinetic table (default: the active version's).
+
+    Raises:
+        ValueError: If any name is not in the table (all unknown names are listed)
+    """
+    table = table if table is not None else get_kinetics().table
+    index = table["index"]
+    ids = np.fromiter((index.get(name, -1) for name in fruit_names), dtype=np.intp, count=len(fruit_names))
+    if (ids < 0).any():
+        unknown = sorted({fruit_names[i] for i in np.flatnonzero(ids < 0)})
+        raise ValueError(f"Unknown items: {unknown}. Available items: {table['names']}")
+    return ids
+
+
+def predict_shelf_life_batch(
+    fruit_ids: np.ndarray,
+    temps_c: np.ndarray,
+    baseline_shelf_life_days_at_ref: Optional[np.ndarray] = None,
+    current_age_days: Optional[np.ndarray] = None,
+    uncertainty_fraction: float = 0.2,
+    table: Optional[Dict[str, Any]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized version of predict_shelf_life_api for many (fruit, temperature) rows at once.
+
+    Args:
+        fruit_ids: Integer ids from lookup_fruit_ids, shape (N,)
+        temps_c: Storage temperatures in Celsius, shape (N,)
+        baseline_shelf_life_days_at_ref: Optional baselines at 5°C in days; NaN marks rows without one
+        current_age_days: Optional current ages in days (default 0)
+        uncertainty_fraction: Fractional uncertainty for the ranges (clamped to [0, 0.9])
+        table: Columnar kinetic table from build_kinetic_table (default: the active version's)
+
+    Returns:
+        Dictionary of (N,) arrays: degradation_rate, shelf_life_ratio, life_days,
+        estimated_shelf_life_days(_lower/_upper) and remaining_days(_lower/_upper).
+        Estimates are NaN for rows without a usable baseline.
+    """
+    table = table if table is not None else get_kinetics().table
+    fruit_ids = np.asarray(fruit_ids, dtype=np.intp)
+    temps_c = np.asarray(temps_c, dtype=np.float64)
+    n = fruit_ids.shape[0]
+
+    Ea = table["Ea"][fruit_ids]
+    A = table["A"][fruit_ids]
+    k_ref = table["k_ref"][fruit_ids]
+
+    k_input = arrhenius_rate_constant(Ea, A, temps_c + 273.15)
+
+    # Same conventions as the scalar path: a zero rate means infinite life
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zero_rate = k_input == 0
+        shelf_life_ratio = np.where(zero_rate, np.inf, k_ref / k_input)
+        life_days = np.where(zero_rate, np.inf, 1.0 / k_input)
+
+    uncertainty_fraction = max(0.0, min(float(uncertainty_fraction), 0.9))
+
+    if baseline_shelf_life_days_at_ref is None:
+        baseline = np.full(n, np.nan)
+    else:
+        baseline = np.asarray(baseline_shelf_life_days_at_ref, dtype=np.float64)
+    if current_age_days is None:
+        age = np.zeros(n)
+    else:
+        age = np.maximum(0.0, np.nan_to_num(np.asarray(current_age_days, dtype=np.float64)))
+
+    valid = np.isfinite(baseline) & (baseline >= 0) & np.isfinite(shelf_life_ratio)
+    estimated = np.where(valid, baseline * shelf_life_ratio, np.nan)
+    est_lower = estimated * (1.0 - uncertainty_fraction)
+    est_upper = estimated * (1.0 + uncertainty_fraction)
+
+    # NaN propagates through maximum, so rows without a baseline stay NaN
+    return {
+        "degradation_rate": k_input,
+        "shelf_life_ratio": shelf_life_ratio,
+        "life_days": life_days,
+        "estimated_shelf_life_days": estimated,
+        "estimated_shelf_life_days_lower": est_lower,
+        "estimated_shelf_life_days_upper": est_upper,
+        "remaining_days": np.maximum(0.0, estimated - age),
+        "remaining_days_lower": np.maximum(0.0, est_lower - age),
+        "remaining_days_upper": np.maximum(0.0, est_upper - age),
+    }
+
+
+def shelf_life_matrix(
+    fruit_ids: np.ndarray,
+    temps_c: np.ndarray,
+    table: Optional[Dict[str, Any]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Every (fruit, temperature) combination in one broadcasted computation.
+
+    Args:
+        fruit_ids: Integer ids from lookup_fruit_ids, shape (F,)
+        temps_c: Storage temperatures in Celsius, shape (T,)
+        table: Columnar kinetic table from build_kinetic_table (default: the active version's)
+
+    Returns:
+        Dictionary of (F, T) arrays: degradation_rate, shelf_life_ratio and life_days
+    """
+    table = table if table is not None else get_kinetics().table
+    fruit_ids = np.asarray(fruit_ids, dtype=np.intp)
+    temps_k = np.asarray(temps_c, dtype=np.float64)[np.newaxis, :] + 273.15
+
+    k_input = arrhenius_rate_constant(
+        table["Ea"][fruit_ids, np.newaxis], table["A"][fruit_ids, np.newaxis], temps_k
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zero_rate = k_input == 0
+        shelf_life_ratio = np.where(zero_rate, np.inf, table["k_ref"][fruit_ids, np.newaxis] / k_input)
+        life_days = np.where(zero_rate, np.inf, 1.0 / k_input)
+    return {
+        "degradation_rate": k_input,
+        "shelf_life_ratio": shelf_life_ratio,
+        "life_days": life_days,
+    }
+
 # Original console function for backward compatibility
 def predict_shelf_life():
     """Original console-based shelf life predictor from shell.py"""
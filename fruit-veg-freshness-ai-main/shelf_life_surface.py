@@ -0,0 +1,255 @@
+import argparse
+import os
+import time
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from hy import KINETIC_DATA, T_REF_K, arrhenius_rate_constant, humidity_factor
+
+# Default grid resolution, overridable from the environment
+DEFAULT_TEMP_RANGE = (-5.0, 40.0)
+DEFAULT_RH_RANGE = (30.0, 100.0)
+DEFAULT_TEMP_STEP = float(os.getenv("SHELF_LIFE_SURFACE_TEMP_STEP", "0.5"))
+DEFAULT_RH_STEP = float(os.getenv("SHELF_LIFE_SURFACE_RH_STEP", "1.0"))
+
+
+class ShelfLifeSurface:
+    """
+    Precomputed temperature x relative-humidity shelf-life grids, one per produce item.
+
+    Every grid node holds the exact `hy.arrhenius_shelf_life` value, so a lookup is
+    an O(1) index computation plus bilinear interpolation between four nodes.
+    Points outside the grid fall back to the exact (vectorized) formula.
+    """
+
+    def __init__(
+        self,
+        kinetic_data: Dict[str, Dict[str, Any]] = KINETIC_DATA,
+        temp_range: Tuple[float, float] = DEFAULT_TEMP_RANGE,
+        rh_range: Tuple[float, float] = DEFAULT_RH_RANGE,
+        temp_step: float = DEFAULT_TEMP_STEP,
+        rh_step: float = DEFAULT_RH_STEP,
+        dtype: Any = np.float64,
+    ):
+        """
+        Args:
+            kinetic_data: Mapping of item name to {"Ea", "A", "ref_life_days"}
+            temp_range: (min, max) grid temperature in Celsius
+            rh_range: (min, max) grid relative humidity in %
+            temp_step: Grid spacing along temperature in Celsius
+            rh_step: Grid spacing along humidity in %
+            dtype: Storage dtype of the grids (float32 halves memory)
+        """
+        if temp_step <= 0 or rh_step <= 0:
+            raise ValueError("Grid steps must be positive")
+
+        self.names = list(kinetic_data.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        # Columnar kinetic parameters for the exact fallback
+        self.Ea = np.array([kinetic_data[n]["Ea"] for n in self.names], dtype=np.float64)
+        self.A = np.array([kinetic_data[n]["A"] for n in self.names], dtype=np.float64)
+        self.ref_life = np.array([kinetic_data[n]["ref_life_days"] for n in self.names], dtype=np.float64)
+        self.k_ref = arrhenius_rate_constant(self.Ea, self.A, T_REF_K)
+
+        self.t0, t_max = float(temp_range[0]), float(temp_range[1])
+        self.r0, r_max = float(rh_range[0]), float(rh_range[1])
+        self.temp_step = float(temp_step)
+        self.rh_step = float(rh_step)
+        self.n_temp = int(round((t_max - self.t0) / self.temp_step)) + 1
+        self.n_rh = int(round((r_max - self.r0) / self.rh_step)) + 1
+        # Snap the upper bounds to the last node actually on the grid
+        self.t_max = self.t0 + (self.n_temp - 1) * self.temp_step
+        self.r_max = self.r0 + (self.n_rh - 1) * self.rh_step
+        if self.n_temp < 2 or self.n_rh < 2:
+            raise ValueError("Grid needs at least two nodes along each axis")
+
+        start = time.perf_counter()
+        temps = self.t0 + self.temp_step * np.arange(self.n_temp)
+        rhs = self.r0 + self.rh_step * np.arange(self.n_rh)
+        self.grid = np.empty((len(self.names), self.n_temp, self.n_rh), dtype=dtype)
+        for i in range(len(self.names)):
+            self.grid[i] = self.exact(i, temps[:, None], rhs[None, :])
+        self.build_time_s = time.perf_counter() - start
+
+    @property
+    def memory_bytes(self) -> int:
+        return int(self.grid.nbytes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Grid shape, resolution, memory footprint and build time."""
+        return {
+            "items": len(self.names),
+            "temperature_range_c": [self.t0, self.t_max],
+            "humidity_range_pct": [self.r0, self.r_max],
+            "temperature_step_c": self.temp_step,
+            "humidity_step_pct": self.rh_step,
+            "grid_shape": list(self.grid.shape),
+            "dtype": str(self.grid.dtype),
+            "memory_bytes": self.memory_bytes,
+            "build_time_ms": self.build_time_s * 1000.0,
+        }
+
+    def fruit_ids(self, fruits: Sequence[str]) -> np.ndarray:
+        """Map item names to grid ids, raising ValueError for unsupported items."""
+        try:
+            return np.array([self.index[f.lower()] for f in fruits], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Unsupported fruit type: {e.args[0]}")
+
+    @staticmethod
+    def _check_finite(temps_c: np.ndarray, rhs: np.ndarray) -> None:
+        if not (np.isfinite(temps_c).all() and np.isfinite(rhs).all()):
+            raise ValueError("Temperatures and humidities must be finite numbers")
+
+    def exact(self, fruit_ids: np.ndarray, temps_c: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """
+        Vectorized exact shelf life (same formula as hy.arrhenius_shelf_life).
+
+        Raises:
+            ValueError: If a temperature or humidity is NaN or infinite
+        """
+        self._check_finite(temps_c, rhs)
+        fruit_ids = np.asarray(fruit_ids, dtype=np.intp)
+        k_input = arrhenius_rate_constant(self.Ea[fruit_ids], self.A[fruit_ids], np.asarray(temps_c) + 273.15)
+        return self.ref_life[fruit_ids] * (self.k_ref[fruit_ids] / k_input) * humidity_factor(rhs)
+
+    def lookup_batch(self, fruit_ids: np.ndarray, temps_c: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """
+        Bilinear lookup for many (item, temperature, humidity) rows.
+
+        Rows outside the grid are computed exactly instead of extrapolated.
+
+        Raises:
+            ValueError: If a temperature or humidity is NaN or infinite
+        """
+        fruit_ids = np.asarray(fruit_ids, dtype=np.intp)
+        temps_c = np.asarray(temps_c, dtype=np.float64)
+        rhs = np.asarray(rhs, dtype=np.float64)
+        # NaN would become a garbage grid index below
+        self._check_finite(temps_c, rhs)
+
+        on_grid = (
+            (temps_c >= self.t0) & (temps_c <= self.t_max)
+            & (rhs >= self.r0) & (rhs <= self.r_max)
+        )
+
+        # Fractional grid coordinates; off-grid rows are clipped here and overwritten below
+        ti = np.clip((temps_c - self.t0) / self.temp_step, 0, self.n_temp - 1)
+        ri = np.clip((rhs - self.r0) / self.rh_step, 0, self.n_rh - 1)
+        i0 = np.minimum(ti.astype(np.intp), self.n_temp - 2)
+        j0 = np.minimum(ri.astype(np.intp), self.n_rh - 2)
+        fx = ti - i0
+        fy = ri - j0
+
+        g = self.grid
+        v00 = g[fruit_ids, i0, j0]
+        v10 = g[fruit_ids, i0 + 1, j0]
+        v01 = g[fruit_ids, i0, j0 + 1]
+        v11 = g[fruit_ids, i0 + 1, j0 + 1]
+        result = (
+            (1 - fx) * (1 - fy) * v00
+            + fx * (1 - fy) * v10
+            + (1 - fx) * fy * v01
+            + fx * fy * v11
+        )
+
+        if not on_grid.all():
+            off = ~on_grid
+            result[off] = self.exact(fruit_ids[off], temps_c[off], rhs[off])
+        return result
+
+    def lookup(self, fruit: str, temp_c: float, rh: float) -> float:
+        """
+        Single-row lookup, equivalent to hy.arrhenius_shelf_life within grid error.
+
+        NaN and infinite inputs fall through to exact(), which raises ValueError.
+        """
+        i = self.index.get(fruit.lower())
+        if i is None:
+            raise ValueError(f"Unsupported fruit type: {fruit}")
+        if not (self.t0 <= temp_c <= self.t_max and self.r0 <= rh <= self.r_max):
+            return float(self.exact(i, temp_c, rh))
+
+        # Plain float arithmetic: array machinery costs more than the math for one point
+        ti = (temp_c - self.t0) / self.temp_step
+        ri = (rh - self.r0) / self.rh_step
+        i0 = min(int(ti), self.n_temp - 2)
+        j0 = min(int(ri), self.n_rh - 2)
+        fx = ti - i0
+        fy = ri - j0
+        g = self.grid[i]
+        return float(
+            (1 - fx) * (1 - fy) * g[i0, j0]
+            + fx * (1 - fy) * g[i0 + 1, j0]
+            + (1 - fx) * fy * g[i0, j0 + 1]
+            + fx * fy * g[i0 + 1, j0 + 1]
+        )
+
+    def error_report(self, samples: int = 20000, seed: int = 0) -> Dict[str, Any]:
+        """
+        Compare interpolated against exact values at random on-grid points.
+
+        Returns:
+            Per-item and overall max/mean absolute (days) and relative errors
+        """
+        rng = np.random.default_rng(seed)
+        report: Dict[str, Any] = {"samples_per_item": samples, "items": {}}
+        worst_rel = 0.0
+        worst_abs = 0.0
+
+        for i, name in enumerate(self.names):
+            ids = np.full(samples, i, dtype=np.intp)
+            temps = rng.uniform(self.t0, self.t_max, samples)
+            rhs = rng.uniform(self.r0, self.r_max, samples)
+            exact = self.exact(ids, temps, rhs)
+            approx = self.lookup_batch(ids, temps, rhs)
+            abs_err = np.abs(approx - exact)
+            rel_err = abs_err / np.maximum(np.abs(exact), 1e-12)
+            report["items"][name] = {
+                "max_abs_error_days": float(abs_err.max()),
+                "mean_abs_error_days": float(abs_err.mean()),
+                "max_rel_error": float(rel_err.max()),
+                "mean_rel_error": float(rel_err.mean()),
+            }
+            worst_abs = max(worst_abs, float(abs_err.max()))
+            worst_rel = max(worst_rel, float(rel_err.max()))
+
+        report["max_abs_error_days"] = worst_abs
+        report["max_rel_error"] = worst_rel
+        return report
+
+
+_default_surface: Optional[ShelfLifeSurface] = None
+
+
+def get_default_surface() -> ShelfLifeSurface:
+    """Build (once) and return the surface at the environment-configured resolution."""
+    global _default_surface
+    if _default_surface is None:
+        _default_surface = ShelfLifeSurface()
+    return _default_surface
+
+
+def _print_resolution_report(temp_step: float, rh_step: float, dtype: Any) -> None:
+    surface = ShelfLifeSurface(temp_step=temp_step, rh_step=rh_step, dtype=dtype)
+    stats = surface.stats()
+    errors = surface.error_report()
+    print(
+        f"temp_step={temp_step:<5} rh_step={rh_step:<5} dtype={stats['dtype']:<8} "
+        f"memory={stats['memory_bytes'] / 1024:9.1f} KiB  build={stats['build_time_ms']:7.2f} ms  "
+        f"max_abs_err={errors['max_abs_error_days']:.4f} days  max_rel_err={errors['max_rel_error']:.2e}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shelf-life surface resolution report")
+    parser.add_argument("--temp-steps", type=float, nargs="+", default=[2.0, 1.0, 0.5, 0.25, 0.1])
+    parser.add_argument("--rh-steps", type=float, nargs="+", default=[5.0, 2.0, 1.0, 0.5])
+    parser.add_argument("--float32", action="store_true", help="Store grids as float32")
+    args = parser.parse_args()
+
+    dtype = np.float32 if args.float32 else np.float64
+    for temp_step in args.temp_steps:
+        for rh_step in args.rh_steps:
+            _print_resolution_report(temp_step, rh_step, dtype)
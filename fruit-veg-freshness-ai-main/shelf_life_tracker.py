@@ -0,0 +1,236 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+
+from shelf_life_predictor import KINETIC_TABLE, arrhenius_rate_constant
+
+SECONDS_PER_DAY = 86400.0
+
+
+class DegradationTracker:
+    """
+    Per-batch accumulated degradation under a fluctuating temperature history.
+
+    For first-order kinetics the fraction of shelf life consumed is the integral
+    of k(T(t)) dt divided by the total budget. Instead of re-integrating the
+    whole sensor history on every query, each batch keeps a running integral
+    and its last (time, k) pair, so a new reading costs O(1): one trapezoid.
+
+    State is stored column-wise in NumPy arrays indexed by a batch slot, so a
+    bulk ingest of readings for thousands of batches is a handful of vectorized
+    operations.
+
+    The budget is k_ref * baseline when a baseline shelf life at the reference
+    temperature (5°C) is known, and 1.0 otherwise (the tau = 1/k convention used
+    by `life_days` in predict_shelf_life_api).
+    """
+
+    def __init__(self, table: Dict[str, Any] = KINETIC_TABLE, initial_capacity: int = 1024):
+        self.table = table
+        self.slots: Dict[str, int] = {}
+        self.batch_ids: List[str] = []
+        self._allocate(max(1, int(initial_capacity)))
+
+    def _allocate(self, capacity: int) -> None:
+        # Grow every state column to `capacity`, preserving existing rows
+        size = len(self.batch_ids)
+
+        def grow(old: Optional[np.ndarray], fill: Any, dtype: Any) -> np.ndarray:
+            new = np.full(capacity, fill, dtype=dtype)
+            if old is not None:
+                new[:size] = old[:size]
+            return new
+
+        self.fruit_id = grow(getattr(self, "fruit_id", None), -1, np.intp)
+        self.baseline = grow(getattr(self, "baseline", None), np.nan, np.float64)
+        self.budget = grow(getattr(self, "budget", None), 1.0, np.float64)
+        self.accumulated = grow(getattr(self, "accumulated", None), 0.0, np.float64)
+        self.last_time = grow(getattr(self, "last_time", None), np.nan, np.float64)
+        self.last_k = grow(getattr(self, "last_k", None), np.nan, np.float64)
+        self.last_temp = grow(getattr(self, "last_temp", None), np.nan, np.float64)
+        self.reading_count = grow(getattr(self, "reading_count", None), 0, np.int64)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.batch_ids)
+
+    def register(
+        self,
+        batch_ids: Sequence[str],
+        fruit_ids: np.ndarray,
+        baseline_shelf_life_days_at_ref: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Register (or reset) batches before readings are ingested for them.
+
+        Args:
+            batch_ids: External batch identifiers
+            fruit_ids: Item ids from shelf_life_predictor.lookup_fruit_ids
+            baseline_shelf_life_days_at_ref: Optional baselines at 5°C in days (NaN = unknown)
+        """
+        fruit_ids = np.asarray(fruit_ids, dtype=np.intp)
+        slots = np.empty(len(batch_ids), dtype=np.intp)
+        for i, batch_id in enumerate(batch_ids):
+            slot = self.slots.get(batch_id)
+            if slot is None:
+                slot = len(self.batch_ids)
+                if slot >= self.capacity:
+                    self._allocate(self.capacity * 2)
+                self.slots[batch_id] = slot
+                self.batch_ids.append(batch_id)
+            slots[i] = slot
+
+        baseline = np.full(len(slots), np.nan)
+        if baseline_shelf_life_days_at_ref is not None:
+            baseline = np.asarray(baseline_shelf_life_days_at_ref, dtype=np.float64)
+
+        self.fruit_id[slots] = fruit_ids
+        self.baseline[slots] = baseline
+        self.budget[slots] = self._budget(self.table, fruit_ids, baseline)
+        self.accumulated[slots] = 0.0
+        self.last_time[slots] = np.nan
+        self.last_k[slots] = np.nan
+        self.last_temp[slots] = np.nan
+        self.reading_count[slots] = 0
+
+    @staticmethod
+    def _budget(table: Dict[str, Any], fruit_ids: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+        budget = np.ones(len(fruit_ids))
+        known = np.isfinite(baseline) & (baseline > 0)
+        budget[known] = table["k_ref"][fruit_ids[known]] * baseline[known]
+        return budget
+
+    def use_table(self, table: Dict[str, Any]) -> None:
+        """
+        Switch every tracked batch to a new kinetic table (a new parameter version).
+
+        Items are matched by name, so the new table may order or extend them
+        differently. Each batch keeps the fraction of shelf life it has consumed
+        so far; from now on readings are integrated with the new rate constants.
+
+        Raises:
+            ValueError: If a tracked item is missing from the new table (nothing is changed)
+        """
+        n = len(self.batch_ids)
+        old_names = self.table["names"]
+        tracked = sorted({old_names[i] for i in np.unique(self.fruit_id[:n]).tolist()})
+        missing = [name for name in tracked if name not in table["index"]]
+        if missing:
+            raise ValueError(f"Tracked items missing from the new kinetic table: {missing}")
+
+        remap = np.array([table["index"].get(name, -1) for name in old_names], dtype=np.intp)
+        fruit = remap[self.fruit_id[:n]]
+        consumed = self.accumulated[:n] / self.budget[:n]
+        budget = self._budget(table, fruit, self.baseline[:n])
+
+        self.fruit_id[:n] = fruit
+        self.budget[:n] = budget
+        self.accumulated[:n] = consumed * budget
+        # NaN (no reading yet) stays NaN
+        self.last_k[:n] = arrhenius_rate_constant(table["Ea"][fruit], table["A"][fruit], self.last_temp[:n] + 273.15)
+        self.table = table
+
+    def lookup_slots(self, batch_ids: Sequence[str]) -> np.ndarray:
+        """Map batch ids to slots; unknown batches map to -1."""
+        slots = self.slots
+        return np.fromiter((slots.get(b, -1) for b in batch_ids), dtype=np.intp, count=len(batch_ids))
+
+    def ingest(self, slots: np.ndarray, timestamps_s: np.ndarray, temps_c: np.ndarray) -> Dict[str, int]:
+        """
+        Fold a bulk set of temperature readings into the running integrals.
+
+        Readings may arrive in any order and for any mix of batches; within one
+        call they are sorted per batch by time. Readings older than the latest
+        reading already applied to a batch are dropped as stale.
+
+        Args:
+            slots: Batch slots from lookup_slots (-1 rows are ignored)
+            timestamps_s: Reading times as Unix seconds
+            temps_c: Temperatures in Celsius
+
+        Returns:
+            Counts of "accepted", "stale" and "unknown" readings
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        times = np.asarray(timestamps_s, dtype=np.float64)
+        temps = np.asarray(temps_c, dtype=np.float64)
+
+        known = slots >= 0
+        valid = known & np.isfinite(times) & np.isfinite(temps)
+        # NaN last_time (no reading yet) compares False, so first readings are kept
+        stale = np.zeros_like(valid)
+        stale[valid] = times[valid] < self.last_time[slots[valid]]
+        keep = valid & ~stale
+        counts = {
+            "accepted": int(keep.sum()),
+            "stale": int(stale.sum()),
+            "unknown": int((~known).sum()),
+        }
+        if not keep.any():
+            return counts
+
+        slots, times, temps = slots[keep], times[keep], temps[keep]
+        order = np.lexsort((times, slots))
+        slots, times, temps = slots[order], times[order], temps[order]
+
+        fruit = self.fruit_id[slots]
+        k = arrhenius_rate_constant(self.table["Ea"][fruit], self.table["A"][fruit], temps + 273.15)
+
+        # Each reading pairs with the previous reading of the same batch: either
+        # the one before it in this call, or the batch's stored last reading
+        first = np.ones(len(slots), dtype=bool)
+        first[1:] = slots[1:] != slots[:-1]
+        prev_time = np.empty_like(times)
+        prev_k = np.empty_like(k)
+        prev_time[1:] = times[:-1]
+        prev_k[1:] = k[:-1]
+        prev_time[first] = self.last_time[slots[first]]
+        prev_k[first] = self.last_k[slots[first]]
+
+        dt_days = (times - prev_time) / SECONDS_PER_DAY
+        trapezoids = np.where(np.isnan(prev_time), 0.0, 0.5 * (prev_k + k) * dt_days)
+
+        starts = np.flatnonzero(first)
+        ends = np.append(starts[1:] - 1, len(slots) - 1)
+        batch_slots = slots[starts]
+        self.accumulated[batch_slots] += np.add.reduceat(trapezoids, starts)
+        self.reading_count[batch_slots] += ends - starts + 1
+        self.last_time[batch_slots] = times[ends]
+        self.last_k[batch_slots] = k[ends]
+        self.last_temp[batch_slots] = temps[ends]
+        return counts
+
+    def remaining(self, slots: np.ndarray, temps_c: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Remaining shelf life for the given batches.
+
+        Args:
+            slots: Batch slots from lookup_slots (must all be known)
+            temps_c: Temperature assumed from now on; defaults to each batch's last reading
+
+        Returns:
+            Dictionary of (N,) arrays: consumed_fraction, remaining_fraction,
+            remaining_days (at the assumed temperature), equivalent_days_at_ref
+            and the temperature used. remaining_days is NaN for batches that have
+            no readings and no explicit temperature.
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        fruit = self.fruit_id[slots]
+        budget = self.budget[slots]
+        accumulated = self.accumulated[slots]
+
+        if temps_c is None:
+            temps = self.last_temp[slots]
+        else:
+            temps = np.asarray(temps_c, dtype=np.float64)
+        k_future = arrhenius_rate_constant(self.table["Ea"][fruit], self.table["A"][fruit], temps + 273.15)
+
+        consumed = np.minimum(accumulated / budget, 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            remaining_days = np.maximum(0.0, budget - accumulated) / k_future
+        return {
+            "consumed_fraction": consumed,
+            "remaining_fraction": 1.0 - consumed,
+            "remaining_days": remaining_days,
+            "equivalent_days_at_ref": accumulated / self.table["k_ref"][fruit],
+            "temperature": temps,
+        }
@@ -0,0 +1,209 @@
+import argparse
+import os
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from shelf_life_predictor import KINETIC_DATA, KINETIC_UNCERTAINTY, R, T_REF_K, KineticParameters, get_kinetics
+
+PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+DEFAULT_SAMPLES = int(os.getenv("SHELF_LIFE_MC_SAMPLES", "10000"))
+DEFAULT_TEMP_RANGE = (-10.0, 50.0)
+DEFAULT_TEMP_STEP = 0.25
+
+
+def _inverse_temperature_term(temp_c: Any) -> Any:
+    """(1/T - 1/T_ref) / R, so that ln(k_ref / k(T)) = Ea * term."""
+    return (1.0 / (np.asarray(temp_c, dtype=np.float64) + 273.15) - 1.0 / T_REF_K) / R
+
+
+class MonteCarloShelfLife:
+    """
+    Shelf-life percentile bands from sampled Arrhenius parameters.
+
+    Each item gets `n_samples` draws of Ea ~ N(Ea, Ea_sd) and
+    ln k_ref ~ N(ln k_ref, log_k_ref_sd) (see KINETIC_UNCERTAINTY). Then
+
+        shelf_life_ratio = k_ref / k(T) = exp(Ea * (1/T - 1/T_ref) / R)
+        life_days        = 1 / k(T)     = shelf_life_ratio / k_ref
+
+    The samples depend only on the item, so they are drawn once and reduced to
+    tables:
+    - The ratio depends on Ea alone and is monotonic in it, so its percentiles
+      at any temperature follow exactly from the percentiles of Ea. The same
+      holds for baseline * ratio and for the remaining days.
+    - life_days mixes both parameters. Its percentiles are tabulated over a
+      temperature grid (in log space) and interpolated linearly between nodes.
+      Temperatures off the grid are computed from the samples directly.
+
+    Tables are built lazily per item; after that an estimate is a few array
+    lookups whatever `n_samples` is.
+    """
+
+    def __init__(
+        self,
+        n_samples: int = DEFAULT_SAMPLES,
+        percentiles: Sequence[float] = PERCENTILES,
+        seed: int = 0,
+        temp_range: Tuple[float, float] = DEFAULT_TEMP_RANGE,
+        temp_step: float = DEFAULT_TEMP_STEP,
+        kinetic_data: Dict[str, Dict[str, Any]] = KINETIC_DATA,
+        uncertainty: Dict[str, Dict[str, float]] = KINETIC_UNCERTAINTY,
+    ):
+        """
+        Args:
+            n_samples: Parameter draws per item
+            percentiles: Percentile levels (0-100) reported in every band
+            seed: Base seed; each item's draws depend only on (seed, item)
+            temp_range: (min, max) temperature of the life_days tables in Celsius
+            temp_step: Spacing of the life_days tables in Celsius
+            kinetic_data: Mapping of item name to {"Ea", "A", ...}
+            uncertainty: Mapping of item name to {"Ea_sd", "log_k_ref_sd"}
+        """
+        if n_samples < 2 or temp_step <= 0:
+            raise ValueError("Need at least two samples and a positive temperature step")
+        self.n_samples = int(n_samples)
+        self.levels = np.asarray(percentiles, dtype=np.float64)
+        self.labels = [f"p{level:g}" for level in self.levels]
+        self.seed = seed
+        self.kinetic_data = kinetic_data
+        self.uncertainty = uncertainty
+        self.names = list(kinetic_data.keys())
+
+        self.t0 = float(temp_range[0])
+        self.temp_step = float(temp_step)
+        self.n_temp = int(round((temp_range[1] - self.t0) / self.temp_step)) + 1
+        self.t_max = self.t0 + (self.n_temp - 1) * self.temp_step
+
+        self._samples: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # item -> (Ea at levels, Ea at 100 - levels, (n_temp, P) ln life_days table)
+        self._tables: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def samples(self, fruit: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(Ea, ln k_ref) draws for one item, shape (n_samples,) each."""
+        if fruit not in self._samples:
+            data = self.kinetic_data[fruit]
+            spread = self.uncertainty[fruit]
+            key = self.names.index(fruit)
+            rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(key,)))
+            log_k_ref = np.log(data["A"]) - data["Ea"] / (R * T_REF_K)
+            self._samples[fruit] = (
+                rng.normal(data["Ea"], spread["Ea_sd"], self.n_samples),
+                rng.normal(log_k_ref, spread["log_k_ref_sd"], self.n_samples),
+            )
+        return self._samples[fruit]
+
+    def _log_life_percentiles(self, fruit: str, temps_c: np.ndarray, chunk: int = 32) -> np.ndarray:
+        """Percentiles of ln life_days at each temperature, shape (len(temps_c), P)."""
+        Ea, log_k_ref = self.samples(fruit)
+        terms = _inverse_temperature_term(temps_c)
+        out = np.empty((len(terms), len(self.levels)))
+        # Chunked over temperatures to bound the (chunk, n_samples) temporary
+        for start in range(0, len(terms), chunk):
+            log_life = terms[start:start + chunk, np.newaxis] * Ea - log_k_ref
+            out[start:start + chunk] = np.percentile(log_life, self.levels, axis=1).T
+        return out
+
+    def tables(self, fruit: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-item percentile tables, built on first use (thread-safe)."""
+        if fruit not in self._tables:
+            with self._lock:
+                if fruit not in self._tables:
+                    Ea, _ = self.samples(fruit)
+                    temps = self.t0 + self.temp_step * np.arange(self.n_temp)
+                    self._tables[fruit] = (
+                        np.percentile(Ea, self.levels),
+                        np.percentile(Ea, 100.0 - self.levels),
+                        self._log_life_percentiles(fruit, temps),
+                    )
+        return self._tables[fruit]
+
+    def life_days_percentiles(self, fruit: str, temp_c: float) -> np.ndarray:
+        """life_days at each percentile level; interpolated on the grid, exact off it."""
+        _, _, table = self.tables(fruit)
+        pos = (temp_c - self.t0) / self.temp_step
+        if not 0.0 <= pos <= self.n_temp - 1:
+            return np.exp(self._log_life_percentiles(fruit, np.array([temp_c]))[0])
+        i = min(int(pos), self.n_temp - 2)
+        w = pos - i
+        return np.exp(table[i] * (1.0 - w) + table[i + 1] * w)
+
+    def ratio_percentiles(self, fruit: str, temp_c: float) -> np.ndarray:
+        """shelf_life_ratio at each percentile level (exact)."""
+        ea_lower, ea_upper, _ = self.tables(fruit)
+        term = float(_inverse_temperature_term(temp_c))
+        # Above T_ref the ratio falls as Ea rises, so its p5 comes from Ea's p95
+        return np.exp(term * (ea_lower if term >= 0 else ea_upper))
+
+    def predict(
+        self,
+        fruit: str,
+        temp_c: float,
+        baseline_shelf_life_days_at_ref: Optional[float] = None,
+        current_age_days: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Percentile bands for one item at one storage temperature.
+
+        Args:
+            fruit: KINETIC_DATA key
+            temp_c: Storage temperature in Celsius
+            baseline_shelf_life_days_at_ref: Optional baseline at 5°C in days
+            current_age_days: Age subtracted for remaining_days
+
+        Returns:
+            Dictionary of {"p5": ..., "p50": ..., ...} bands for life_days and
+            shelf_life_ratio, plus estimated_shelf_life_days and remaining_days
+            (None without a baseline)
+        """
+        life = self.life_days_percentiles(fruit, temp_c)
+        ratio = self.ratio_percentiles(fruit, temp_c)
+        result = {
+            "samples": self.n_samples,
+            "percentiles": self.levels.tolist(),
+            "life_days": dict(zip(self.labels, life.tolist())),
+            "shelf_life_ratio": dict(zip(self.labels, ratio.tolist())),
+            "estimated_shelf_life_days": None,
+            "remaining_days": None,
+        }
+        if baseline_shelf_life_days_at_ref is not None and baseline_shelf_life_days_at_ref >= 0:
+            estimated = float(baseline_shelf_life_days_at_ref) * ratio
+            remaining = np.maximum(0.0, estimated - max(0.0, float(current_age_days)))
+            result["estimated_shelf_life_days"] = dict(zip(self.labels, estimated.tolist()))
+            result["remaining_days"] = dict(zip(self.labels, remaining.tolist()))
+        return result
+
+
+def get_default_monte_carlo(kinetics: Optional[KineticParameters] = None) -> MonteCarloShelfLife:
+    """
+    The estimator with SHELF_LIFE_MC_SAMPLES draws per item for a parameter version
+    (default: the active one), created once per version.
+    """
+    return (kinetics or get_kinetics()).derived(
+        "monte_carlo", lambda k: MonteCarloShelfLife(kinetic_data=k.data, uncertainty=k.uncertainty)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo shelf-life bands: values, build cost and lookup cost")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--temperature", type=float, default=20.0)
+    args = parser.parse_args()
+
+    mc = MonteCarloShelfLife(n_samples=args.samples)
+    print(f"{args.samples} samples per item, life_days at {args.temperature}°C")
+    print(f"{'item':<13}" + "".join(f"{label:>9}" for label in mc.labels) + f"{'build ms':>10}{'call us':>9}{'grid err':>9}")
+    for fruit in mc.names:
+        start = time.perf_counter()
+        mc.tables(fruit)
+        build_ms = (time.perf_counter() - start) * 1000.0
+        start = time.perf_counter()
+        for _ in range(1000):
+            mc.predict(fruit, args.temperature, 30.0, 2.0)
+        call_us = (time.perf_counter() - start) * 1000.0
+        life = mc.life_days_percentiles(fruit, args.temperature)
+        exact = np.exp(mc._log_life_percentiles(fruit, np.array([args.temperature]))[0])
+        error = float(np.max(np.abs(life / exact - 1.0)))
+        print(f"{fruit:<13}" + "".join(f"{v:>9.2f}" for v in life) + f"{build_ms:>10.1f}{call_us:>9.1f}{error:>9.1e}")
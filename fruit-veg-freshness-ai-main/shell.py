@@ -1,24 +1,9 @@
 import numpy as np
 
-# --- 1. Hardcoded Kinetic Parameters (Ea and A) ---
-# Ea is in J/mol, A is in 1/day (assuming first-order kinetics)
-# NOTE: Capsicum is assumed to use the same kinetics as Bellpepper,
-# and Bittergourd/Okra use general estimates due to limited public data.
-KINETIC_DATA = {
-    "apple": {"Ea": 70000.0, "A": 2.0e11, "metric": "firmness loss"},
-    "banana": {"Ea": 62000.0, "A": 9.0e9, "metric": "softening/ripening"},
-    "bellpepper": {"Ea": 55000.0, "A": 1.0e9, "metric": "color degradation"},
-    "bittergourd": {"Ea": 50000.0, "A": 5.0e8, "metric": "estimated weight loss"},
-    "capsicum": {"Ea": 55000.0, "A": 1.0e9, "metric": "color degradation"},
-    "carrot": {"Ea": 85000.0, "A": 5.0e13, "metric": "vitamin c loss"},
-    "cucumber": {"Ea": 48000.0, "A": 3.5e7, "metric": "firmness loss"},
-    "mango": {"Ea": 46000.0, "A": 2.5e7, "metric": "firmness/ripening"},
-    "okra": {"Ea": 58000.0, "A": 7.0e9, "metric": "estimated respiration rate"},
-    "orange": {"Ea": 44000.0, "A": 1.0e7, "metric": "vitamin c loss"},
-    "potato": {"Ea": 60000.0, "A": 4.0e10, "metric": "texture/ascorbic acid loss"},
-    "strawberry": {"Ea": 32000.0, "A": 5.0e4, "metric": "anthocyanin (color) loss"},
-    "tomato": {"Ea": 36000.0, "A": 1.5e5, "metric": "softening/respiration"},
-}
+# --- 1. Kinetic Parameters (Ea and A) ---
+# Ea is in J/mol, A is in 1/day (assuming first-order kinetics); defined once in
+# shelf_life_predictor.py
+from shelf_life_predictor import KINETIC_DATA
 
 # Universal Gas Constant (R) in J/(mol·K)
 R = 8.314
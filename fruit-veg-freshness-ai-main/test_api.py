@@ -118,6 +118,40 @@ def test_health_check():
     
     print()
 
+def test_hybrid_non_finite_inputs():
+    """Test that NaN/inf temperatures and humidities are rejected with 400"""
+    print("🧪 Testing Hybrid Shelf Life Non-Finite Inputs")
+    print("-" * 40)
+    
+    # json= writes NaN/Infinity literals, which the API's JSON parser accepts
+    test_cases = [
+        {"fruit_name": "banana", "storage_temperature": float("nan"), "humidity": 85.0},
+        {"fruit_name": "banana", "storage_temperature": 18.0, "humidity": float("nan")},
+        {"fruit_name": "banana", "storage_temperature": float("inf"), "humidity": 85.0},
+        {"fruit_name": "banana", "storage_temperature": 18.0, "humidity": float("-inf")}
+    ]
+    
+    for case in test_cases:
+        batch = {
+            "fruit_names": ["apple", case["fruit_name"]],
+            "storage_temperatures": [5.0, case["storage_temperature"]],
+            "humidities": [90.0, case["humidity"]]
+        }
+        for path, body in (("/predict-shelf-life/hybrid", case), ("/predict-shelf-life/hybrid/batch", batch)):
+            try:
+                response = requests.post(f"{BASE_URL}{path}", json=body)
+                label = f"{path} T={case['storage_temperature']} RH={case['humidity']}"
+                if response.status_code == 400:
+                    print(f"✅ {label}: rejected with 400")
+                else:
+                    print(f"❌ {label}: expected 400, got {response.status_code}")
+                    print(f"   Details: {response.text}")
+            
+            except Exception as e:
+                print(f"❌ Exception for {path}: {e}")
+    
+    print()
+
 def main():
     """Run all tests"""
     print("🚀 FastAPI Fruit & Vegetable Freshness API Test Client")
@@ -142,6 +176,7 @@ def main():
     test_health_check()
     test_available_items()
     test_shelf_life_prediction()
+    test_hybrid_non_finite_inputs()
     test_freshness_evaluation()
     
     print("🎉 All tests completed!")
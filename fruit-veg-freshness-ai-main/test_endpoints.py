@@ -0,0 +1,101 @@
+import json
+import unittest
+
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+
+import hy
+import main
+from benchmark_suite import synthetic_shelf_life_model
+from load_test import StandInModel
+from model_manager import READY
+from shelf_life_surface import ShelfLifeSurface
+
+# In-process checks of the API's input validation; no server, TensorFlow or
+# model files needed (the CNN is load_test's stand-in, the shelf-life
+# RandomForest benchmark_suite's synthetic one).
+#
+#   python -m unittest test_endpoints
+
+
+def _jpeg() -> bytes:
+    image = np.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype=np.uint8)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+class ScanShelfLifeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        main.model_manager.model = StandInModel(0.0, 0.0)
+        main.model_manager.state = READY
+        # No lifespan events, so the startup model load never runs
+        cls.client = TestClient(main.app)
+        cls.image = _jpeg()
+
+    def scan(self, storage_temperature: str):
+        return self.client.post(
+            "/evaluate-freshness/shelf-life",
+            files={"file": ("item.jpg", self.image, "image/jpeg")},
+            data={"fruit_name": "banana", "storage_temperature": storage_temperature},
+        )
+
+    def test_valid_temperature(self):
+        response = self.scan("12")
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertGreaterEqual(response.json()["shelf_life"]["remaining_days"], 0.0)
+
+    def test_invalid_temperature_is_rejected(self):
+        for value in ("nan", "inf", "-inf", "-273.15", "-300"):
+            with self.subTest(storage_temperature=value):
+                response = self.scan(value)
+                self.assertEqual(response.status_code, 400, response.text)
+                self.assertIn("storage_temperature", response.json()["detail"])
+
+
+NON_FINITE = (float("nan"), float("inf"), float("-inf"))
+
+
+class HybridNonFiniteTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if hy.model is None:
+            hy.model = synthetic_shelf_life_model(n_rows=500)
+        cls.client = TestClient(main.app)
+
+    def post(self, path: str, body: dict):
+        # json= refuses NaN; the API's JSON parser accepts the NaN/Infinity literals
+        return self.client.post(path, content=json.dumps(body), headers={"Content-Type": "application/json"})
+
+    def test_surface_lookup_rejects_non_finite(self):
+        surface = ShelfLifeSurface()
+        for value in NON_FINITE:
+            for temps, rhs in (([20.0, value], [80.0, 80.0]), ([20.0, 20.0], [80.0, value])):
+                with self.subTest(temps=temps, rhs=rhs):
+                    with self.assertRaises(ValueError):
+                        surface.lookup_batch(np.array([0, 1]), np.array(temps), np.array(rhs))
+
+    def test_endpoints_reject_non_finite(self):
+        for value in NON_FINITE:
+            single = {"fruit_name": "banana", "storage_temperature": value, "humidity": 85.0}
+            batch = {"fruit_names": ["apple", "banana"], "storage_temperatures": [5.0, 18.0], "humidities": [90.0, value]}
+            for path, body in (("/predict-shelf-life/hybrid", single), ("/predict-shelf-life/hybrid/batch", batch)):
+                with self.subTest(path=path, value=value):
+                    response = self.post(path, body)
+                    self.assertEqual(response.status_code, 400, response.text)
+                    self.assertIn("must be finite", response.json()["detail"])
+                    self.assertNotIn("Available items", response.json()["detail"])
+
+    def test_unknown_item_lists_available_items(self):
+        response = self.post("/predict-shelf-life/hybrid", {"fruit_name": "durian", "storage_temperature": 18.0, "humidity": 85.0})
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertIn("Available items", response.json()["detail"])
+
+    def test_finite_inputs(self):
+        response = self.post("/predict-shelf-life/hybrid", {"fruit_name": "banana", "storage_temperature": 18.0, "humidity": 85.0})
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertGreater(response.json()["hybrid_shelf_life_days"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
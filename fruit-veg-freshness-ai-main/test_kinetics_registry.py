@@ -0,0 +1,74 @@
+import json
+import tempfile
+import unittest
+
+from kinetics_registry import KineticsRegistry, KineticsReloader
+from shelf_life_predictor import get_kinetics, set_kinetics
+
+#   python -m unittest test_kinetics_registry
+
+
+def _items(kinetics, scale: float = 1.0):
+    """kinetics.json items for a parameter version, with every A scaled."""
+    return {
+        name: {
+            "Ea": data["Ea"],
+            "A": data["A"] * scale,
+            "metric": data["metric"],
+            **kinetics.uncertainty[name],
+        }
+        for name, data in kinetics.data.items()
+    }
+
+
+class KineticsReloaderTest(unittest.TestCase):
+    def setUp(self):
+        self.original = get_kinetics()
+        self.directory = tempfile.TemporaryDirectory()
+        self.registry = KineticsRegistry(self.directory.name)
+
+    def tearDown(self):
+        set_kinetics(self.original)
+        self.directory.cleanup()
+
+    def test_swap(self):
+        swaps = []
+        reloader = KineticsReloader(self.registry, on_swap=[lambda new, old: swaps.append((new.version, old.version))])
+        version = self.registry.publish(_items(self.original, 2.0))
+
+        self.assertTrue(reloader.reload())
+        self.assertEqual(get_kinetics().version, version)
+        self.assertEqual(swaps, [(version, self.original.version)])
+        self.assertIsNone(reloader.status()["last_error"])
+        self.assertFalse(reloader.reload())
+
+    def test_invalid_version_keeps_serving(self):
+        reloader = KineticsReloader(self.registry)
+        items = _items(self.original)
+        next(iter(items.values()))["A"] = -1.0
+        # publish() validates, so write the broken version past it
+        broken = self.registry.publish(_items(self.original, 2.0), activate=False)
+        with open(self.registry.path(broken), "w") as f:
+            json.dump({"items": items}, f)
+        self.registry.activate(broken)
+
+        self.assertFalse(reloader.reload())
+        self.assertEqual(get_kinetics().version, self.original.version)
+        self.assertIn(broken, reloader.status()["last_error"])
+
+    def test_failing_callback_is_reported(self):
+        def retarget(new, old):
+            raise ValueError("tracked item missing")
+
+        reloader = KineticsReloader(self.registry, on_swap=[retarget])
+        version = self.registry.publish(_items(self.original, 2.0))
+
+        self.assertTrue(reloader.reload())
+        status = reloader.status()
+        self.assertEqual(status["version"], version)
+        self.assertIn("retarget", status["last_error"])
+        self.assertIn("tracked item missing", status["last_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
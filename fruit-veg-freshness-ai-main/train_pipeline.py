@@ -0,0 +1,325 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import resource
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Scalable replacement for shell_life.py: chunked reading with compact dtypes,
+# a process-parallel hyperparameter search, an all-cores final fit, and a
+# versioned artifact directory with a JSON training report.
+#
+#   python train_pipeline.py fruit_veg_shelf_life.csv
+#   python train_pipeline.py stress.parquet --search --install
+
+# Compact on-disk -> in-memory dtypes (values from dataset.py fit easily)
+DTYPES = {
+    "Type": "category",
+    "Temperature_C": "int8",
+    "Humidity_%": "int8",
+    "Shelf_Life_Days": "int16",
+}
+TARGET = "Shelf_Life_Days"
+NUMERIC_FEATURES = ["Temperature_C", "Humidity_%"]
+
+# shell_life.py's model
+DEFAULT_PARAMS = {"n_estimators": 150, "random_state": 42}
+
+# Grid explored by --search (combined with DEFAULT_PARAMS). n_estimators is left
+# out: more trees mostly cost time, they rarely change which settings win
+SEARCH_GRID = {
+    "max_depth": [None, 16],
+    "min_samples_leaf": [1, 3, 5],
+    "max_features": [1.0, 0.5],
+}
+
+
+def _peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+# --- Loading ---
+
+def iter_frames(path: str, chunk_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """Read a CSV or Parquet dataset in chunks, already cast to the compact DTYPES."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=list(DTYPES)):
+            yield batch.to_pandas().astype(DTYPES)
+    else:
+        yield from pd.read_csv(path, dtype=DTYPES, usecols=list(DTYPES), chunksize=chunk_rows)
+
+
+def load_dataset(path: str, chunk_rows: int = 1_000_000, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Concatenate the compact chunks (about 5 bytes per row) into one frame.
+
+    Categories are unioned across chunks and sorted, as get_dummies would order them.
+    """
+    frames, n = [], 0
+    for frame in iter_frames(path, chunk_rows):
+        if max_rows is not None and n + len(frame) > max_rows:
+            frame = frame.iloc[:max_rows - n]
+        frames.append(frame)
+        n += len(frame)
+        if max_rows is not None and n >= max_rows:
+            break
+
+    types = pd.api.types.union_categoricals([f["Type"] for f in frames], sort_categories=True)
+    data = {"Type": types}
+    for column in NUMERIC_FEATURES + [TARGET]:
+        data[column] = np.concatenate([f[column].to_numpy() for f in frames])
+    return pd.DataFrame(data)
+
+
+def build_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    float32 feature frame with the same columns as shell_life.py's get_dummies(drop_first=True).
+
+    The column names end up in model.feature_names_in_, which the serving code relies on.
+    """
+    categories = list(df["Type"].cat.categories)
+    codes = df["Type"].cat.codes.to_numpy()
+    X = np.zeros((len(df), len(NUMERIC_FEATURES) + len(categories) - 1), dtype=np.float32)
+    for i, column in enumerate(NUMERIC_FEATURES):
+        X[:, i] = df[column].to_numpy()
+    # Category 0 is the dropped baseline
+    has_column = codes > 0
+    X[np.flatnonzero(has_column), len(NUMERIC_FEATURES) + codes[has_column] - 1] = 1.0
+    columns = NUMERIC_FEATURES + [f"Type_{name}" for name in categories[1:]]
+    return pd.DataFrame(X, columns=columns, copy=False), df[TARGET].to_numpy(dtype=np.float32)
+
+
+# --- Hyperparameter search ---
+
+# Training data shared with search workers; set before the pool starts so forked
+# workers inherit it without pickling
+_search_data: Dict[str, Any] = {}
+
+
+def _init_search_worker(X_train, y_train, X_val, y_val) -> None:
+    _search_data.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+
+
+def _evaluate_candidate(params: Dict[str, Any]) -> Dict[str, Any]:
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    start = time.perf_counter()
+    model = RandomForestRegressor(n_jobs=1, **params)
+    model.fit(_search_data["X_train"], _search_data["y_train"])
+    fit_s = time.perf_counter() - start
+    y_pred = model.predict(_search_data["X_val"])
+    return {
+        "params": params,
+        "val_mae": float(mean_absolute_error(_search_data["y_val"], y_pred)),
+        "val_r2": float(r2_score(_search_data["y_val"], y_pred)),
+        "fit_s": fit_s,
+    }
+
+
+def search_grid(grid: Dict[str, List[Any]], base: Dict[str, Any]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(base, **dict(zip(keys, values))) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def hyperparameter_search(
+    X: pd.DataFrame,
+    y: np.ndarray,
+    candidates: List[Dict[str, Any]],
+    workers: int,
+    seed: int = 42,
+) -> List[Dict[str, Any]]:
+    """
+    Fit every candidate on a training split and score it on a validation split.
+
+    Candidates run in parallel, one single-threaded forest per worker process.
+
+    Returns:
+        Results sorted by validation MAE (best first)
+    """
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=seed)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_search_worker,
+        initargs=(X_train, y_train, X_val, y_val),
+    ) as pool:
+        results = list(pool.map(_evaluate_candidate, candidates))
+    return sorted(results, key=lambda r: r["val_mae"])
+
+
+# --- Training run ---
+
+def _artifact_version(data_path: str, params: Dict[str, Any]) -> str:
+    stat = os.stat(data_path)
+    fingerprint = json.dumps(
+        {"data": os.path.abspath(data_path), "size": stat.st_size, "mtime": stat.st_mtime_ns, "params": params},
+        sort_keys=True, default=str,
+    )
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return f"{stamp}-{hashlib.sha1(fingerprint.encode()).hexdigest()[:8]}"
+
+
+def train(
+    data_path: str,
+    output_dir: str = "models/shelf_life",
+    search: bool = False,
+    workers: Optional[int] = None,
+    chunk_rows: int = 1_000_000,
+    max_rows: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+    compile_npz: bool = True,
+) -> Dict[str, Any]:
+    """
+    Train, evaluate and save one versioned shelf-life model.
+
+    Writes <output_dir>/<version>/model.pkl (plus model.npz from forest_compiler
+    when compile_npz) and report.json, and returns the report.
+    """
+    import joblib
+    import sklearn
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    workers = workers or os.cpu_count() or 1
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    df = load_dataset(data_path, chunk_rows, max_rows)
+    X, y = build_features(df)
+    data_bytes = int(df.memory_usage(deep=True).sum())
+    del df
+    timings["load_s"] = time.perf_counter() - start
+
+    # Same held-out split as shell_life.py
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    search_results = None
+    chosen = dict(DEFAULT_PARAMS, **(params or {}))
+    if search:
+        start = time.perf_counter()
+        search_results = hyperparameter_search(X_train, y_train, search_grid(SEARCH_GRID, chosen), workers)
+        chosen = search_results[0]["params"]
+        timings["search_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = RandomForestRegressor(n_jobs=workers, **chosen)
+    model.fit(X_train, y_train)
+    timings["fit_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    timings["evaluate_s"] = time.perf_counter() - start
+    # Serving predicts one row at a time; keep the pickled model single-threaded
+    model.set_params(n_jobs=None)
+
+    version = _artifact_version(data_path, chosen)
+    artifact_dir = os.path.join(output_dir, version)
+    os.makedirs(artifact_dir, exist_ok=True)
+    model_path = os.path.join(artifact_dir, "model.pkl")
+    start = time.perf_counter()
+    joblib.dump(model, model_path)
+    files = {"model": model_path}
+    if compile_npz:
+        from forest_compiler import compile_forest, save_compiled_forest
+        files["compiled_model"] = os.path.join(artifact_dir, "model.npz")
+        save_compiled_forest(compile_forest(model), files["compiled_model"])
+    timings["save_s"] = time.perf_counter() - start
+
+    importances = sorted(zip(X.columns, model.feature_importances_), key=lambda item: -item[1])
+    report = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data": {
+            "path": os.path.abspath(data_path),
+            "rows": int(len(X)),
+            "train_rows": int(len(X_train)),
+            "test_rows": int(len(X_test)),
+            "in_memory_mb": data_bytes / 1e6,
+            "feature_matrix_mb": X.memory_usage(deep=True).sum() / 1e6,
+            "features": list(X.columns),
+        },
+        "params": chosen,
+        "metrics": {
+            "test_mae": float(mean_absolute_error(y_test, y_pred)),
+            "test_r2": float(r2_score(y_test, y_pred)),
+        },
+        "timings_s": timings,
+        "total_s": sum(timings.values()),
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_rss_children_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "workers": workers,
+        "search": search_results,
+        "feature_importances": {name: float(value) for name, value in importances},
+        "files": {name: os.path.abspath(path) for name, path in files.items()},
+        "model_size_mb": os.path.getsize(model_path) / 1e6,
+        "versions": {"python": sys.version.split()[0], "numpy": np.__version__, "sklearn": sklearn.__version__},
+    }
+    with open(os.path.join(artifact_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    return report
+
+
+def install(report: Dict[str, Any], model_path: str = "shelf_life_model.pkl") -> None:
+    """Copy a trained artifact to where hy.py / hybrid_service.py load it from."""
+    shutil.copyfile(report["files"]["model"], model_path)
+    print(f"Installed {report['version']} as {model_path}")
+    if "compiled_model" in report["files"]:
+        npz_path = os.path.splitext(model_path)[0] + ".npz"
+        shutil.copyfile(report["files"]["compiled_model"], npz_path)
+        print(f"Installed {report['version']} as {npz_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the shelf-life RandomForest into a versioned artifact")
+    parser.add_argument("data", nargs="?", default="fruit_veg_shelf_life.csv", help=".csv or .parquet dataset")
+    parser.add_argument("--output-dir", default="models/shelf_life")
+    parser.add_argument("--search", action="store_true", help="Parallel grid search before the final fit")
+    parser.add_argument("--workers", type=int, default=0, help="Processes/threads to use (0 = CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--max-rows", type=int, help="Only use the first N rows")
+    parser.add_argument("--n-estimators", type=int, help="Override n_estimators (without --search)")
+    parser.add_argument("--max-samples", type=float, help="Fraction of rows drawn per tree (bounds fit cost)")
+    parser.add_argument("--no-compile", action="store_true", help="Skip writing the compiled .npz")
+    parser.add_argument("--install", action="store_true", help="Copy the artifact to shelf_life_model.pkl/.npz")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.n_estimators:
+        overrides["n_estimators"] = args.n_estimators
+    if args.max_samples:
+        overrides["max_samples"] = args.max_samples
+
+    report = train(
+        args.data,
+        output_dir=args.output_dir,
+        search=args.search,
+        workers=args.workers or None,
+        chunk_rows=args.chunk_rows,
+        max_rows=args.max_rows,
+        params=overrides,
+        compile_npz=not args.no_compile,
+    )
+    print(f"Version:   {report['version']}")
+    print(f"Rows:      {report['data']['rows']:,} ({report['data']['in_memory_mb']:.1f} MB in memory)")
+    print(f"Params:    {report['params']}")
+    print(f"MAE:       {report['metrics']['test_mae']:.2f}")
+    print(f"R² Score:  {report['metrics']['test_r2']:.3f}")
+    print(f"Time:      {report['total_s']:.1f}s  " + "  ".join(f"{k}={v:.1f}" for k, v in report['timings_s'].items()))
+    print(f"Peak RSS:  {report['peak_rss_mb']:.0f} MB (search workers: {report['peak_rss_children_mb']:.0f} MB)")
+    if args.install:
+        install(report)
@@ -0,0 +1,142 @@
+from typing import Iterable, Optional, Tuple
+
+# Image types OpenCV's imdecode reads, identified by their leading bytes
+# (GIF is not one of them)
+_MAGIC_PREFIXES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+)
+SUPPORTED_IMAGE_TYPES = ("jpeg", "png", "webp", "bmp", "tiff")
+
+# Allowance for the multipart envelope (boundaries, part headers) around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+READ_CHUNK_BYTES = 256 * 1024
+
+
+class UploadRejected(Exception):
+    """An upload refused before decoding; carries the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_image_type(data) -> Optional[str]:
+    """Image type from the magic bytes at the start of `data`, or None if not a supported image."""
+    head = bytes(memoryview(data)[:12])
+    for prefix, image_type in _MAGIC_PREFIXES:
+        if head.startswith(prefix):
+            return image_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+async def read_upload(file, max_bytes: int) -> Tuple[memoryview, str]:
+    """
+    Read an UploadFile into one buffer of at most `max_bytes` and check it is an image.
+
+    The declared size is checked before anything is read; uploads of unknown
+    size are read in chunks and abandoned as soon as they pass the limit. The
+    returned memoryview covers the filled part of the buffer, so the decoder
+    and the cache hash read it without another copy of the upload.
+
+    Args:
+        file: Starlette/FastAPI UploadFile
+        max_bytes: Largest accepted upload
+
+    Returns:
+        (memoryview of the upload, image type from sniff_image_type)
+
+    Raises:
+        UploadRejected: 413 if the upload is too large, 415 if it is not a supported image
+    """
+    too_large = UploadRejected(413, f"Upload exceeds the {max_bytes} byte limit")
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise too_large
+
+    # Known size: exactly one allocation. Unknown: grow geometrically up to the limit.
+    buffer = bytearray(size if size is not None else min(max_bytes, READ_CHUNK_BYTES))
+    filled = 0
+    while True:
+        chunk = await file.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        end = filled + len(chunk)
+        if end > max_bytes:
+            raise too_large
+        if end > len(buffer):
+            buffer.extend(bytearray(min(max(end, 2 * len(buffer)), max_bytes) - len(buffer)))
+        buffer[filled:end] = chunk
+        filled = end
+
+    data = memoryview(buffer)[:filled]
+    image_type = sniff_image_type(data)
+    if image_type is None:
+        raise UploadRejected(
+            415, f"File must be an image ({', '.join(SUPPORTED_IMAGE_TYPES)}); the content was not recognized"
+        )
+    return data, image_type
+
+
+class BodySizeLimitMiddleware:
+    """
+    Pure ASGI middleware rejecting oversized request bodies before they are parsed.
+
+    A Content-Length above the limit is answered with 413 without reading the
+    body. Chunked bodies are counted as they stream in and the request fails
+    with 413 once the limit is passed, so a multipart upload is never spooled
+    beyond it.
+    """
+
+    def __init__(self, app, max_body_bytes: int, path_prefixes: Iterable[str] = ("/",)):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_prefixes = tuple(path_prefixes)
+
+    async def _reject(self, send) -> None:
+        body = b'{"detail":"Request body exceeds the %d byte limit"}' % self.max_body_bytes
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_body_bytes:
+                    await self._reject(send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside the route's body parsing, so the app's
+                    # exception handlers turn it into a 413 response
+                    from starlette.exceptions import HTTPException
+                    raise HTTPException(413, f"Request body exceeds the {self.max_body_bytes} byte limit")
+            return message
+
+        await self.app(scope, limited_receive, send)